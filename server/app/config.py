@@ -22,11 +22,22 @@ class Settings(BaseSettings):
     BASE_DIR: Path = Path(__file__).parent.parent
 
     # Database Configuration
+    DB_BACKEND: str = "mysql"  # "mysql", or "sqlite" for a single-node install (file at DB_SQLITE_PATH)
     DB_HOST: str = "localhost"
     DB_PORT: int = 3306
     DB_USER: str = ""
     DB_PASSWORD: str = ""
     DB_NAME: str = "flyfunboarding"
+    DB_SQLITE_PATH: Path = BASE_DIR / "data" / "flyfunboarding.sqlite"
+    DB_AUTO_MIGRATE: bool = True  # Apply pending schema migrations at startup
+    DB_REREAD_AFTER_WRITE: bool = False  # Re-read upserted entities instead of building them from the written data
+    STATS_RECONCILE_INTERVAL: float = 0  # Seconds between entity stats reconciliations, 0 = disabled
+    DB_REPLICA_URLS: str = ""  # Comma-separated SQLAlchemy URLs of read replicas for GET routes, "" = none
+    DB_REPLICA_STICKY_SECONDS: float = 5  # After a write, the client's reads stay on the primary this long
+    DB_REPLICA_RETRY_INTERVAL: float = 30  # Seconds an unreachable replica is skipped
+    DB_SHARDS: str = ""  # "name=url,..." SQLAlchemy URLs of shard databases besides the default one, "" = none
+    DB_SHARD_MAP_TTL: float = 30  # Seconds airline and ticket shard assignments are cached
+    DB_SHARD_MISS_TTL: float = 5  # Seconds a ticket found in no shard is remembered as missing
 
     # Apple Wallet PKPass Configuration
     CERTIFICATE_PATH: Path = BASE_DIR / "certs" / "certificate.pem"
@@ -37,14 +48,23 @@ class Settings(BaseSettings):
     KEYS_PATH: Path = BASE_DIR / "keys"
     IMAGES_PATH: Path = BASE_DIR / "images"
     AIRPORT_DB_PATH: Path = BASE_DIR / "data" / "airports.db"  # Used by euro_aip library (DO NOT read directly)
+    AIRPORT_DB_WATCH_INTERVAL: float = 0  # Seconds between checks for a new airports.db, 0 = disabled
+    AIRPORT_DB_THREADS: int = 4  # Worker threads (and max concurrent queries) for airport lookups
 
     # Security
     SECRET: str = ""
     USE_PUBLIC_KEY_SIGNATURE: bool = True
+    AUTH_CACHE_TTL: float = 60  # Seconds airline auth data is cached, 0 = disabled
+    AUTH_CACHE_SIZE: int = 10000  # Airlines kept by the in-process auth cache
+    AUTH_CACHE_BACKEND: str = ""  # "module:attribute" of a shared AuthCacheBackend factory, "" = in-process
+    ACCESS_TOKEN_KEYS: str = ""  # "kid:secret,..." signing keys for access tokens (first signs), "" = derived from SECRET
+    ACCESS_TOKEN_TTL: int = 900  # Access token lifetime in seconds
 
     # API Configuration
     API_VERSION: str = "v1"
     DEBUG: bool = False
+    BULK_MAX_ROWS: int = 1000  # Maximum rows per bulk import request
+    LIST_MAX_LIMIT: int = 1000  # Maximum `limit` accepted by list endpoints
 
     @property
     def api_prefix(self) -> str:
@@ -65,8 +85,25 @@ class Settings(BaseSettings):
             return ["*"]
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    @property
+    def replica_urls(self) -> list[str]:
+        """Parse DB_REPLICA_URLS into a list."""
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
+    @property
+    def shard_urls(self) -> dict[str, str]:
+        """Parse DB_SHARDS into {name: url}."""
+        shards = {}
+        for entry in self.DB_SHARDS.split(","):
+            name, _, url = entry.strip().partition("=")
+            if name.strip() and url.strip():
+                shards[name.strip()] = url.strip()
+        return shards
+
     def get_database_url(self) -> str:
         """Get the database connection URL."""
+        if self.DB_BACKEND == "sqlite":
+            return f"sqlite+aiosqlite:///{self.DB_SQLITE_PATH}"
         return (
             f"mysql+aiomysql://{self.DB_USER}:{self.DB_PASSWORD}"
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
@@ -0,0 +1,110 @@
+"""
+Short-lived signed access tokens.
+
+POST airline/{id}/token exchanges the airline's credential (its
+apple_identifier) for an access token: "at1.<kid>.<claims>.<signature>",
+where claims is base64url JSON {"aid": airline_id, "sub": airline_identifier,
+"exp": expiry (unix time)} and signature its HMAC-SHA256 under key kid.
+Requests carrying one are authenticated by checking the signature and
+expiry, without a database query.
+
+Keys come from ACCESS_TOKEN_KEYS ("kid:secret,kid:secret"): the first key
+signs, all of them verify, so a key is rotated by putting a new one first
+and dropping the old one once its tokens have expired. Without keys, one is
+derived from SECRET. Tokens cannot be revoked before they expire: keep
+ACCESS_TOKEN_TTL short.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+from functools import lru_cache
+from typing import Any, Optional
+
+from app.config import settings
+
+ACCESS_TOKEN_PREFIX = "at1."
+
+
+@lru_cache(maxsize=4)
+def _parse_keys(access_token_keys: str, secret: str) -> list[tuple[str, bytes]]:
+    if access_token_keys:
+        keys = []
+        for entry in access_token_keys.split(","):
+            kid, _, key = entry.strip().partition(":")
+            if kid and key:
+                keys.append((kid, key.encode()))
+        return keys
+    if secret:
+        return [("s", hashlib.sha256(b"access-token:" + secret.encode()).digest())]
+    return []
+
+
+def _keys() -> list[tuple[str, bytes]]:
+    """Signing keys as (kid, key), the signing one first."""
+    return _parse_keys(settings.ACCESS_TOKEN_KEYS, settings.SECRET)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(key: bytes, kid: str, claims: str) -> str:
+    return _b64encode(hmac.new(key, f"{kid}.{claims}".encode(), hashlib.sha256).digest())
+
+
+def access_tokens_enabled() -> bool:
+    """Whether a signing key is configured."""
+    return bool(_keys())
+
+
+def issue_access_token(airline_id: int, airline_identifier: str) -> tuple[str, int]:
+    """
+    Issue an access token for an airline.
+
+    Returns:
+        Token and its lifetime in seconds
+
+    Raises:
+        ValueError: No signing key configured
+    """
+    keys = _keys()
+    if not keys:
+        raise ValueError("no access token key configured")
+    kid, key = keys[0]
+    ttl = settings.ACCESS_TOKEN_TTL
+    claims = _b64encode(json.dumps(
+        {"aid": airline_id, "sub": airline_identifier, "exp": int(time.time()) + ttl},
+        separators=(",", ":"),
+    ).encode())
+    return f"{ACCESS_TOKEN_PREFIX}{kid}.{claims}.{_sign(key, kid, claims)}", ttl
+
+
+def verify_access_token(token: str) -> Optional[dict[str, Any]]:
+    """
+    Verify an access token.
+
+    Returns:
+        Claims (aid, sub, exp) of a valid, unexpired token, else None
+    """
+    if not token.startswith(ACCESS_TOKEN_PREFIX):
+        return None
+    parts = token[len(ACCESS_TOKEN_PREFIX):].split(".")
+    if len(parts) != 3:
+        return None
+    kid, claims, signature = parts
+    key = dict(_keys()).get(kid)
+    if key is None or not hmac.compare_digest(_sign(key, kid, claims), signature):
+        return None
+    try:
+        payload = json.loads(_b64decode(claims))
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or payload.get("exp", 0) <= time.time():
+        return None
+    return payload
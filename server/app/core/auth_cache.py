@@ -0,0 +1,129 @@
+"""
+Cache of airline authentication data.
+
+get_airline_context() needs, for the airline in the path, its id, its
+credential (the apple_identifier sent as bearer token) and its JSON. The
+cache keeps these per airline_identifier for AUTH_CACHE_TTL seconds, so
+authenticated requests skip the Airlines query. The credential is kept as a
+SHA-256 hash and compared in constant time.
+
+The default backend is an in-process LRU of AUTH_CACHE_SIZE entries. Set
+AUTH_CACHE_BACKEND to "module:attribute" of an AuthCacheBackend factory to
+share entries across workers (e.g. a Redis-backed one); with the in-process
+backend, a change made through another worker is seen after at most the TTL.
+create_airline and delete_airline invalidate the airline's entry.
+"""
+import hashlib
+import hmac
+import importlib
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from app.config import settings
+
+
+@dataclass
+class AirlineAuth:
+    """Cached authentication data of an airline."""
+    airline_id: int
+    token_hash: str
+    json_data: dict[str, Any]
+
+    def accepts(self, token: str) -> bool:
+        """Check a bearer token against the airline's credential, in constant time."""
+        return hmac.compare_digest(token_hash(token), self.token_hash)
+
+
+def token_hash(token: str) -> str:
+    """Hash a bearer token (fixed length, so comparisons do not depend on its length)."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class AuthCacheBackend(ABC):
+    """Storage for AirlineAuthCache. Values are plain dicts, so backends may serialize them."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Value of a key, None if missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: dict[str, Any], ttl: float) -> None:
+        """Store a value for ttl seconds."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a key (no error if missing)."""
+
+
+class MemoryAuthCacheBackend(AuthCacheBackend):
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict[str, Any], ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class AirlineAuthCache:
+    """Airline authentication data by airline_identifier (see module docstring)."""
+
+    def __init__(self, backend: Optional[AuthCacheBackend] = None, ttl: Optional[float] = None):
+        self._backend = backend
+        self.ttl = settings.AUTH_CACHE_TTL if ttl is None else ttl
+
+    @property
+    def backend(self) -> AuthCacheBackend:
+        """The backend, created on first use from AUTH_CACHE_BACKEND."""
+        if self._backend is None:
+            if settings.AUTH_CACHE_BACKEND:
+                module, _, attribute = settings.AUTH_CACHE_BACKEND.partition(":")
+                self._backend = getattr(importlib.import_module(module), attribute)()
+            else:
+                self._backend = MemoryAuthCacheBackend(settings.AUTH_CACHE_SIZE)
+        return self._backend
+
+    async def get(self, airline_identifier: str) -> Optional[AirlineAuth]:
+        if self.ttl <= 0:
+            return None
+        value = await self.backend.get(airline_identifier)
+        return AirlineAuth(**value) if value is not None else None
+
+    async def set(self, airline_identifier: str, auth: AirlineAuth) -> None:
+        if self.ttl <= 0:
+            return
+        await self.backend.set(
+            airline_identifier,
+            {"airline_id": auth.airline_id, "token_hash": auth.token_hash, "json_data": auth.json_data},
+            self.ttl,
+        )
+
+    async def invalidate(self, airline_identifier: str) -> None:
+        """Drop an airline's entry (after it was created, updated or deleted)."""
+        if self.ttl <= 0:
+            return
+        await self.backend.delete(airline_identifier)
+
+
+airline_auth_cache = AirlineAuthCache()
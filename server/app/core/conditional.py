@@ -0,0 +1,82 @@
+"""
+Conditional GET for list endpoints (ETag / If-None-Match).
+
+The validator is computed from the airline's list version (bumped by every
+write of this server, see app/database/versions.py), COUNT(*) and
+MAX(modified) of the tables a list reads, for the airline, and the last
+deletion id: one small query on the (airline_id, modified) indexes. The
+counts and dates catch writes of other clients of the database (e.g. the
+PHP backend), to the second. When the client's If-None-Match matches, the
+endpoint answers 304 without reading or validating any rows.
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import ColumnElement, Table, select, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.tables import deletions
+from app.database.versions import list_version_query
+
+
+async def list_etag(
+    request: Request,
+    db: AsyncSession,
+    airline_id: int,
+    tables: list[Table],
+    *parts: Any,
+) -> str:
+    """
+    Compute a weak ETag for an airline-scoped list.
+
+    Args:
+        request: Request (query string and Accept select the representation)
+        db: Database session
+        airline_id: Airline ID
+        tables: Tables the list reads (the listed table, then stats tables)
+        parts: Extra values the list depends on, or scalar subqueries read in the
+            same query (e.g. the first upcoming departure)
+
+    Returns:
+        ETag header value
+    """
+    # Catches edits within the same second
+    columns = [list_version_query(airline_id)]
+    for table in tables:
+        columns.append(
+            select(sql_func.count()).where(table.c.airline_id == airline_id).scalar_subquery()
+        )
+        columns.append(
+            select(sql_func.max(table.c.modified)).where(table.c.airline_id == airline_id).scalar_subquery()
+        )
+    # Catches a delete and an insert within the same second
+    columns.append(
+        select(sql_func.max(deletions.c.deletion_id)).where(deletions.c.airline_id == airline_id).scalar_subquery()
+    )
+    values = [part for part in parts if not isinstance(part, ColumnElement)]
+    columns.extend(part for part in parts if isinstance(part, ColumnElement))
+    row = (await db.execute(select(*columns))).one()
+
+    key = "|".join(
+        str(value)
+        for value in (request.url.query, request.headers.get("accept", ""), *values, *row)
+    )
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Set the ETag header, and build a 304 response if the client has this version.
+
+    Returns:
+        304 response to return as is, or None to build the list
+    """
+    response.headers["ETag"] = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        # Weak comparison (RFC 9110): W/ prefixes are ignored
+        if "*" in tags or etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
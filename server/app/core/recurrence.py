@@ -0,0 +1,132 @@
+"""
+Recurrence rules for flight series.
+
+Expands the subset of RFC 5545 RRULE used to plan recurring flights:
+FREQ (DAILY, WEEKLY, MONTHLY), INTERVAL, COUNT, UNTIL and BYDAY (weekdays
+without ordinals, for DAILY and WEEKLY), e.g. "FREQ=WEEKLY;BYDAY=SA,SU;COUNT=8".
+Occurrences keep the wall-clock time of the first one in the given timezone,
+so a 09:00 departure stays at 09:00 local time across DST changes.
+"""
+import contextlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Optional
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+@dataclass
+class Recurrence:
+    """A parsed recurrence rule."""
+    freq: str
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+    by_day: list[int] = field(default_factory=list)  # Weekdays, Monday is 0
+
+
+def _parse_until(value: str) -> datetime:
+    """UNTIL as an aware datetime: YYYYMMDD (end of that day, UTC) or YYYYMMDDTHHMMSSZ."""
+    if len(value) == 8:
+        return datetime.combine(datetime.strptime(value, "%Y%m%d").date(), time.max, timezone.utc)
+    return datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+
+
+def parse_rrule(rule: str) -> Recurrence:
+    """
+    Parse an RRULE string (with or without the "RRULE:" prefix).
+
+    Raises:
+        ValueError: Unsupported or invalid rule, or a rule without COUNT or UNTIL
+    """
+    parts = {}
+    for part in rule.strip().removeprefix("RRULE:").split(";"):
+        if not part:
+            continue
+        name, separator, value = part.partition("=")
+        if not separator or not value:
+            raise ValueError(f"invalid rule part '{part}'")
+        parts[name.strip().upper()] = value.strip().upper()
+
+    freq = parts.pop("FREQ", None)
+    if freq not in ("DAILY", "WEEKLY", "MONTHLY"):
+        raise ValueError("FREQ must be DAILY, WEEKLY or MONTHLY")
+    recurrence = Recurrence(freq)
+    try:
+        if "INTERVAL" in parts:
+            recurrence.interval = int(parts.pop("INTERVAL"))
+        if "COUNT" in parts:
+            recurrence.count = int(parts.pop("COUNT"))
+        if "UNTIL" in parts:
+            recurrence.until = _parse_until(parts.pop("UNTIL"))
+    except ValueError as e:
+        raise ValueError(
+            "INTERVAL and COUNT must be integers, UNTIL a date (YYYYMMDD or YYYYMMDDTHHMMSSZ)"
+        ) from e
+    if "BYDAY" in parts:
+        if freq == "MONTHLY":
+            raise ValueError("BYDAY is only supported with DAILY or WEEKLY")
+        days = parts.pop("BYDAY").split(",")
+        if any(day not in WEEKDAYS for day in days):
+            raise ValueError("BYDAY must list weekdays (MO, TU, WE, TH, FR, SA, SU)")
+        recurrence.by_day = sorted({WEEKDAYS.index(day) for day in days})
+    if parts:
+        raise ValueError(f"unsupported rule parts: {', '.join(sorted(parts))}")
+
+    if recurrence.interval < 1:
+        raise ValueError("INTERVAL must be at least 1")
+    if recurrence.count is None and recurrence.until is None:
+        raise ValueError("COUNT or UNTIL is required")
+    if recurrence.count is not None and recurrence.count < 1:
+        raise ValueError("COUNT must be at least 1")
+    return recurrence
+
+
+def _dates(recurrence: Recurrence, start: date):
+    """Candidate dates of the rule from start, in order (unbounded)."""
+    period = 0
+    while True:
+        if recurrence.freq == "DAILY":
+            day = start + timedelta(days=period * recurrence.interval)
+            if not recurrence.by_day or day.weekday() in recurrence.by_day:
+                yield day
+        elif recurrence.freq == "WEEKLY":
+            week = start - timedelta(days=start.weekday()) + timedelta(weeks=period * recurrence.interval)
+            for weekday in recurrence.by_day or [start.weekday()]:
+                day = week + timedelta(days=weekday)
+                if day >= start:
+                    yield day
+        else:
+            month = start.month - 1 + period * recurrence.interval
+            # Months without this day are skipped (RFC 5545)
+            with contextlib.suppress(ValueError):
+                yield start.replace(year=start.year + month // 12, month=month % 12 + 1)
+        period += 1
+
+
+def expand(recurrence: Recurrence, start: datetime, zone: tzinfo, limit: int) -> list[datetime]:
+    """
+    Occurrences of the rule from start, as aware datetimes in zone.
+
+    start is the first candidate (naive is taken as UTC); its wall-clock time
+    in zone is kept for all occurrences.
+
+    Raises:
+        ValueError: More than limit occurrences
+    """
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    local = start.astimezone(zone)
+    wall_clock = local.time().replace(tzinfo=None)
+
+    occurrences = []
+    for day in _dates(recurrence, local.date()):
+        if recurrence.count is not None and len(occurrences) >= recurrence.count:
+            break
+        occurrence = datetime.combine(day, wall_clock, zone)
+        if recurrence.until is not None and occurrence > recurrence.until:
+            break
+        if len(occurrences) >= limit:
+            raise ValueError(f"more than {limit} occurrences")
+        occurrences.append(occurrence)
+    return occurrences
@@ -0,0 +1,81 @@
+"""
+List responses: JSON array, or NDJSON streamed row by row.
+
+Clients sending `Accept: application/x-ndjson` get one JSON entity per line
+through a StreamingResponse, serialized as rows are read from the database
+cursor, so memory stays flat and the first line is sent without waiting
+for the whole list.
+"""
+import json
+import logging
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.database.pagination import NEXT_CURSOR_HEADER, Page
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Check if the client asked for NDJSON in the Accept header."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _ndjson_line(item: dict[str, Any]) -> str:
+    """Serialize one entity as an NDJSON line (same separators as JSONResponse)."""
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+async def _ndjson_lines(first: Optional[dict[str, Any]], items: AsyncIterator[dict[str, Any]]) -> AsyncIterator[str]:
+    """Yield NDJSON lines for the first entity and the rest of the stream."""
+    if first is None:
+        return
+    yield _ndjson_line(first)
+    try:
+        async for item in items:
+            yield _ndjson_line(item)
+    except Exception:
+        # Headers are already sent: the truncated body is all the client sees
+        logger.exception("Error while streaming list response")
+        raise
+
+
+async def list_response(
+    request: Request,
+    response: Response,
+    items: AsyncIterator[dict[str, Any]],
+    page: Page,
+    etag: Optional[str] = None,
+) -> list[dict[str, Any]] | StreamingResponse:
+    """
+    Build a list endpoint response from a stream of serialized entities.
+
+    Args:
+        request: Request (Accept header selects NDJSON)
+        response: Response (receives the next page cursor header)
+        items: Entities as JSON dicts, lazily read from the database
+        page: Keyset page the items were read with
+        etag: List validator, sent with the streamed response
+
+    Returns:
+        JSON list, or a StreamingResponse of NDJSON lines
+    """
+    if not wants_ndjson(request):
+        result = [item async for item in items]
+        page.set_headers(response)
+        return result
+
+    # Headers go out before the body: resolve the next page cursor up front,
+    # and read the first entity so errors still produce a proper status.
+    page.look_ahead = True
+    first = await anext(items, None)
+    headers = {}
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if etag:
+        headers["ETag"] = etag
+    return StreamingResponse(_ndjson_lines(first, items), media_type=NDJSON_MEDIA_TYPE, headers=headers)
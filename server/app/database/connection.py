@@ -1,39 +1,82 @@
 """
 Database connection and session management.
 
-Uses SQLAlchemy Core with async aiomysql driver.
+Uses SQLAlchemy Core with async aiomysql driver, or aiosqlite (DB_BACKEND=sqlite,
+see app/database/dialect.py). SQLite databases use WAL journaling, so reads
+do not wait for writes, and enforce foreign keys (ON DELETE CASCADE).
+
+Read replicas (DB_REPLICA_URLS) serve the GET routes through get_read_db:
+replicas are taken round-robin, one that cannot be connected to is skipped
+for DB_REPLICA_RETRY_INTERVAL seconds, and without a reachable replica reads
+go to the primary. For read-your-writes, a request that may write (any method
+but GET/HEAD/OPTIONS) sets a cookie sending the client's reads to the primary
+for the next DB_REPLICA_STICKY_SECONDS, while the replicas catch up.
+
+With DB_SHARDS, sessions are opened on the shard of the request's airline
+(see app/database/sharding.py); replicas are those of the default database.
 """
+import logging
 import os
+import time
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
 )
 from sqlalchemy.pool import NullPool
 
 from app.config import settings
+from app.database.sharding import DEFAULT_SHARD, ShardDirectory
 
+logger = logging.getLogger(__name__)
 
 # Use NullPool for testing to avoid event loop issues
 # NullPool creates a new connection for each request (no pooling)
 _is_testing = os.environ.get("PYTEST_CURRENT_TEST") is not None
 
-if _is_testing:
-    # Testing: disable pooling to avoid event loop conflicts
-    engine = create_async_engine(
-        settings.get_database_url(),
-        poolclass=NullPool,
-        echo=settings.DEBUG,
-    )
-else:
-    # Production: use connection pooling
-    engine = create_async_engine(
-        settings.get_database_url(),
-        pool_pre_ping=True,  # Verify connections before using
-        pool_size=10,  # Connection pool size
-        max_overflow=20,
-        echo=settings.DEBUG,  # Log SQL queries in debug mode
-    )
+
+def _sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    if _is_testing:
+        # Testing: disable pooling to avoid event loop conflicts
+        new_engine = create_async_engine(
+            url,
+            poolclass=NullPool,
+            echo=settings.DEBUG,
+        )
+    else:
+        # Production: use connection pooling
+        new_engine = create_async_engine(
+            url,
+            pool_pre_ping=True,  # Verify connections before using
+            pool_size=10,  # Connection pool size
+            max_overflow=20,
+            echo=settings.DEBUG,  # Log SQL queries in debug mode
+        )
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _sqlite_pragmas)
+    return new_engine
+
+
+if settings.DB_BACKEND == "sqlite":
+    settings.DB_SQLITE_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+
+engine = _create_engine(settings.get_database_url())
 
 # Session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -42,8 +85,122 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Shards: the default database and DB_SHARDS, by name
+shard_engines: dict[str, AsyncEngine] = {
+    DEFAULT_SHARD: engine,
+    **{name: _create_engine(url) for name, url in settings.shard_urls.items()},
+}
+shard_sessions: dict[str, async_sessionmaker] = {
+    name: AsyncSessionLocal if shard_engine is engine
+    else async_sessionmaker(shard_engine, class_=AsyncSession, expire_on_commit=False)
+    for name, shard_engine in shard_engines.items()
+}
+shard_directory = ShardDirectory(shard_sessions, settings.DB_SHARD_MAP_TTL, settings.DB_SHARD_MISS_TTL)
 
-async def get_db() -> AsyncSession:
+# Cookie holding the time (unix) until which the client reads from the primary
+READ_PRIMARY_COOKIE = "ffb_read_primary"
+_SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReplicaSet:
+    """Read replica engines, taken round-robin, skipping recently unreachable ones."""
+
+    def __init__(self, engines: list[AsyncEngine], retry_interval: float):
+        self.engines = engines
+        self.retry_interval = retry_interval
+        self._next = 0
+        self._down_until: dict[int, float] = {}
+
+    def candidates(self) -> list[AsyncEngine]:
+        """Replicas to try for a session, in order: the next one in turn first, unreachable ones left out."""
+        if not self.engines:
+            return []
+        start = self._next
+        self._next = (start + 1) % len(self.engines)
+        now = time.monotonic()
+        ordered = self.engines[start:] + self.engines[:start]
+        return [replica for replica in ordered if self._down_until.get(id(replica), 0) <= now]
+
+    def mark_down(self, replica: AsyncEngine) -> None:
+        """Skip a replica for retry_interval seconds."""
+        self._down_until[id(replica)] = time.monotonic() + self.retry_interval
+
+    async def dispose(self) -> None:
+        for replica in self.engines:
+            await replica.dispose()
+
+
+replicas = ReplicaSet(
+    [_create_engine(url) for url in settings.replica_urls],
+    settings.DB_REPLICA_RETRY_INTERVAL,
+)
+
+
+async def dispose_engines() -> None:
+    """Close the connection pools of all shards and replicas."""
+    for shard_engine in shard_engines.values():
+        await shard_engine.dispose()
+    await replicas.dispose()
+
+
+async def request_shard(request: Request) -> str:
+    """
+    Shard of a request: of the airline in its path, else of its ticket
+    (public boarding pass routes), else the default database.
+
+    Raises:
+        HTTPException: 503 for a write to an airline being moved between shards
+    """
+    if not shard_directory.enabled:
+        return DEFAULT_SHARD
+    shard = getattr(request.state, "shard", None)
+    if shard is not None:
+        return shard
+    shard = DEFAULT_SHARD
+    airline_identifier = request.path_params.get("airline_identifier")
+    ticket_identifier = request.path_params.get("ticket_identifier") or request.query_params.get("ticket")
+    if airline_identifier is not None:
+        airline = await shard_directory.airline_shard(airline_identifier)
+        if airline.moving and request.method not in _SAFE_METHODS:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Airline data is being moved, retry shortly",
+                headers={"Retry-After": str(max(1, int(settings.DB_SHARD_MAP_TTL)))},
+            )
+        shard = airline.shard
+    elif ticket_identifier:
+        shard = await shard_directory.ticket_shard(ticket_identifier)
+    request.state.shard = shard
+    return shard
+
+
+def _reads_from_primary(request: Request) -> bool:
+    """Whether the client wrote recently (see READ_PRIMARY_COOKIE)."""
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def _replica_session(request: Request) -> Optional[AsyncSession]:
+    """A session connected to a reachable replica, or None to read from the primary."""
+    if _reads_from_primary(request):
+        return None
+    for replica in replicas.candidates():
+        session = AsyncSession(replica, expire_on_commit=False)
+        try:
+            await session.connection()
+        except (DBAPIError, OSError) as e:
+            await session.close()
+            replicas.mark_down(replica)
+            logger.warning("Read replica %s unreachable, skipped for %ss: %s",
+                           replica.url.render_as_string(hide_password=True), replicas.retry_interval, e)
+            continue
+        return session
+    return None
+
+
+async def get_db(request: Request, response: Response) -> AsyncSession:
     """
     FastAPI dependency for database sessions.
 
@@ -52,9 +209,27 @@ async def get_db() -> AsyncSession:
         async def endpoint(db: AsyncSession = Depends(get_db)):
             ...
     """
-    async with AsyncSessionLocal() as session:
+    shard = await request_shard(request)
+    if replicas.engines and shard == DEFAULT_SHARD and request.method not in _SAFE_METHODS:
+        sticky = settings.DB_REPLICA_STICKY_SECONDS
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, str(int(time.time() + sticky) + 1), max_age=int(sticky) + 1, httponly=True
+        )
+    async with shard_sessions[shard]() as session:
         try:
             yield session
         finally:
             await session.close()
 
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    FastAPI dependency for read-only database sessions: on a replica when
+    configured (see module docstring), else on the primary of the request's shard.
+    """
+    shard = await request_shard(request)
+    session = (await _replica_session(request) if shard == DEFAULT_SHARD else None) or shard_sessions[shard]()
+    try:
+        yield session
+    finally:
+        await session.close()
@@ -0,0 +1,204 @@
+"""
+Remove duplicate tickets and merge duplicate passengers.
+
+Before issue_ticket upserted on (flight_id, passenger_id), concurrent issues
+could add a passenger twice to a flight; before passenger identifiers were
+name-based, creating a passenger again for the same contact added another
+row. The unique indexes of migrations 5 and 6 cannot be built over those
+duplicates, and the migrations are skipped while any remain (they never
+delete data). This job removes them, logging the deleted rows to Deletions
+for delta sync. Review what it would do, then run it, after the other
+migrations are applied (migration 6 adds the column passengers are matched on):
+    python -m app.database.dedup --dry-run
+    python -m app.database.dedup
+or POST /api/v1/admin/dedup?dry_run=true (system auth). Then migrate again.
+"""
+import asyncio
+import sys
+
+from sqlalchemy import and_, case, delete, insert, literal, select, update, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database.snapshots import rewrite_snapshots
+from app.database.stats import refresh_stats, remove_stats
+from app.database.tables import deletions, flights, passengers, tickets
+from app.database.versions import bump_list_version
+
+# Duplicate passengers merged per transaction
+DEDUP_BATCH_SIZE = 500
+
+
+async def find_duplicate_tickets(conn: AsyncConnection) -> list[int]:
+    """Ids of the tickets of a passenger on a flight after their first one."""
+    first, later = tickets.alias("first"), tickets.alias("later")
+    result = await conn.execute(
+        select(later.c.ticket_id).distinct().join(
+            first,
+            (first.c.flight_id == later.c.flight_id)
+            & (first.c.passenger_id == later.c.passenger_id)
+            & (first.c.ticket_id < later.c.ticket_id),
+        )
+    )
+    return list(result.scalars())
+
+
+async def remove_duplicate_tickets(conn: AsyncConnection, dry_run: bool = False) -> int:
+    """
+    Keep the first ticket of each passenger on a flight, so the unique index
+    of migration 5 can be built. Removed tickets are logged to Deletions.
+
+    Returns:
+        Number of tickets removed (or to remove, with dry_run)
+    """
+    duplicates = await find_duplicate_tickets(conn)
+    if dry_run or not duplicates:
+        return len(duplicates)
+    condition = tickets.c.ticket_id.in_(duplicates)
+    rows = (await conn.execute(
+        select(tickets.c.airline_id, tickets.c.flight_id, tickets.c.passenger_id).where(condition)
+    )).all()
+    await _log_deletions(conn, tickets, condition)
+    await conn.execute(delete(tickets).where(condition))
+    await refresh_stats(conn, flights, {row.flight_id for row in rows})
+    await refresh_stats(conn, passengers, {row.passenger_id for row in rows})
+    for airline_id in sorted({row.airline_id for row in rows}):
+        await bump_list_version(conn, airline_id)
+    await conn.commit()
+    return len(duplicates)
+
+
+async def _duplicates(conn: AsyncConnection) -> dict[int, int]:
+    """Map each duplicate passenger_id to the passenger_id it merges into."""
+    first = (
+        select(
+            passengers.c.airline_id,
+            passengers.c.apple_identifier,
+            sql_func.min(passengers.c.passenger_id).label("keep_id"),
+        )
+        .where(passengers.c.apple_identifier.is_not(None))
+        .group_by(passengers.c.airline_id, passengers.c.apple_identifier)
+        .having(sql_func.count() > 1)
+        .subquery()
+    )
+    query = select(passengers.c.passenger_id, first.c.keep_id).join(
+        first,
+        and_(
+            passengers.c.airline_id == first.c.airline_id,
+            passengers.c.apple_identifier == first.c.apple_identifier,
+            passengers.c.passenger_id != first.c.keep_id,
+        ),
+    )
+    return {row.passenger_id: row.keep_id for row in await conn.execute(query)}
+
+
+async def _log_deletions(conn: AsyncConnection, table, condition) -> None:
+    """Write tombstones for the rows of table matching condition (see sync)."""
+    identifier_column = table.c[f"{table.name[:-1].lower()}_identifier"]
+    await conn.execute(
+        insert(deletions).from_select(
+            ["airline_id", "table_name", "identifier"],
+            select(table.c.airline_id, literal(table.name), identifier_column).where(condition),
+        )
+    )
+
+
+async def _merge_batch(conn: AsyncConnection, merge: dict[int, int]) -> None:
+    """Merge one batch of duplicate passengers into the passengers they map to."""
+    keep_ids = set(merge.values())
+    rows = (await conn.execute(
+        select(tickets.c.ticket_id, tickets.c.flight_id, tickets.c.passenger_id)
+        .where(tickets.c.passenger_id.in_([*merge, *keep_ids]))
+        .order_by(tickets.c.ticket_id)
+    )).all()
+
+    # One ticket per passenger and flight: the kept passenger's, else the first duplicate's
+    kept = {(row.flight_id, row.passenger_id) for row in rows if row.passenger_id in keep_ids}
+    moved, dropped = [], []
+    dropped_flights = set()
+    for row in rows:
+        if row.passenger_id in keep_ids:
+            continue
+        key = (row.flight_id, merge[row.passenger_id])
+        if key in kept:
+            dropped.append(row.ticket_id)
+            dropped_flights.add(row.flight_id)
+        else:
+            kept.add(key)
+            moved.append(row.ticket_id)
+
+    if dropped:
+        condition = tickets.c.ticket_id.in_(dropped)
+        await _log_deletions(conn, tickets, condition)
+        await conn.execute(delete(tickets).where(condition))
+        await refresh_stats(conn, flights, dropped_flights)
+
+    if moved:
+        condition = tickets.c.ticket_id.in_(moved)
+        await conn.execute(
+            update(tickets)
+            .where(condition)
+            .values(passenger_id=case(merge, value=tickets.c.passenger_id))
+        )
+        # Refresh the passenger copied into the ticket
+        await rewrite_snapshots(conn, passengers, condition)
+
+    condition = passengers.c.passenger_id.in_(list(merge))
+    airline_ids = list((await conn.execute(select(passengers.c.airline_id).distinct().where(condition))).scalars())
+    await _log_deletions(conn, passengers, condition)
+    await remove_stats(conn, passengers, condition)
+    await conn.execute(delete(passengers).where(condition))
+    await refresh_stats(conn, passengers, keep_ids)
+    for airline_id in sorted(airline_ids):
+        await bump_list_version(conn, airline_id)
+
+
+async def merge_duplicate_passengers(
+    conn: AsyncConnection, batch_size: int = DEDUP_BATCH_SIZE, dry_run: bool = False
+) -> int:
+    """
+    Merge passengers sharing an (airline_id, apple_identifier).
+
+    Tickets move to the first passenger (lowest passenger_id); when both had
+    a ticket on the same flight, the kept passenger's ticket stays and the
+    other is deleted. Deleted tickets and passengers are logged to Deletions.
+    Commits after each batch of batch_size duplicates.
+
+    Returns:
+        Number of passengers merged (or to merge, with dry_run)
+    """
+    duplicates = list((await _duplicates(conn)).items())
+    if dry_run:
+        return len(duplicates)
+    for start in range(0, len(duplicates), batch_size):
+        await _merge_batch(conn, dict(duplicates[start:start + batch_size]))
+        await conn.commit()
+    return len(duplicates)
+
+
+async def deduplicate(conn: AsyncConnection, dry_run: bool = False) -> dict[str, int]:
+    """
+    Remove duplicate tickets, then merge duplicate passengers.
+
+    Returns:
+        Number of tickets removed and passengers merged (or to, with dry_run)
+    """
+    return {
+        "tickets": await remove_duplicate_tickets(conn, dry_run),
+        "passengers": await merge_duplicate_passengers(conn, dry_run=dry_run),
+    }
+
+
+async def _main(dry_run: bool) -> None:
+    from app.database.connection import dispose_engines, shard_engines
+
+    for shard, engine in shard_engines.items():
+        async with engine.connect() as conn:
+            counts = await deduplicate(conn, dry_run)
+        action = "Would remove" if dry_run else "Removed"
+        print(f"{shard}: {action} {counts['tickets']} duplicate tickets, "
+              f"{'would merge' if dry_run else 'merged'} {counts['passengers']} duplicate passengers")
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main("--dry-run" in sys.argv[1:]))
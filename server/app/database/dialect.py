@@ -0,0 +1,47 @@
+"""
+Database dialect differences.
+
+The server runs on MySQL (aiomysql), or on SQLite (aiosqlite, DB_BACKEND=sqlite)
+for single-node installs and tests. Queries are written once with SQLAlchemy
+Core; the statements that differ go through here.
+
+Upserts are INSERT ... ON DUPLICATE KEY UPDATE on MySQL and INSERT ... ON
+CONFLICT DO UPDATE without a conflict target on SQLite, so that on both a
+row matching any unique key is updated. Column onupdate defaults do not
+apply to those updates (and tables created from tables.py have no ON UPDATE
+CURRENT_TIMESTAMP), so a `modified` column is set explicitly.
+"""
+from typing import Any, Iterable
+
+from sqlalchemy import Table, func as sql_func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
+
+
+def dialect_name(db: Session | AsyncSession | AsyncConnection) -> str:
+    """Dialect of a session's or connection's database ("mysql" or "sqlite")."""
+    if isinstance(db, AsyncConnection):
+        return db.dialect.name
+    return db.get_bind().dialect.name
+
+
+def insert_or_update(
+    db: Session | AsyncSession | AsyncConnection, table: Table, update: Iterable[str], **values: Any
+) -> Insert:
+    """
+    INSERT into table that, for a row already matching a unique key, sets the
+    update columns to the inserted values instead (plus values, as given, and
+    modified to now if the table has it).
+
+    Add rows with .values() or .from_select().
+    """
+    if "modified" in table.c:
+        values = {"modified": sql_func.now(), **values}
+    if dialect_name(db) == "sqlite":
+        stmt = sqlite_insert(table)
+        return stmt.on_conflict_do_update(set_={**{name: stmt.excluded[name] for name in update}, **values})
+    stmt = mysql_insert(table)
+    return stmt.on_duplicate_key_update({**{name: stmt.inserted[name] for name in update}, **values})
@@ -0,0 +1,73 @@
+"""
+Flight date and airport filters.
+
+Applied to the generated scheduled_departure / origin_icao / destination_icao
+columns of Flights and Tickets, so filtered lists are index range scans on
+(airline_id, [origin_icao | destination_icao,] scheduled_departure).
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import ScalarSelect, Table, select, func as sql_func
+
+
+def departure_key(value: datetime) -> str:
+    """
+    Format a departure date as stored in scheduled_departure (UTC, 'YYYY-MM-DDTHH:MM:SS').
+
+    Naive datetimes are taken as UTC.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class FlightFilter:
+    """Filters on departure date range and origin/destination airport."""
+
+    def __init__(
+        self,
+        departure_from: Optional[datetime] = None,
+        departure_to: Optional[datetime] = None,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        upcoming: bool = False,
+    ):
+        self.departure_from = departure_key(departure_from) if departure_from else None
+        self.upcoming = upcoming
+        if upcoming:
+            # Keys are fixed-width, so they compare as the dates do
+            now = departure_key(datetime.now(timezone.utc))
+            self.departure_from = max(self.departure_from, now) if self.departure_from else now
+        self.departure_to = departure_key(departure_to) if departure_to else None
+        self.origin = origin.upper() if origin else None
+        self.destination = destination.upper() if destination else None
+
+    def conditions(self, table: Table) -> tuple:
+        """Where conditions for Flights or Tickets."""
+        conditions = []
+        if self.departure_from:
+            conditions.append(table.c.scheduled_departure >= self.departure_from)
+        if self.departure_to:
+            conditions.append(table.c.scheduled_departure < self.departure_to)
+        if self.origin:
+            conditions.append(table.c.origin_icao == self.origin)
+        if self.destination:
+            conditions.append(table.c.destination_icao == self.destination)
+        return tuple(conditions)
+
+    def etag_part(self, table: Table, airline_id: int) -> Optional[ScalarSelect]:
+        """
+        What the list depends on beyond its query string, for list_etag().
+
+        An upcoming list starts now, which moves every second, but its rows
+        only change when a flight departs: the first departure it shows
+        stands for now.
+        """
+        if not self.upcoming:
+            return None
+        return (
+            select(sql_func.min(table.c.scheduled_departure))
+            .where(table.c.airline_id == airline_id, *self.conditions(table))
+            .scalar_subquery()
+        )
@@ -0,0 +1,317 @@
+"""
+Schema migrations.
+
+The PHP backend may still run against the same database, so migrations are
+additive only (indexes, new tables, generated columns): existing tables and
+columns keep their shape, except the generated columns added here. Applied
+versions are recorded in SchemaMigrations. An empty database (a new SQLite
+file or shard) gets the whole schema from tables.py instead, with every
+migration recorded as applied.
+
+Migrations change the schema and derived data (stats) only, never delete
+rows: a unique index that duplicates prevent is skipped (MigrationBlocked)
+until they are removed by app/database/dedup.py, run explicitly.
+
+Applied at startup unless DB_AUTO_MIGRATE is off. Run by hand with:
+    python -m app.database.migrations
+or POST /api/v1/admin/migrate (system auth).
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Callable, Union
+
+from sqlalchemy import Column, Index, Table, inspect, insert, literal, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.schema import CreateColumn
+
+from app.database import tables
+from app.database.dedup import find_duplicate_tickets, merge_duplicate_passengers
+from app.database.sharding import DEFAULT_SHARD
+from app.database.stats import reconcile_stats
+
+logger = logging.getLogger(__name__)
+
+_DEDUP_HINT = "review with `python -m app.database.dedup --dry-run`, then run it without --dry-run"
+
+# A migration step: a SQLAlchemy Index, Table or Column from tables.py (created if
+# missing), raw SQL, a callable receiving the connection, or DefaultDatabaseOnly
+Step = Union[Index, Table, Column, str, Callable, "DefaultDatabaseOnly"]
+
+
+@dataclass
+class DefaultDatabaseOnly:
+    """A step applied to the default database only, not to the other shards (e.g. the shard directory)."""
+    step: Step
+
+
+class MigrationBlocked(Exception):
+    """A migration cannot be applied until data is cleaned up (by an explicit job)."""
+
+
+# Migration building the unique (flight_id, passenger_id) index on Tickets
+UNIQUE_TICKETS_MIGRATION = 5
+
+# (database URL, version) of migrations known to be applied: they stay applied
+_applied: set[tuple[str, int]] = set()
+
+
+async def _require_unique_tickets(conn: AsyncConnection) -> None:
+    """Refuse the unique (flight_id, passenger_id) index while duplicate tickets remain."""
+    count = len(await find_duplicate_tickets(conn))
+    if count:
+        raise MigrationBlocked(f"{count} duplicate tickets: {_DEDUP_HINT}")
+
+
+async def _require_unique_passengers(conn: AsyncConnection) -> None:
+    """Refuse the unique (airline_id, apple_identifier) index while duplicate passengers remain."""
+    count = await merge_duplicate_passengers(conn, dry_run=True)
+    if count:
+        raise MigrationBlocked(f"{count} duplicate passengers: {_DEDUP_HINT}")
+
+
+async def _pin_airlines(conn: AsyncConnection) -> None:
+    """
+    Record the existing airlines in ShardMap as in the default database, so their
+    shard lookups can be cached. Default database only: its ShardMap is the one read.
+    """
+    await conn.execute(
+        insert(tables.shard_map).from_select(
+            ["airline_identifier", "shard"],
+            select(tables.airlines.c.airline_identifier, literal(DEFAULT_SHARD)),
+        )
+    )
+
+
+async def _normalize_departures(conn: AsyncConnection) -> None:
+    """
+    Redefine the scheduled_departure columns of migration 2 as UTC.
+
+    They held the first 19 characters of scheduledDepartureDate, the local
+    time of rows written with an offset. A generated column cannot be
+    altered on SQLite: its indexes and the column are dropped and created again.
+    """
+    for table in (tables.flights, tables.tickets):
+        indexes = [index for index in table.indexes if "scheduled_departure" in index.columns]
+        for index in indexes:
+            await conn.run_sync(lambda sync_conn, index=index: index.drop(sync_conn, checkfirst=True))
+        await conn.run_sync(_drop_column, table.c.scheduled_departure)
+        await conn.run_sync(_add_column, table.c.scheduled_departure)
+        for index in indexes:
+            await conn.run_sync(lambda sync_conn, index=index: index.create(sync_conn, checkfirst=True))
+
+
+# (version, description, steps), in order. Never edit an applied migration: add a new one.
+MIGRATIONS: list[tuple[int, str, list[Step]]] = [
+    (
+        1,
+        "Keyset pagination indexes on (airline_id, modified)",
+        [
+            tables.ix_aircrafts_airline_modified,
+            tables.ix_passengers_airline_modified,
+            tables.ix_flights_airline_modified,
+            tables.ix_tickets_airline_modified,
+        ],
+    ),
+    (
+        2,
+        "Generated departure/origin/destination columns and indexes on Flights and Tickets",
+        [
+            tables.flights.c.scheduled_departure,
+            tables.flights.c.origin_icao,
+            tables.flights.c.destination_icao,
+            tables.tickets.c.scheduled_departure,
+            tables.tickets.c.origin_icao,
+            tables.tickets.c.destination_icao,
+            tables.ix_flights_airline_departure,
+            tables.ix_flights_airline_origin,
+            tables.ix_flights_airline_destination,
+            tables.ix_tickets_airline_departure,
+            tables.ix_tickets_airline_origin,
+            tables.ix_tickets_airline_destination,
+        ],
+    ),
+    (
+        3,
+        "Deletions log for delta sync",
+        [
+            tables.deletions,
+        ],
+    ),
+    (
+        4,
+        "Materialized entity stats",
+        [
+            tables.entity_stats,
+            reconcile_stats,
+        ],
+    ),
+    (
+        UNIQUE_TICKETS_MIGRATION,
+        "Unique (flight_id, passenger_id) index on Tickets",
+        [
+            _require_unique_tickets,
+            tables.ux_tickets_flight_passenger,
+        ],
+    ),
+    (
+        6,
+        "Unique (airline_id, apple_identifier) index on Passengers",
+        [
+            tables.passengers.c.apple_identifier,
+            _require_unique_passengers,
+            tables.ux_passengers_airline_apple,
+        ],
+    ),
+    (
+        7,
+        "Shard directory (ShardMap, TicketDirectory)",
+        [
+            tables.shard_map,
+            tables.ticket_directory,
+            DefaultDatabaseOnly(_pin_airlines),
+        ],
+    ),
+    (
+        8,
+        "List versions for list ETags",
+        [
+            tables.list_versions,
+        ],
+    ),
+    (
+        9,
+        "scheduled_departure of Flights and Tickets converted to UTC",
+        [
+            _normalize_departures,
+        ],
+    ),
+]
+
+_CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS SchemaMigrations (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def _add_column(sync_conn, column: Column) -> None:
+    """Add a column defined in tables.py to its existing table, unless present."""
+    existing = {c["name"] for c in inspect(sync_conn).get_columns(column.table.name)}
+    if column.name in existing:
+        return
+    ddl = CreateColumn(column).compile(dialect=sync_conn.dialect)
+    table_name = sync_conn.dialect.identifier_preparer.quote(column.table.name)
+    sync_conn.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {ddl}")
+
+
+def _drop_column(sync_conn, column: Column) -> None:
+    """Drop a column of its existing table, if present."""
+    existing = {c["name"] for c in inspect(sync_conn).get_columns(column.table.name)}
+    if column.name not in existing:
+        return
+    preparer = sync_conn.dialect.identifier_preparer
+    sync_conn.exec_driver_sql(
+        f"ALTER TABLE {preparer.quote(column.table.name)} DROP COLUMN {preparer.quote(column.name)}"
+    )
+
+
+async def _apply_step(conn: AsyncConnection, step: Step, shard: str) -> None:
+    """Apply one migration step to the database of shard."""
+    if isinstance(step, DefaultDatabaseOnly):
+        if shard == DEFAULT_SHARD:
+            await _apply_step(conn, step.step, shard)
+    elif isinstance(step, (Index, Table)):
+        await conn.run_sync(lambda sync_conn: step.create(sync_conn, checkfirst=True))
+    elif isinstance(step, Column):
+        await conn.run_sync(_add_column, step)
+    elif isinstance(step, str):
+        await conn.execute(text(step))
+    else:
+        await step(conn)
+
+
+async def applied_versions(conn: AsyncConnection) -> set[int]:
+    """Get the versions already applied."""
+    await conn.execute(text(_CREATE_MIGRATIONS_TABLE))
+    result = await conn.execute(text("SELECT version FROM SchemaMigrations"))
+    return {row.version for row in result}
+
+
+async def is_applied(engine: AsyncEngine, version: int) -> bool:
+    """
+    Check whether a migration has been applied to the database of engine.
+
+    For writes relying on a unique index that a blocked migration has not
+    built yet. Checked on a connection of its own (no SchemaMigrations table
+    means not applied), and cached once applied.
+    """
+    key = (str(engine.url), version)
+    if key in _applied:
+        return True
+    try:
+        async with engine.connect() as conn:
+            applied = (await conn.execute(
+                text("SELECT version FROM SchemaMigrations WHERE version = :version"), {"version": version}
+            )).first() is not None
+    except DBAPIError:
+        return False
+    if applied:
+        _applied.add(key)
+    return applied
+
+
+async def migrate(conn: AsyncConnection, shard: str = DEFAULT_SHARD) -> list[int]:
+    """
+    Apply pending migrations in order, to the database of shard.
+
+    Each migration is recorded as soon as it is applied (MySQL DDL is not
+    transactional), so a failed run can simply be started again. A blocked
+    migration is logged and left pending (retried by the next run); the
+    following ones are still applied.
+
+    Returns:
+        Versions applied by this run
+    """
+    done = await applied_versions(conn)
+    bootstrap = not done and not await conn.run_sync(
+        lambda sync_conn: inspect(sync_conn).has_table(tables.airlines.name)
+    )
+    if bootstrap:
+        await conn.run_sync(tables.metadata.create_all)
+    applied = []
+    for version, description, steps in MIGRATIONS:
+        if version in done:
+            continue
+        if not bootstrap:
+            try:
+                for step in steps:
+                    await _apply_step(conn, step, shard)
+            except MigrationBlocked as e:
+                await conn.rollback()
+                logger.warning("Migration %s (%s) not applied, %s", version, description, e)
+                continue
+        await conn.execute(
+            text("INSERT INTO SchemaMigrations (version, description) VALUES (:version, :description)"),
+            {"version": version, "description": description},
+        )
+        await conn.commit()
+        applied.append(version)
+    return applied
+
+
+async def _main() -> None:
+    from app.database.connection import dispose_engines, shard_engines
+
+    for shard, engine in shard_engines.items():
+        async with engine.connect() as conn:
+            applied = await migrate(conn, shard)
+        print(f"{shard}: " + (f"Applied migrations: {applied}" if applied else "Schema up to date"))
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,116 @@
+"""
+Keyset pagination over (modified, id).
+
+List endpoints accept `limit` and `after`; `after` is the opaque cursor
+returned in the X-Next-Cursor header of the previous page. Rows are read
+in (modified, id) order from a server-side cursor, so pages stay stable
+while rows are added and no page loads more than `limit` + 1 rows.
+"""
+import base64
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi import Response
+from sqlalchemy import Column, Select, Table, select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+
+# Rows fetched per round trip from server-side cursors
+YIELD_PER = 500
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(modified: datetime, entity_id: int) -> str:
+    """Encode the (modified, id) key of a row as an opaque cursor."""
+    raw = f"{modified.isoformat()}|{entity_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        modified, entity_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(modified), int(entity_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class Page:
+    """
+    A keyset page request, and the cursor to the next page once read.
+
+    Without a limit the whole list is returned (still streamed in order).
+    """
+
+    def __init__(self, limit: Optional[int] = None, after: Optional[str] = None):
+        self.limit = limit
+        self.after = decode_cursor(after) if after else None
+        self.next_cursor: Optional[str] = None
+        # Resolve next_cursor before streaming (needed when headers are sent first)
+        self.look_ahead = False
+
+    def apply(self, query: Select, modified_column: Column, id_column: Column, stream: bool = True) -> Select:
+        """
+        Restrict and order a query for this page (one extra row detects the next page).
+
+        Args:
+            stream: Read with a server-side cursor (run with db.stream())
+        """
+        if self.after is not None:
+            # Bound with the columns' types, so they compare as stored (see tables.Timestamp)
+            after = tuple_(*self.after, types=[modified_column.type, id_column.type])
+            query = query.where(tuple_(modified_column, id_column) > after)
+        query = query.order_by(modified_column, id_column)
+        if self.limit is not None:
+            query = query.limit(self.limit + 1)
+        return query.execution_options(yield_per=YIELD_PER) if stream else query
+
+    async def resolve_next_cursor(self, db: AsyncSession, table: Table, id_key: str, where: list) -> None:
+        """
+        Set next_cursor from a keys-only query, if look_ahead is requested.
+
+        Reads at most limit + 1 (modified, id) pairs, from the (airline_id, modified) index.
+        """
+        if not self.look_ahead or self.limit is None:
+            return
+        query = self.apply(
+            select(table.c.modified, table.c[id_key]).where(*where),
+            table.c.modified,
+            table.c[id_key],
+            stream=False,
+        )
+        keys = (await db.execute(query)).all()
+        if len(keys) > self.limit:
+            self.next_cursor = encode_cursor(*keys[self.limit - 1])
+
+    async def rows(self, result: AsyncResult, id_key: str) -> AsyncIterator[Row]:
+        """
+        Iterate the rows of a streamed page query, setting next_cursor if there are more.
+
+        The result is closed when iteration ends, so the connection is released
+        even if the caller stops early.
+        """
+        count = 0
+        last = None
+        try:
+            async for row in result:
+                if self.limit is not None and count == self.limit:
+                    self.next_cursor = encode_cursor(last.modified, last._mapping[id_key])
+                    break
+                count += 1
+                last = row
+                yield row
+        finally:
+            await result.close()
+
+    def set_headers(self, response: Response) -> None:
+        """Expose the next page cursor in the response headers."""
+        if self.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = self.next_cursor
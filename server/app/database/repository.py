@@ -3,13 +3,38 @@ Generic repository pattern implementing PHP MyFlyFunDb patterns.
 
 Provides CRUD operations with airline scoping.
 """
-from typing import TypeVar, Generic, Any
-from sqlalchemy import Table, select, insert, delete, func as sql_func
+from typing import TypeVar, Generic, Any, AsyncIterator, Iterator, Optional
+from sqlalchemy import Table, select, insert, delete, literal, func as sql_func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+from app.config import settings
+from app.database.dialect import dialect_name, insert_or_update
+from app.database.pagination import Page
+from app.database.stats import collect_linked, refresh_linked_stats, remove_stats
+from app.database.tables import TABLE_CONFIG, deletions, entity_stats, metadata
+from app.database.versions import list_changed
 
 T = TypeVar("T")
 
+# Added to the id of an updated row in LAST_INSERT_ID (ids are 32-bit INT), to
+# tell an update from an insert without reading the row back
+_UPDATED_ID_OFFSET = 1 << 32
+
+
+def _cascade(table: Table, condition) -> Iterator[tuple[Table, Any]]:
+    """
+    Yield (table, condition) for the rows matching condition and, recursively,
+    the rows of linked tables removed with them by ON DELETE CASCADE.
+    """
+    yield table, condition
+    singular = table.name[:-1].lower()
+    ids = select(table.c[f"{singular}_id"]).where(condition)
+    # Children linking to this table (e.g., Flights -> Tickets)
+    for child_name, config in TABLE_CONFIG.items():
+        if table.name in config.get("links", []):
+            child = metadata.tables[child_name]
+            yield from _cascade(child, child.c[f"{singular}_id"].in_(ids))
+
 
 class BaseRepository(Generic[T]):
     """
@@ -18,14 +43,34 @@ class BaseRepository(Generic[T]):
     Provides CRUD operations with airline scoping.
     """
 
+    # The table has a unique key besides the identifier (e.g. one ticket per
+    # passenger and flight): an upsert may update a row with another identifier
+    natural_key = False
+
     def __init__(self, table: Table, model_class: type[T]):
         self.table = table
         self.model_class = model_class
         self._table_name = table.name
-        # Derive column names from table name (e.g., "Aircrafts" -> "aircraft_id", "aircraft_identifier")
+        # Derive column names from table name
+        # (e.g., "Aircrafts" -> "aircraft_id", "aircraft_identifier")
         table_singular = table.name[:-1].lower()  # Remove trailing 's' and lowercase
         self._id_column = f"{table_singular}_id"
         self._identifier_column = f"{table_singular}_identifier"
+        # Foreign keys to linked tables (e.g., "Tickets" -> "passenger_id", "flight_id")
+        self._link_columns = [
+            f"{link[:-1].lower()}_id" for link in TABLE_CONFIG.get(table.name, {}).get("links", [])
+        ]
+
+    def _columns(self) -> list:
+        """Columns selected for entities: ids, links, json_data, airline_id, modified."""
+        return [
+            self.table.c[self._id_column],
+            self.table.c[self._identifier_column],
+            *(self.table.c[column] for column in self._link_columns),
+            self.table.c.json_data,
+            self.table.c.airline_id,
+            self.table.c.modified,
+        ]
 
     async def get_by_id(
         self, entity_id: int, airline_id: int, db: AsyncSession
@@ -36,14 +81,7 @@ class BaseRepository(Generic[T]):
         This matches PHP MyFlyFunDb::getXxx($id) behaviour, where routes
         sometimes pass a numeric ID instead of an identifier.
         """
-        # Explicitly select only the columns that exist in the table
-        query = select(
-            self.table.c[self._id_column],
-            self.table.c[self._identifier_column],
-            self.table.c.json_data,
-            self.table.c.airline_id,
-            self.table.c.modified,
-        ).where(
+        query = select(*self._columns()).where(
             self.table.c[self._id_column] == entity_id,
             self.table.c.airline_id == airline_id,
         )
@@ -55,14 +93,7 @@ class BaseRepository(Generic[T]):
         self, identifier: str, airline_id: int, db: AsyncSession
     ) -> T | None:
         """Get entity by identifier (scoped to airline)."""
-        # Explicitly select only the columns that exist in the table
-        query = select(
-            self.table.c[self._id_column],
-            self.table.c[self._identifier_column],
-            self.table.c.json_data,
-            self.table.c.airline_id,
-            self.table.c.modified,
-        ).where(
+        query = select(*self._columns()).where(
             self.table.c[self._identifier_column] == identifier,
             self.table.c.airline_id == airline_id,
         )
@@ -79,83 +110,136 @@ class BaseRepository(Generic[T]):
         Used for public endpoints (e.g., boarding pass display).
         Matches PHP directGet() pattern.
         """
-        # Explicitly select only the columns that exist in the table
-        query = select(
-            self.table.c[self._id_column],
-            self.table.c[self._identifier_column],
-            self.table.c.json_data,
-            self.table.c.airline_id,
-            self.table.c.modified,
-        ).where(
+        query = select(*self._columns()).where(
             self.table.c[self._identifier_column] == identifier
         )
         result = await db.execute(query)
         row = result.fetchone()
         return self._row_to_model(row) if row else None
 
+    async def stream(
+        self,
+        airline_id: int,
+        db: AsyncSession,
+        page: Optional[Page] = None,
+        where: tuple = (),
+    ) -> AsyncIterator[T]:
+        """
+        Stream entities for airline in (modified, id) order.
+
+        Rows come from a server-side cursor and are converted one at a time.
+
+        Args:
+            airline_id: Airline scope
+            db: Database session
+            page: Keyset page (limit/after); its next_cursor is set once read
+            where: Additional filter conditions (e.g. tickets of one flight)
+        """
+        async for row in self._stream_rows(airline_id, db, page, where):
+            yield self._row_to_model(row)
+
+    async def stream_json(
+        self,
+        airline_id: int,
+        db: AsyncSession,
+        page: Optional[Page] = None,
+        where: tuple = (),
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Stream the to_json() of entities for airline, as stream() does.
+
+        For list responses: rows written by the server are not validated
+        again (see BaseJsonModel.row_json).
+        """
+        async for row in self._stream_rows(airline_id, db, page, where):
+            yield self._row_json(row)
+
+    async def _stream_rows(
+        self, airline_id: int, db: AsyncSession, page: Optional[Page], where: tuple
+    ) -> AsyncIterator[Any]:
+        page = page or Page()
+        conditions = [self.table.c.airline_id == airline_id, *where]
+        await page.resolve_next_cursor(db, self.table, self._id_column, conditions)
+        query = select(*self._columns()).where(*conditions)
+        query = page.apply(query, self.table.c.modified, self.table.c[self._id_column])
+        result = await db.stream(query)
+        async for row in page.rows(result, self._id_column):
+            yield row
+
     async def list_all(
-        self, airline_id: int, db: AsyncSession
+        self, airline_id: int, db: AsyncSession, page: Optional[Page] = None
     ) -> list[T]:
-        """List all entities for airline."""
-        # Explicitly select only the columns that exist in the table
-        query = select(
-            self.table.c[self._id_column],
-            self.table.c[self._identifier_column],
-            self.table.c.json_data,
-            self.table.c.airline_id,
-            self.table.c.modified,
-        ).where(
-            self.table.c.airline_id == airline_id
-        )
-        result = await db.execute(query)
-        return [self._row_to_model(row) for row in result.fetchall()]
-
-    async def list_with_stats(
-        self, airline_id: int, db: AsyncSession, join_tables: list[Table]
-    ) -> list[dict[str, Any]]:
+        """List all entities for airline (or one keyset page of them)."""
+        return [entity async for entity in self.stream(airline_id, db, page)]
+
+    async def stream_with_stats(
+        self,
+        airline_id: int,
+        db: AsyncSession,
+        join_tables: list[Table],
+        page: Optional[Page] = None,
+        where: tuple = (),
+    ) -> AsyncIterator[dict[str, Any]]:
         """
-        List entities with COUNT and MAX(modified) stats from related tables.
+        Stream entities with COUNT and MAX(modified) stats from related tables.
 
-        Matches PHP listStats() pattern.
+        Matches PHP listStats() pattern. Stats are read from EntityStats by
+        primary key (see app/database/stats.py), no GROUP BY. Rows are in
+        (modified, id) order, read from a server-side cursor.
         """
+        page = page or Page()
         table_ref = self.table
-        # Explicitly select only the columns that exist in the table
-        select_cols = [
-            table_ref.c[self._id_column],
-            table_ref.c[self._identifier_column],
-            table_ref.c.json_data,
-            table_ref.c.airline_id,
-            table_ref.c.modified,
-        ]
+        select_cols = self._columns()
 
         joins = []
         for join_table in join_tables:
-            # Derive join column name (e.g., "Aircrafts" -> "aircraft_id")
-            join_table_singular = join_table.name[:-1].lower()
-            join_id = f"{join_table_singular}_id"
             count_alias = f"{join_table.name.lower()}_count"
             last_alias = f"{join_table.name.lower()}_last"
+            stats = entity_stats.alias(f"{join_table.name.lower()}_stats")
 
             select_cols.extend([
-                sql_func.count(join_table.c[join_id]).label(count_alias),
-                sql_func.max(join_table.c.modified).label(last_alias),
+                sql_func.coalesce(stats.c.related_count, 0).label(count_alias),
+                stats.c.related_last.label(last_alias),
             ])
-            joins.append(
-                (join_table, table_ref.c[self._id_column] == join_table.c[join_id])
-            )
+            joins.append((
+                stats,
+                (stats.c.table_name == table_ref.name)
+                & (stats.c.entity_id == table_ref.c[self._id_column])
+                & (stats.c.related == join_table.name),
+            ))
 
         query = select(*select_cols).select_from(table_ref)
-        for join_table, condition in joins:
-            query = query.outerjoin(join_table, condition)
+        for stats, condition in joins:
+            query = query.outerjoin(stats, condition)
 
-        query = query.where(table_ref.c.airline_id == airline_id)
-        query = query.group_by(table_ref.c[self._id_column])
+        conditions = [table_ref.c.airline_id == airline_id, *where]
+        await page.resolve_next_cursor(db, table_ref, self._id_column, conditions)
+        query = query.where(*conditions)
+        query = page.apply(query, table_ref.c.modified, table_ref.c[self._id_column])
 
-        result = await db.execute(query)
-        return [dict(row._mapping) for row in result.fetchall()]
+        result = await db.stream(query)
+        async for row in page.rows(result, self._id_column):
+            yield dict(row._mapping)
+
+    async def list_with_stats(
+        self,
+        airline_id: int,
+        db: AsyncSession,
+        join_tables: list[Table],
+        page: Optional[Page] = None,
+        where: tuple = (),
+    ) -> list[dict[str, Any]]:
+        """
+        List entities with COUNT and MAX(modified) stats from related tables.
+
+        Matches PHP listStats() pattern.
+        """
+        return [
+            row async for row in self.stream_with_stats(airline_id, db, join_tables, page, where)
+        ]
 
     async def create_or_update(
-        self, data: dict[str, Any], airline_id: int, db: AsyncSession
+        self, data: dict[str, Any], airline_id: int, db: AsyncSession, reread: Optional[bool] = None
     ) -> T | None:
         """
         Create or update entity (upsert).
@@ -171,42 +255,140 @@ class BaseRepository(Generic[T]):
         if self._identifier_column in data:
             insert_data[self._identifier_column] = data[self._identifier_column]
 
-        # MySQL INSERT ... ON DUPLICATE KEY UPDATE
-        stmt = mysql_insert(self.table).values(**insert_data)
-        stmt = stmt.on_duplicate_key_update(json_data=data)
-
-        await db.execute(stmt)
+        entity = await self.upsert(insert_data, db, reread)
         await db.commit()
+        return entity
 
-        # Retrieve the created/updated entity
-        identifier = data.get(self._identifier_column)
-        if identifier:
-            return await self.get_by_identifier(identifier, airline_id, db)
-        return None
+    async def upsert(
+        self, values: dict[str, Any], db: AsyncSession, reread: Optional[bool] = None
+    ) -> T:
+        """
+        Insert a row, or update its json_data if the identifier exists, and return the entity.
+
+        The update also sets LAST_INSERT_ID to the row's id, so the id is known
+        in both cases and the entity is built from the written values, without
+        reading it back. With a natural key, an update may have matched a row
+        with another identifier: updates are flagged in LAST_INSERT_ID and only
+        then is the stored identifier read (by primary key). On SQLite, the
+        statement returns the id and stored identifier (RETURNING). Bumps the
+        airline's list version at commit (see versions). Does not commit.
+
+        Args:
+            values: Column values (json_data, identifier, airline_id, links)
+            db: Database session
+            reread: Read the row back instead (default settings.DB_REREAD_AFTER_WRITE)
+        """
+        id_column = self.table.c[self._id_column]
+        identifier_column = self.table.c[self._identifier_column]
+        identifier = None
+        if dialect_name(db) == "sqlite":
+            stmt = insert_or_update(db, self.table, ["json_data"]).values(**values)
+            result = await db.execute(stmt.returning(id_column, identifier_column))
+            entity_id, identifier = result.one()
+            updated = False
+        else:
+            if self.natural_key:
+                # Leaves the id unchanged, but reports it offset through LAST_INSERT_ID
+                update_id = (
+                    sql_func.last_insert_id(id_column + _UPDATED_ID_OFFSET) - _UPDATED_ID_OFFSET
+                )
+            else:
+                update_id = sql_func.last_insert_id(id_column)
+            # MySQL INSERT ... ON DUPLICATE KEY UPDATE
+            stmt = insert_or_update(
+                db, self.table, ["json_data"], **{self._id_column: update_id}
+            ).values(**values)
+            result = await db.execute(stmt)
+            entity_id = result.lastrowid
+            updated = entity_id >= _UPDATED_ID_OFFSET
+            if updated:
+                entity_id -= _UPDATED_ID_OFFSET
+        if self.table.name in TABLE_CONFIG:
+            list_changed(db, values["airline_id"])
+
+        if reread is None:
+            reread = settings.DB_REREAD_AFTER_WRITE
+        if reread:
+            row = (await db.execute(select(*self._columns()).where(id_column == entity_id))).one()
+            written = dict(row._mapping)
+        else:
+            written = {**values, self._id_column: entity_id}
+            if identifier is not None:
+                written[self._identifier_column] = identifier
+            elif updated:
+                written[self._identifier_column] = (await db.execute(
+                    select(identifier_column).where(id_column == entity_id)
+                )).scalar_one()
+
+        json_data = dict(written["json_data"])
+        for column in (self._id_column, self._identifier_column, *self._link_columns):
+            if column in written:
+                json_data[column] = written[column]
+        return self.model_class.model_validate(json_data)
 
     async def delete_by_identifier(
         self, identifier: str, airline_id: int, db: AsyncSession
     ) -> bool:
-        """Delete entity by identifier."""
-        stmt = delete(self.table).where(
-            self.table.c[self._identifier_column] == identifier,
-            self.table.c.airline_id == airline_id,
+        """
+        Delete entity by identifier.
+
+        Tombstones for the entity and the rows its deletion cascades to are
+        written to the Deletions log, and the stats of the entities they
+        linked to are refreshed, in the same transaction (see sync, stats).
+        """
+        condition = (
+            (self.table.c[self._identifier_column] == identifier)
+            & (self.table.c.airline_id == airline_id)
         )
+        linked: dict[Table, set[int]] = {}
+        for table, table_condition in _cascade(self.table, condition):
+            await self._log_deletions(table, table_condition, db)
+            await collect_linked(db, table, table_condition, linked)
+            await remove_stats(db, table, table_condition)
+
+        stmt = delete(self.table).where(condition)
         result = await db.execute(stmt)
+        await refresh_linked_stats(db, linked)
+        if self.table.name in TABLE_CONFIG:
+            list_changed(db, airline_id)
         await db.commit()
         return result.rowcount > 0
 
+    async def _log_deletions(self, table: Table, condition, db: AsyncSession) -> None:
+        """Write tombstones for the rows of table matching condition."""
+        identifier_column = table.c[f"{table.name[:-1].lower()}_identifier"]
+        await db.execute(
+            insert(deletions).from_select(
+                ["airline_id", "table_name", "identifier"],
+                select(table.c.airline_id, literal(table.name), identifier_column).where(condition),
+            )
+        )
+
     def _row_to_model(self, row) -> T | None:
         """Convert database row to model instance."""
         if row is None:
             return None
         row_dict = dict(row._mapping)
         json_data = row_dict.get("json_data", {})
-        # Merge identifiers into json_data
+        # Merge identifiers and links into json_data, as upsert() does
         json_data[self._id_column] = row_dict.get(self._id_column)
         json_data[self._identifier_column] = row_dict.get(self._identifier_column)
+        for column in self._link_columns:
+            if row_dict.get(column) is not None:
+                json_data[column] = row_dict[column]
         return self.model_class.model_validate(json_data)
 
+    def _row_json(self, row) -> dict[str, Any]:
+        """Convert a database row to the to_json() of its entity, without building it."""
+        row_dict = row._mapping
+        return self.model_class.row_json(
+            row_dict["json_data"] or {},
+            **{
+                self._id_column: row_dict[self._id_column],
+                self._identifier_column: row_dict[self._identifier_column],
+            },
+        )
+
 
 # Concrete repositories
 class AircraftRepository(BaseRepository):
@@ -216,7 +398,9 @@ class AircraftRepository(BaseRepository):
 
 class PassengerRepository(BaseRepository):
     """Repository for Passenger entities."""
-    pass
+
+    # One passenger per (airline_id, apple_identifier)
+    natural_key = True
 
 
 class FlightRepository(BaseRepository):
@@ -226,5 +410,7 @@ class FlightRepository(BaseRepository):
 
 class TicketRepository(BaseRepository):
     """Repository for Ticket entities."""
-    pass
+
+    # One ticket per (flight_id, passenger_id)
+    natural_key = True
 
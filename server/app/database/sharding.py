@@ -0,0 +1,365 @@
+"""
+Tenant sharding: airline data spread across databases.
+
+Each airline's rows live in one shard: the default database (DB_HOST...) or
+one of DB_SHARDS. ShardMap, in the default database, records the shard of
+the airlines the server placed; airlines it has no row for (created before
+sharding or by the PHP backend) are in the default database. New airlines
+are placed by consistent hashing of their identifier over all shards, so
+adding a shard only draws new airlines to it. A row can be written by hand
+to pin an airline.
+
+Requests are routed by get_db from the airline_identifier in their path;
+public boarding pass lookups, which only have a ticket identifier, through
+TicketDirectory: a ticket missing from it is looked for in every shard and
+recorded. Assignments are cached for DB_SHARD_MAP_TTL seconds, and tickets
+found in no shard for DB_SHARD_MISS_TTL seconds (repeated lookups of an
+unknown ticket do not query every shard each time).
+
+Moving an airline between shards, while it is being served:
+    python -m app.database.sharding move <airline_identifier> <shard>
+Writes to the airline are refused (503) while its rows are copied; reads
+carry on from the source. Rows keep their ids, so shards must hand out
+distinct ids (e.g. auto_increment_increment and a distinct
+auto_increment_offset per shard): a move hitting an id already used in the
+target is rolled back.
+"""
+import argparse
+import asyncio
+import bisect
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker
+
+from app.database import tables
+
+DEFAULT_SHARD = "default"
+
+# Tables holding an airline's rows, parents first (copied in this order)
+AIRLINE_TABLES = [
+    tables.airlines,
+    tables.settings,
+    tables.aircrafts,
+    tables.passengers,
+    tables.flights,
+    tables.tickets,
+    tables.deletions,
+    tables.entity_stats,
+    tables.list_versions,
+]
+
+_CACHE_SIZE = 10000
+_COPY_CHUNK = 1000
+
+
+class HashRing:
+    """Consistent hashing of keys onto shard names."""
+
+    def __init__(self, names: Iterable[str], points_per_shard: int = 64):
+        self._points = sorted(
+            (self._hash(f"{name}#{index}"), name)
+            for name in names
+            for index in range(points_per_shard)
+        )
+        self._hashes = [point for point, _ in self._points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.sha1(key.encode()).digest()[:8], "big")
+
+    def get(self, key: str) -> str:
+        """Shard of a key: the first point of the ring after the key's hash."""
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._points)
+        return self._points[index][1]
+
+
+@dataclass
+class AirlineShard:
+    """Shard of an airline."""
+    shard: str
+    moving: bool = False  # Being moved to another shard: writes are refused
+
+
+class ShardDirectory:
+    """Shard assignments of airlines and tickets (see module docstring)."""
+
+    def __init__(self, sessions: dict[str, async_sessionmaker], ttl: float, miss_ttl: float = 0):
+        self.sessions = sessions
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.ring = HashRing(sessions)
+        self._cache: OrderedDict[tuple[str, str], tuple[float, object]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether there is more than the default database."""
+        return len(self.sessions) > 1
+
+    def _directory(self) -> AsyncSession:
+        return self.sessions[DEFAULT_SHARD]()
+
+    def _cached(self, kind: str, key: str):
+        entry = self._cache.get((kind, key))
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def _remember(self, kind: str, key: str, value, ttl: Optional[float] = None) -> None:
+        self._cache[(kind, key)] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._cache.move_to_end((kind, key))
+        while len(self._cache) > _CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _check(self, shard: str) -> str:
+        if shard not in self.sessions:
+            raise RuntimeError(f"Unknown shard '{shard}' (not in DB_SHARDS)")
+        return shard
+
+    async def airline_shard(self, airline_identifier: str, cached: bool = True) -> AirlineShard:
+        """Shard of an airline: its ShardMap row, else the default database."""
+        if not self.enabled:
+            return AirlineShard(DEFAULT_SHARD)
+        if cached and (hit := self._cached("airline", airline_identifier)) is not None:
+            return hit
+        async with self._directory() as db:
+            row = (await db.execute(
+                select(tables.shard_map.c.shard, tables.shard_map.c.moving)
+                .where(tables.shard_map.c.airline_identifier == airline_identifier)
+            )).first()
+        if row is None:
+            # Not placed by the server: not cached, so a placement elsewhere is seen at once
+            return AirlineShard(DEFAULT_SHARD)
+        airline = AirlineShard(self._check(row.shard), bool(row.moving))
+        self._remember("airline", airline_identifier, airline)
+        return airline
+
+    async def place_airline(self, airline_identifier: str) -> str:
+        """
+        Shard of an airline being created: where it already is, else by
+        consistent hashing (recorded).
+        """
+        if not self.enabled:
+            return DEFAULT_SHARD
+        async with self._directory() as db:
+            shard = (await db.execute(
+                select(tables.shard_map.c.shard)
+                .where(tables.shard_map.c.airline_identifier == airline_identifier)
+            )).scalar()
+            if shard is not None:
+                return self._check(shard)
+            existing = (await db.execute(
+                select(tables.airlines.c.airline_id)
+                .where(tables.airlines.c.airline_identifier == airline_identifier)
+            )).scalar()
+            shard = DEFAULT_SHARD if existing is not None else self.ring.get(airline_identifier)
+            try:
+                await db.execute(insert(tables.shard_map).values(
+                    airline_identifier=airline_identifier, shard=shard,
+                ))
+                await db.commit()
+            except IntegrityError:
+                # Placed concurrently: hashing gives the same shard
+                await db.rollback()
+        return shard
+
+    async def set_airline(
+        self,
+        airline_identifier: str,
+        shard: str,
+        moving: bool = False,
+        ticket_identifiers: Iterable[str] = (),
+    ) -> None:
+        """Record the shard of an airline, and of its tickets, in one transaction."""
+        ticket_identifiers = list(ticket_identifiers)
+        async with self._directory() as db:
+            await db.execute(
+                delete(tables.shard_map)
+                .where(tables.shard_map.c.airline_identifier == airline_identifier)
+            )
+            await db.execute(insert(tables.shard_map).values(
+                airline_identifier=airline_identifier, shard=self._check(shard), moving=int(moving),
+            ))
+            for start in range(0, len(ticket_identifiers), _COPY_CHUNK):
+                chunk = ticket_identifiers[start:start + _COPY_CHUNK]
+                await db.execute(
+                    delete(tables.ticket_directory)
+                    .where(tables.ticket_directory.c.ticket_identifier.in_(chunk))
+                )
+                await db.execute(insert(tables.ticket_directory), [
+                    {"ticket_identifier": identifier, "shard": shard} for identifier in chunk
+                ])
+            await db.commit()
+        self._remember("airline", airline_identifier, AirlineShard(shard, moving))
+        for identifier in ticket_identifiers:
+            self._cache.pop(("ticket", identifier), None)
+
+    async def ticket_shard(self, ticket_identifier: str) -> str:
+        """
+        Shard of a ticket, for lookups without an airline: its TicketDirectory
+        row, else the shard it is found in (recorded), else the default database
+        (cached for miss_ttl only).
+        """
+        if not self.enabled:
+            return DEFAULT_SHARD
+        if (hit := self._cached("ticket", ticket_identifier)) is not None:
+            return hit
+        async with self._directory() as db:
+            shard = (await db.execute(
+                select(tables.ticket_directory.c.shard)
+                .where(tables.ticket_directory.c.ticket_identifier == ticket_identifier)
+            )).scalar()
+            if shard is None:
+                shard = await self._find_ticket(ticket_identifier)
+                if shard is None:
+                    # Not recorded: the ticket may still be created
+                    self._remember("ticket", ticket_identifier, DEFAULT_SHARD, self.miss_ttl)
+                    return DEFAULT_SHARD
+                try:
+                    await db.execute(insert(tables.ticket_directory).values(
+                        ticket_identifier=ticket_identifier, shard=shard,
+                    ))
+                    await db.commit()
+                except IntegrityError:
+                    await db.rollback()
+        self._remember("ticket", ticket_identifier, self._check(shard))
+        return shard
+
+    async def _find_ticket(self, ticket_identifier: str) -> Optional[str]:
+        """Look for a ticket in every shard, the default database first."""
+        for name, sessions in self.sessions.items():
+            async with sessions() as db:
+                found = (await db.execute(
+                    select(tables.tickets.c.ticket_id)
+                    .where(tables.tickets.c.ticket_identifier == ticket_identifier)
+                )).scalar()
+            if found is not None:
+                return name
+        return None
+
+
+async def _copy_airline(
+    source: AsyncConnection, target: AsyncConnection, airline_identifier: str
+) -> tuple[int, list[str]]:
+    """
+    Copy an airline's rows from source to target, keeping their ids. Commits target.
+
+    Returns:
+        Rows copied, identifiers of the airline's tickets
+    """
+    airline_id = (await source.execute(
+        select(tables.airlines.c.airline_id)
+        .where(tables.airlines.c.airline_identifier == airline_identifier)
+    )).scalar()
+    if airline_id is None:
+        raise ValueError(f"Airline {airline_identifier} not found in its shard")
+    # Leftovers of an interrupted move (rows cascade from Airlines)
+    await target.execute(
+        delete(tables.airlines).where(tables.airlines.c.airline_identifier == airline_identifier)
+    )
+
+    copied = 0
+    for table in AIRLINE_TABLES:
+        columns = [column for column in table.c if column.computed is None]
+        result = await source.stream(select(*columns).where(table.c.airline_id == airline_id))
+        async for rows in result.partitions(_COPY_CHUNK):
+            try:
+                await target.execute(insert(table), [dict(row._mapping) for row in rows])
+            except IntegrityError as e:
+                raise ValueError(
+                    f"{table.name} ids of airline {airline_identifier} already used in the"
+                    " target shard (shards must hand out distinct ids)"
+                ) from e
+            copied += len(rows)
+    ticket_identifiers = list((await source.execute(
+        select(tables.tickets.c.ticket_identifier).where(tables.tickets.c.airline_id == airline_id)
+    )).scalars())
+    await target.commit()
+    return copied, ticket_identifiers
+
+
+async def move_airline(airline_identifier: str, target: str, wait: Optional[float] = None) -> int:
+    """
+    Move an airline to another shard, while it is being served.
+
+    1. Mark it moving: once every worker's cached assignment has expired
+       (wait, default DB_SHARD_MAP_TTL), its writes are refused.
+    2. Copy its rows to the target, then point it and its tickets there.
+    3. After another wait (requests routed before the switch), delete it from the source.
+
+    Returns:
+        Rows copied (0 if already in the target)
+
+    Raises:
+        ValueError: Unknown target, airline not found, or ids already used in the target
+    """
+    from app.database.connection import shard_directory, shard_engines
+
+    if target not in shard_engines:
+        raise ValueError(f"Unknown shard '{target}'")
+    wait = shard_directory.ttl if wait is None else wait
+    source = (await shard_directory.airline_shard(airline_identifier, cached=False)).shard
+    if source == target:
+        return 0
+
+    await shard_directory.set_airline(airline_identifier, source, moving=True)
+    await asyncio.sleep(wait)
+    try:
+        async with (
+            shard_engines[source].connect() as source_conn,
+            shard_engines[target].connect() as target_conn,
+        ):
+            copied, ticket_identifiers = await _copy_airline(
+                source_conn, target_conn, airline_identifier
+            )
+        await shard_directory.set_airline(
+            airline_identifier, target, ticket_identifiers=ticket_identifiers
+        )
+    except BaseException:
+        await shard_directory.set_airline(airline_identifier, source)
+        raise
+
+    await asyncio.sleep(wait)
+    async with shard_engines[source].begin() as source_conn:
+        await source_conn.execute(
+            delete(tables.airlines)
+            .where(tables.airlines.c.airline_identifier == airline_identifier)
+        )
+    return copied
+
+
+async def _main() -> None:
+    from app.database.connection import dispose_engines, shard_directory
+
+    parser = argparse.ArgumentParser(
+        prog="python -m app.database.sharding", description="Airline shards"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    locate = commands.add_parser("locate", help="Show the shard of an airline")
+    locate.add_argument("airline_identifier")
+    move = commands.add_parser("move", help="Move an airline to another shard")
+    move.add_argument("airline_identifier")
+    move.add_argument("shard")
+    arguments = parser.parse_args()
+
+    try:
+        if arguments.command == "locate":
+            airline = await shard_directory.airline_shard(
+                arguments.airline_identifier, cached=False
+            )
+            moving = " (moving)" if airline.moving else ""
+            print(f"{arguments.airline_identifier}: {airline.shard}{moving}")
+        else:
+            copied = await move_airline(arguments.airline_identifier, arguments.shard)
+            print(f"Moved {arguments.airline_identifier} to {arguments.shard} ({copied} rows)")
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,84 @@
+"""
+Flight and passenger snapshots embedded in tickets.
+
+A ticket's json_data holds copies of its flight and passenger (as
+Flight.to_json() and Passenger.to_json() at issue time), which passes and
+pages are built from. When a flight or passenger changes, the copies in all
+its tickets are rewritten with one UPDATE ... JOIN setting them from the
+entity's row with JSON_SET, in the caller's transaction. A ticket keeps its
+JSON_SCHEMA_VERSION stamp only if the entity's json_data has the same one.
+"""
+from typing import Iterable
+
+from sqlalchemy import ColumnElement, Table, case, select, update, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.database.stats import refresh_stats
+from app.database.tables import TABLE_CONFIG, flights, passengers, tickets
+from app.models.base import JSON_SCHEMA_KEY
+
+
+def _snapshot(table: Table) -> ColumnElement:
+    """
+    JSON of an entity as embedded in tickets (its to_json()): json_data with
+    the id, identifier and link ids, under both their aliases and field names.
+    """
+    keys = [table.name[:-1].lower()] + [name[:-1].lower() for name in TABLE_CONFIG[table.name].get("links", [])]
+    arguments = []
+    for key in keys:
+        arguments += [f"$.{key}Id", table.c[f"{key}_id"], f"$.{key}_id", table.c[f"{key}_id"]]
+    name = keys[0]
+    arguments += [
+        f"$.{name}Identifier", table.c[f"{name}_identifier"],
+        f"$.{name}_identifier", table.c[f"{name}_identifier"],
+    ]
+    return sql_func.json_set(table.c.json_data, *arguments)
+
+
+async def rewrite_snapshots(
+    db: AsyncSession | AsyncConnection, table: Table, condition: ColumnElement
+) -> None:
+    """
+    Rewrite the copy of their table entity (flight or passenger) in the tickets matching condition.
+
+    One statement; the tickets' modified is updated, so sync sends them again. Does not commit.
+    """
+    name = table.name[:-1].lower()
+    link = tickets.c[f"{name}_id"]
+    stamp = f"$.{JSON_SCHEMA_KEY}"
+    ticket_stamp = sql_func.json_extract(tickets.c.json_data, stamp)
+    kept_stamp = case((sql_func.json_extract(table.c.json_data, stamp) == ticket_stamp, ticket_stamp), else_=None)
+    await db.execute(
+        update(tickets)
+        .where(condition, link == table.c[f"{name}_id"])
+        .values(json_data=sql_func.json_set(tickets.c.json_data, f"$.{name}", _snapshot(table), stamp, kept_stamp))
+    )
+
+
+async def refresh_ticket_snapshots(db: AsyncSession, table: Table, ids: Iterable[int]) -> list[str]:
+    """
+    Refresh the tickets of flights or passengers after they changed.
+
+    Rewrites the embedded copies, then refreshes the ticket stats of the
+    flights and passengers of those tickets (their last modified moved).
+    Does not commit.
+
+    Args:
+        db: Database session
+        table: Flights or Passengers
+        ids: Ids of the changed entities
+
+    Returns:
+        Identifiers of the rewritten tickets (to invalidate passes built from them)
+    """
+    ids = list(ids)
+    if not ids:
+        return []
+    condition = tickets.c[f"{table.name[:-1].lower()}_id"].in_(ids)
+    await rewrite_snapshots(db, table, condition)
+    rows = (await db.execute(
+        select(tickets.c.ticket_identifier, tickets.c.flight_id, tickets.c.passenger_id).where(condition)
+    )).all()
+    await refresh_stats(db, flights, {row.flight_id for row in rows})
+    await refresh_stats(db, passengers, {row.passenger_id for row in rows})
+    return [row.ticket_identifier for row in rows]
@@ -0,0 +1,183 @@
+"""
+Materialized entity stats.
+
+EntityStats holds, for each entity, COUNT and MAX(modified) of the rows linking
+to it (Flights of an aircraft, Tickets of a passenger or flight), so lists with
+stats read them by primary key instead of grouping the related table on every
+call.
+
+Writes to Flights and Tickets refresh the stats of the entities they link to,
+in the same transaction, from the foreign key index of the related table (an
+upsert's row count cannot tell an insert from an update, so counts are
+recomputed for the touched entities rather than incremented). Rows written by
+other clients of the database (e.g. the PHP backend) are picked up by
+reconcile_stats(), run by migration 4, POST /api/v1/admin/stats/reconcile,
+every STATS_RECONCILE_INTERVAL seconds, or by hand with:
+    python -m app.database.stats
+"""
+import asyncio
+import logging
+from typing import Iterable
+
+from sqlalchemy import ColumnElement, Table, delete, exists, literal, select, true, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.database.dialect import insert_or_update
+from app.database.tables import TABLE_CONFIG, airlines, entity_stats, metadata
+
+logger = logging.getLogger(__name__)
+
+
+def _id_column(table: Table) -> str:
+    """Primary key column name (e.g., "Flights" -> "flight_id")."""
+    return f"{table.name[:-1].lower()}_id"
+
+
+def _links(table: Table) -> list[Table]:
+    """Tables the rows of table link to (e.g., Tickets -> Passengers, Flights)."""
+    return [metadata.tables[name] for name in TABLE_CONFIG.get(table.name, {}).get("links", [])]
+
+
+def _related(table: Table) -> list[Table]:
+    """Tables linking to table (e.g., Flights -> Tickets)."""
+    return [
+        metadata.tables[name]
+        for name, config in TABLE_CONFIG.items()
+        if table.name in config.get("links", [])
+    ]
+
+
+async def _refresh(
+    db: AsyncSession | AsyncConnection, table: Table, related: Table, condition: ColumnElement
+) -> None:
+    """Recompute the stats from related for the rows of table matching condition."""
+    entity_id = table.c[_id_column(table)]
+    link = related.c[_id_column(table)]
+    stmt = insert_or_update(db, entity_stats, ["related_count", "related_last"]).from_select(
+        ["table_name", "entity_id", "related", "airline_id", "related_count", "related_last"],
+        select(
+            literal(table.name),
+            entity_id,
+            literal(related.name),
+            table.c.airline_id,
+            sql_func.count(link),
+            sql_func.max(related.c.modified),
+        )
+        .select_from(table.outerjoin(related, entity_id == link))
+        .where(condition)
+        .group_by(entity_id, table.c.airline_id),
+    )
+    await db.execute(stmt)
+
+
+async def refresh_stats(db: AsyncSession, table: Table, ids: Iterable[int]) -> None:
+    """
+    Refresh the stats of entities of table after rows linking to them changed.
+
+    Ids of entities that no longer exist are ignored. Does not commit.
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    for related in _related(table):
+        await _refresh(db, table, related, table.c[_id_column(table)].in_(ids))
+
+
+async def collect_linked(
+    db: AsyncSession, table: Table, condition: ColumnElement, linked: dict[Table, set[int]]
+) -> None:
+    """
+    Add to linked the ids of the entities the rows of table matching condition link to.
+
+    Called before deleting rows, to refresh those entities' stats afterwards.
+    """
+    for parent in _links(table):
+        link = table.c[_id_column(parent)]
+        result = await db.execute(select(link).where(condition).distinct())
+        linked.setdefault(parent, set()).update(result.scalars())
+
+
+async def remove_stats(db: AsyncSession, table: Table, condition: ColumnElement) -> None:
+    """Delete the stats of the rows of table matching condition (before deleting them)."""
+    if not _related(table):
+        return
+    await db.execute(
+        delete(entity_stats).where(
+            entity_stats.c.table_name == table.name,
+            entity_stats.c.entity_id.in_(select(table.c[_id_column(table)]).where(condition)),
+        )
+    )
+
+
+async def refresh_linked_stats(db: AsyncSession, linked: dict[Table, set[int]]) -> None:
+    """Refresh the stats of the entities gathered by collect_linked()."""
+    for table, ids in linked.items():
+        await refresh_stats(db, table, ids)
+
+
+async def reconcile_stats(conn: AsyncSession | AsyncConnection, airline_id: int | None = None) -> int:
+    """
+    Rebuild stats from the related tables and drop stats of deleted entities.
+
+    Commits once per airline, so locks are held for one airline's rows at a time.
+
+    Args:
+        conn: Database session or connection
+        airline_id: Only this airline (default all)
+
+    Returns:
+        Number of airlines reconciled
+    """
+    if airline_id is None:
+        airline_ids = list((await conn.execute(select(airlines.c.airline_id))).scalars())
+    else:
+        airline_ids = [airline_id]
+
+    for current in airline_ids:
+        for table in (metadata.tables[name] for name in TABLE_CONFIG):
+            for related in _related(table):
+                await _refresh(conn, table, related, table.c.airline_id == current)
+        await conn.commit()
+
+    # Entities deleted outside this server
+    for table in (metadata.tables[name] for name in TABLE_CONFIG):
+        if not _related(table):
+            continue
+        await conn.execute(
+            delete(entity_stats).where(
+                entity_stats.c.table_name == table.name,
+                entity_stats.c.airline_id == airline_id if airline_id is not None else true(),
+                ~exists().where(table.c[_id_column(table)] == entity_stats.c.entity_id),
+            )
+        )
+    await conn.commit()
+    return len(airline_ids)
+
+
+async def reconcile_periodically(interval: float) -> None:
+    """Run reconcile_stats() every interval seconds (started by the app lifespan)."""
+    from app.database.connection import shard_engines
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            for engine in shard_engines.values():
+                async with engine.connect() as conn:
+                    await reconcile_stats(conn)
+        except Exception:
+            logger.exception("Entity stats reconciliation failed")
+
+
+async def _main() -> None:
+    from app.database.connection import dispose_engines, shard_engines
+
+    count = 0
+    for engine in shard_engines.values():
+        async with engine.connect() as conn:
+            count += await reconcile_stats(conn)
+    await dispose_engines()
+    print(f"Reconciled stats for {count} airlines")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
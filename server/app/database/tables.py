@@ -1,22 +1,90 @@
 """
 SQLAlchemy Core table definitions.
 
-Matches the existing MySQL schema exactly - no schema changes.
+Matches the existing MySQL schema, plus the additive changes (indexes,
+new tables) applied by app/database/migrations.py.
 """
 from sqlalchemy import (
     Table,
     Column,
+    Computed,
     Integer,
     String,
     JSON,
     ForeignKey,
+    Index,
+    SmallInteger,
     TIMESTAMP,
     MetaData,
 )
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql import func
+from sqlalchemy.sql.expression import ColumnElement, text
 
 metadata = MetaData()
 
+
+def _json_text(path: str, length: int) -> Computed:
+    """
+    Virtual generated column extracting a string from json_data.
+
+    `->>` and SUBSTR behave the same in MySQL and SQLite.
+    """
+    return Computed(f"SUBSTR(json_data ->> '{path}', 1, {length})", persisted=False)
+
+
+class _JsonUtc(ColumnElement):
+    """An ISO 8601 date in json_data as UTC 'YYYY-MM-DDTHH:MM:SS' (see departure_key)."""
+
+    inherit_cache = False
+
+    def __init__(self, path: str):
+        self.path = path
+
+
+@compiles(_JsonUtc, "sqlite")
+def _json_utc_sqlite(element, compiler, **kw):
+    # strftime applies a trailing +HH:MM, -HH:MM or Z, and ignores fractional seconds
+    return compiler.process(text(f"strftime('%Y-%m-%dT%H:%M:%S', json_data ->> '{element.path}')"), **kw)
+
+
+@compiles(_JsonUtc)
+def _json_utc_mysql(element, compiler, **kw):
+    # Local time minus the trailing +HH:MM / -HH:MM offset, if any (none for Z or naive dates)
+    value = f"(json_data ->> '{element.path}')"
+    offset = (
+        f"CASE WHEN SUBSTR({value}, -3, 1) <> ':' THEN 0"
+        f" WHEN SUBSTR({value}, -6, 1) = '+' THEN 1"
+        f" WHEN SUBSTR({value}, -6, 1) = '-' THEN -1 ELSE 0 END"
+        f" * (SUBSTR({value}, -5, 2) * 60 + SUBSTR({value}, -2, 2))"
+    )
+    # Through text() so the dialect escapes the % signs
+    return compiler.process(text(
+        f"DATE_FORMAT(CAST(SUBSTR({value}, 1, 19) AS DATETIME) - INTERVAL ({offset}) MINUTE,"
+        " '%Y-%m-%dT%H:%i:%s')"
+    ), **kw)
+
+
+def _json_utc(path: str) -> Computed:
+    """
+    Virtual generated column of an ISO 8601 date in json_data converted to UTC.
+
+    Dates are stored with the offset the writer used (UTC from this server,
+    local from earlier clients and the PHP backend): the first 19 characters
+    alone are local times and do not sort chronologically.
+    """
+    return Computed(_JsonUtc(path), persisted=False)
+
+
+# MySQL TIMESTAMP has second resolution: on SQLite, store datetimes as CURRENT_TIMESTAMP
+# writes them (no microseconds), so written and bound values compare as text
+Timestamp = TIMESTAMP().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
+
 # Table configuration matching PHP $standardTables
 TABLE_CONFIG = {
     "Aircrafts": {"links": []},
@@ -32,7 +100,7 @@ airlines = Table(
     Column("airline_id", Integer, primary_key=True, autoincrement=True),
     Column("airline_identifier", String(255), unique=True, nullable=False),
     Column("json_data", JSON),
-    Column("modified", TIMESTAMP, server_default=func.now(), onupdate=func.now()),
+    Column("modified", Timestamp, server_default=func.now(), onupdate=func.now()),
 )
 
 # Settings table (one-to-one with Airlines)
@@ -61,9 +129,12 @@ aircrafts = Table(
         ForeignKey("Airlines.airline_id", ondelete="CASCADE"),
         nullable=False,
     ),
-    Column("modified", TIMESTAMP, server_default=func.now(), onupdate=func.now()),
+    Column("modified", Timestamp, server_default=func.now(), onupdate=func.now()),
 )
 
+# Keyset pagination / sync: airline rows in (modified, id) order
+ix_aircrafts_airline_modified = Index("ix_aircrafts_airline_modified", aircrafts.c.airline_id, aircrafts.c.modified)
+
 # Passengers table
 passengers = Table(
     "Passengers",
@@ -77,7 +148,16 @@ passengers = Table(
         ForeignKey("Airlines.airline_id", ondelete="CASCADE"),
         nullable=False,
     ),
-    Column("modified", TIMESTAMP, server_default=func.now(), onupdate=func.now()),
+    Column("modified", Timestamp, server_default=func.now(), onupdate=func.now()),
+    # Generated from json_data: the contact a passenger was created from
+    Column("apple_identifier", String(255), _json_text("$.apple_identifier", 255)),
+)
+
+# Keyset pagination / sync: airline rows in (modified, id) order
+ix_passengers_airline_modified = Index("ix_passengers_airline_modified", passengers.c.airline_id, passengers.c.modified)
+# One passenger per contact: creating a passenger again updates it
+ux_passengers_airline_apple = Index(
+    "ux_passengers_airline_apple", passengers.c.airline_id, passengers.c.apple_identifier, unique=True
 )
 
 # Flights table
@@ -99,7 +179,22 @@ flights = Table(
         ForeignKey("Airlines.airline_id", ondelete="CASCADE"),
         nullable=False,
     ),
-    Column("modified", TIMESTAMP, server_default=func.now(), onupdate=func.now()),
+    Column("modified", Timestamp, server_default=func.now(), onupdate=func.now()),
+    # Generated from json_data for filtering (departure as UTC 'YYYY-MM-DDTHH:MM:SS')
+    Column("scheduled_departure", String(19), _json_utc("$.scheduledDepartureDate")),
+    Column("origin_icao", String(8), _json_text("$.origin.icao", 8)),
+    Column("destination_icao", String(8), _json_text("$.destination.icao", 8)),
+)
+
+# Keyset pagination / sync: airline rows in (modified, id) order
+ix_flights_airline_modified = Index("ix_flights_airline_modified", flights.c.airline_id, flights.c.modified)
+# Date/airport filters: departure range scans, optionally for one origin or destination
+ix_flights_airline_departure = Index("ix_flights_airline_departure", flights.c.airline_id, flights.c.scheduled_departure)
+ix_flights_airline_origin = Index(
+    "ix_flights_airline_origin", flights.c.airline_id, flights.c.origin_icao, flights.c.scheduled_departure
+)
+ix_flights_airline_destination = Index(
+    "ix_flights_airline_destination", flights.c.airline_id, flights.c.destination_icao, flights.c.scheduled_departure
 )
 
 # Tickets table
@@ -127,7 +222,26 @@ tickets = Table(
         ForeignKey("Airlines.airline_id", ondelete="CASCADE"),
         nullable=False,
     ),
-    Column("modified", TIMESTAMP, server_default=func.now(), onupdate=func.now()),
+    Column("modified", Timestamp, server_default=func.now(), onupdate=func.now()),
+    # Generated from the flight copied into json_data, as for Flights
+    Column("scheduled_departure", String(19), _json_utc("$.flight.scheduledDepartureDate")),
+    Column("origin_icao", String(8), _json_text("$.flight.origin.icao", 8)),
+    Column("destination_icao", String(8), _json_text("$.flight.destination.icao", 8)),
+)
+
+# Keyset pagination / sync: airline rows in (modified, id) order
+ix_tickets_airline_modified = Index("ix_tickets_airline_modified", tickets.c.airline_id, tickets.c.modified)
+# Date/airport filters: departure range scans, optionally for one origin or destination
+ix_tickets_airline_departure = Index("ix_tickets_airline_departure", tickets.c.airline_id, tickets.c.scheduled_departure)
+ix_tickets_airline_origin = Index(
+    "ix_tickets_airline_origin", tickets.c.airline_id, tickets.c.origin_icao, tickets.c.scheduled_departure
+)
+ix_tickets_airline_destination = Index(
+    "ix_tickets_airline_destination", tickets.c.airline_id, tickets.c.destination_icao, tickets.c.scheduled_departure
+)
+# One ticket per passenger per flight: issue_ticket upserts on it
+ux_tickets_flight_passenger = Index(
+    "ux_tickets_flight_passenger", tickets.c.flight_id, tickets.c.passenger_id, unique=True
 )
 
 # BoardingPasses table (if it exists in schema)
@@ -142,6 +256,73 @@ boarding_passes = Table(
         nullable=False,
     ),
     Column("json_data", JSON),
-    Column("modified", TIMESTAMP, server_default=func.now(), onupdate=func.now()),
+    Column("modified", Timestamp, server_default=func.now(), onupdate=func.now()),
+)
+
+
+# Deletions log: tombstones of deleted entities for delta sync (including cascaded children)
+deletions = Table(
+    "Deletions",
+    metadata,
+    Column("deletion_id", Integer, primary_key=True, autoincrement=True),
+    Column(
+        "airline_id",
+        Integer,
+        ForeignKey("Airlines.airline_id", ondelete="CASCADE"),
+        nullable=False,
+    ),
+    Column("table_name", String(32), nullable=False),
+    Column("identifier", String(36), nullable=False),
+    Column("deleted", Timestamp, server_default=func.now()),
 )
 
+ix_deletions_airline = Index("ix_deletions_airline", deletions.c.airline_id, deletions.c.deletion_id)
+
+# Materialized stats: COUNT and MAX(modified) of the rows of `related` linking to
+# each entity (e.g. Passengers/12/Tickets), maintained by app/database/stats.py
+entity_stats = Table(
+    "EntityStats",
+    metadata,
+    Column("table_name", String(32), primary_key=True),
+    Column("entity_id", Integer, primary_key=True),
+    Column("related", String(32), primary_key=True),
+    Column(
+        "airline_id",
+        Integer,
+        ForeignKey("Airlines.airline_id", ondelete="CASCADE"),
+        nullable=False,
+    ),
+    Column("related_count", Integer, nullable=False, server_default="0"),
+    Column("related_last", Timestamp, nullable=True),
+)
+
+# List versions: a counter per airline bumped by every write of this server to
+# its Aircrafts, Passengers, Flights or Tickets (see app/database/versions.py)
+list_versions = Table(
+    "ListVersions",
+    metadata,
+    Column(
+        "airline_id",
+        Integer,
+        ForeignKey("Airlines.airline_id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("version", Integer, nullable=False, server_default="0"),
+)
+
+# Shard directory (default database only, see app/database/sharding.py): the shard
+# of each airline placed by the server, and of tickets found by public lookups
+shard_map = Table(
+    "ShardMap",
+    metadata,
+    Column("airline_identifier", String(255), primary_key=True),
+    Column("shard", String(64), nullable=False),
+    Column("moving", SmallInteger, nullable=False, server_default="0"),  # Writes refused while 1
+)
+
+ticket_directory = Table(
+    "TicketDirectory",
+    metadata,
+    Column("ticket_identifier", String(36), primary_key=True),
+    Column("shard", String(64), nullable=False),
+)
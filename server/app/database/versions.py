@@ -0,0 +1,57 @@
+"""
+List versions for conditional GET.
+
+ListVersions holds a counter per airline, bumped in the transaction of every
+write this server makes to the airline's Aircrafts, Passengers, Flights or
+Tickets. The list ETags include it, so two edits within the same second
+(MAX(modified) has second resolution) still give different ETags.
+
+The counter row stays locked until the write commits, and every write of the
+airline waits for it. Sessions therefore only record the airlines they
+changed (list_changed()), and the bumps run as the last statements before
+their commit (a before_commit hook), in airline order. Jobs writing through
+a connection call bump_list_version() right before committing.
+"""
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
+
+from app.database.dialect import insert_or_update
+from app.database.tables import list_versions
+
+# Session.info key: ids of the airlines whose list version the next commit bumps
+_CHANGED = "list_versions_changed"
+
+
+def _bump(db: Session | AsyncSession | AsyncConnection, airline_id: int) -> Insert:
+    stmt = insert_or_update(db, list_versions, [], version=list_versions.c.version + 1)
+    return stmt.values(airline_id=airline_id, version=1)
+
+
+async def bump_list_version(db: AsyncSession | AsyncConnection, airline_id: int) -> None:
+    """Increment the list version of an airline now. Does not commit."""
+    await db.execute(_bump(db, airline_id))
+
+
+def list_changed(db: AsyncSession, airline_id: int) -> None:
+    """Have the session's next commit increment the list version of an airline."""
+    db.info.setdefault(_CHANGED, set()).add(airline_id)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_changed(session: Session) -> None:
+    """Bump the list versions recorded by list_changed(), last before the commit."""
+    for airline_id in sorted(session.info.pop(_CHANGED, ())):
+        session.execute(_bump(session, airline_id))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed(session: Session) -> None:
+    """Rolled back writes changed nothing."""
+    session.info.pop(_CHANGED, None)
+
+
+def list_version_query(airline_id: int):
+    """Scalar subquery of the list version of an airline (NULL before its first write)."""
+    return select(list_versions.c.version).where(list_versions.c.airline_id == airline_id).scalar_subquery()
@@ -3,11 +3,18 @@ FastAPI dependencies for authentication and database sessions.
 
 Uses dependency injection instead of middleware for better type safety and testability.
 """
-from typing import Annotated
-from fastapi import Depends, Header, Path, HTTPException, status
+import hmac
+from datetime import datetime
+from typing import Annotated, Optional
+from fastapi import Depends, Header, Path, Query, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.connection import get_db
+from app.config import settings
+from app.core.access_token import verify_access_token
+from app.core.auth_cache import AirlineAuth, airline_auth_cache, token_hash
+from app.database.connection import get_db, get_read_db
+from app.database.filters import FlightFilter
+from app.database.pagination import Page
 from app.database.tables import airlines
 from sqlalchemy import select
 
@@ -15,10 +22,34 @@ from sqlalchemy import select
 class AirlineContext:
     """Authenticated airline context for request."""
 
-    def __init__(self, airline_id: int, airline_identifier: str, airline_data: dict):
+    def __init__(self, airline_id: int, airline_identifier: str, airline_data: Optional[dict]):
         self.airline_id = airline_id
         self.airline_identifier = airline_identifier
-        self.airline_data = airline_data  # JSON data from database
+        self.airline_data = airline_data  # JSON data from database, None until loaded (access token)
+
+    @property
+    def access_token(self) -> bool:
+        """Whether the request was authenticated by an access token (see app.core.access_token)."""
+        return self.airline_data is None
+
+    async def load_data(self, db: AsyncSession) -> dict:
+        """JSON data of the airline: not read when authenticating by access token."""
+        if self.airline_data is None:
+            auth = await airline_auth_cache.get(self.airline_identifier)
+            if auth is not None:
+                self.airline_data = auth.json_data
+            else:
+                result = await db.execute(
+                    select(airlines.c.json_data).where(airlines.c.airline_id == self.airline_id)
+                )
+                json_data = result.scalar_one_or_none()
+                if json_data is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Airline not found",
+                    )
+                self.airline_data = json_data
+        return self.airline_data
 
 
 async def get_airline_context(
@@ -30,6 +61,9 @@ async def get_airline_context(
     Dependency that validates airline authentication.
 
     Extracts airline_identifier from path and validates Bearer token.
+    An access token for this airline is checked by its signature alone;
+    otherwise the token is the airline's credential, and the airline is read
+    from the auth cache, or from the database on a miss.
     """
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
@@ -39,33 +73,47 @@ async def get_airline_context(
 
     token = authorization.removeprefix("Bearer ")
 
-    # Query airline from database
-    query = select(airlines).where(
-        airlines.c.airline_identifier == airline_identifier
-    )
-    result = await db.execute(query)
-    row = result.fetchone()
-
-    if not row:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Airline not found",
+    claims = verify_access_token(token)
+    if claims is not None and claims.get("sub") == airline_identifier:
+        return AirlineContext(
+            airline_id=claims["aid"],
+            airline_identifier=airline_identifier,
+            airline_data=None,
         )
 
-    airline_dict = dict(row._mapping)
-    airline_json = airline_dict.get("json_data", {})
-    apple_identifier = airline_json.get("apple_identifier", "")
+    auth = await airline_auth_cache.get(airline_identifier)
+    if auth is None:
+        # Query airline from database
+        query = select(airlines.c.airline_id, airlines.c.json_data).where(
+            airlines.c.airline_identifier == airline_identifier
+        )
+        result = await db.execute(query)
+        row = result.fetchone()
+
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Airline not found",
+            )
+
+        airline_json = row.json_data or {}
+        auth = AirlineAuth(
+            airline_id=row.airline_id,
+            token_hash=token_hash(airline_json.get("apple_identifier", "")),
+            json_data=airline_json,
+        )
+        await airline_auth_cache.set(airline_identifier, auth)
 
-    if apple_identifier != token:
+    if not auth.accepts(token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Bearer Token",
         )
 
     return AirlineContext(
-        airline_id=airline_dict["airline_id"],
+        airline_id=auth.airline_id,
         airline_identifier=airline_identifier,
-        airline_data=airline_json,
+        airline_data=auth.json_data,
     )
 
 
@@ -82,7 +130,7 @@ async def get_system_auth(
         )
 
     token = authorization.removeprefix("Bearer ")
-    if token != settings.SECRET:
+    if not hmac.compare_digest(token.encode(), settings.SECRET.encode()):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid system token",
@@ -91,8 +139,42 @@ async def get_system_auth(
     return True
 
 
+def get_page(
+    limit: Annotated[
+        int | None, Query(ge=1, le=settings.LIST_MAX_LIMIT, description="Maximum number of items")
+    ] = None,
+    after: Annotated[
+        str | None, Query(description="Cursor from the X-Next-Cursor header of the previous page")
+    ] = None,
+) -> Page:
+    """Dependency for keyset pagination parameters of list endpoints."""
+    try:
+        return Page(limit=limit, after=after)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bad Request, invalid cursor",
+        ) from e
+
+
+def get_flight_filter(
+    departure_from: Annotated[
+        datetime | None, Query(alias="from", description="Departure on or after")
+    ] = None,
+    departure_to: Annotated[datetime | None, Query(alias="to", description="Departure before")] = None,
+    origin: Annotated[str | None, Query(description="Origin ICAO")] = None,
+    destination: Annotated[str | None, Query(description="Destination ICAO")] = None,
+    upcoming: Annotated[bool, Query(description="Only flights departing from now on")] = False,
+) -> FlightFilter:
+    """Dependency for flight date/airport filters of flight and ticket lists."""
+    return FlightFilter(departure_from, departure_to, origin, destination, upcoming)
+
+
 # Type aliases for cleaner router signatures
 CurrentAirline = Annotated[AirlineContext, Depends(get_airline_context)]
 SystemAuth = Annotated[bool, Depends(get_system_auth)]
 DbSession = Annotated[AsyncSession, Depends(get_db)]
-
+# GET routes: may be a read replica
+ReadDbSession = Annotated[AsyncSession, Depends(get_read_db)]
+Pagination = Annotated[Page, Depends(get_page)]
+FlightFilters = Annotated[FlightFilter, Depends(get_flight_filter)]
@@ -1,6 +1,8 @@
 """
 Fly Fun Boarding API - FastAPI Application Entry Point
 """
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -8,8 +10,11 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from app.config import settings
-from app.database.connection import engine
+from app.database.connection import dispose_engines, shard_engines
+from app.database.migrations import migrate
+from app.database.stats import reconcile_periodically
 from app.core.exceptions import register_exception_handlers
+from app.services.airport_service import AirportService
 from sqlalchemy import text
 
 # API route prefix from config (e.g. /api/v1)
@@ -19,12 +24,28 @@ API = settings.api_prefix
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan - startup and shutdown events."""
-    # Startup: verify database connection
-    async with engine.begin() as conn:
-        await conn.execute(text("SELECT 1"))
+    # Startup: verify database connections, apply pending schema migrations (every shard)
+    for shard, engine in shard_engines.items():
+        async with engine.begin() as conn:
+            await conn.execute(text("SELECT 1"))
+        if settings.DB_AUTO_MIGRATE:
+            async with engine.connect() as conn:
+                await migrate(conn, shard)
+    # Startup: watch airports.db for updates
+    tasks = []
+    if settings.AIRPORT_DB_WATCH_INTERVAL > 0:
+        tasks.append(asyncio.create_task(AirportService.watch(settings.AIRPORT_DB_WATCH_INTERVAL)))
+    # Startup: repair entity stats drift (rows written by other clients)
+    if settings.STATS_RECONCILE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(reconcile_periodically(settings.STATS_RECONCILE_INTERVAL)))
     yield
-    # Shutdown: dispose engine
-    await engine.dispose()
+    # Shutdown: stop background tasks and airport executor, dispose engines
+    for task in tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    AirportService.shutdown()
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -47,6 +68,10 @@ app.include_router(airline.router, prefix=f"{API}/airline", tags=["airline"])
 # System-level routers (no airline prefix)
 app.include_router(status.router, prefix=f"{API}/status", tags=["status"])
 
+# Admin router (system auth)
+from app.routers import admin
+app.include_router(admin.router, prefix=f"{API}/admin", tags=["admin"])
+
 # Airport router (public, no auth required)
 from app.routers import airport
 app.include_router(airport.router, prefix=f"{API}/airport", tags=["airport"])
@@ -91,6 +116,20 @@ app.include_router(
     tags=["settings"],
 )
 
+from app.routers import sync
+app.include_router(
+    sync.router,
+    prefix=f"{API}/airline/{{airline_identifier}}/sync",
+    tags=["sync"],
+)
+
+from app.routers import batch
+app.include_router(
+    batch.router,
+    prefix=f"{API}/airline/{{airline_identifier}}/batch",
+    tags=["batch"],
+)
+
 # Web pages (user-facing HTML - no auth required, unversioned)
 from app.routers import pages
 app.include_router(pages.router, prefix="/pages", tags=["pages"])
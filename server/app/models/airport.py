@@ -14,19 +14,36 @@ class Airport(BaseJsonModel):
 
     JSON keys match PHP $jsonKeys:
     - icao: str
-    - timezone_identifier: str (default "", excluded from JSON)
+    - timezone_identifier: str (default "", left out of JSON when empty)
+    - info: Optional[dict] (snapshot taken at plan time, stored in the flight JSON and
+      sent to clients with it; left out when None)
     """
     icao: str
     timezone_identifier: str = ""
+    info: Optional[dict] = None
 
     def get_info(self) -> Optional[dict]:
         """
-        Get airport information from AirportService.
+        Get airport information, from the stored snapshot if current.
         
         Matches PHP: Airport->getInfo()
+        Falls back to AirportService when there is no snapshot or it is not
+        current (AirportService.is_current(): older fields or airport data).
         """
+        if AirportService.is_current(self.info):
+            return self.info
         return AirportService.get_airport_by_icao(self.icao)
 
+    async def load(self) -> None:
+        """
+        Load airport info off the event loop unless the snapshot is current.
+        
+        Call before using the synchronous accessors from async code, so they
+        are answered from the resident index.
+        """
+        if not AirportService.is_current(self.info):
+            await AirportService.prefetch([self.icao])
+
     def get_name(self) -> Optional[str]:
         """
         Get airport name.
@@ -45,13 +62,35 @@ class Airport(BaseJsonModel):
         info = self.get_info()
         return info.get('municipality') if info else None
 
+    def get_timezone_identifier(self) -> str:
+        """
+        Get IANA timezone identifier.
+        
+        Uses the client-provided timezone_identifier, otherwise the one
+        resolved offline from the airport coordinates, or its country
+        (see TimezoneService; "" if neither resolves).
+        """
+        if self.timezone_identifier:
+            return self.timezone_identifier
+        info = self.get_info()
+        return (info.get('timezone_identifier') if info else None) or ""
+
+    def get_runways_summary(self) -> Optional[str]:
+        """
+        Get runways summary, from the stored snapshot if current.
+        """
+        info = self.get_info()
+        if info is self.info:
+            return info.get('runways')
+        return AirportService.runways_summary(self.icao)
+
     def get_location(self) -> Optional[dict[str, float]]:
         """
         Get airport location (latitude, longitude).
         
         Matches PHP: Airport->getLocation()
         """
-        return AirportService.get_location(self.icao)
+        return AirportService.location_from_info(self.get_info())
 
     def get_map_url(self) -> Optional[str]:
         """
@@ -59,7 +98,7 @@ class Airport(BaseJsonModel):
         
         Matches PHP: Airport->getMapURL()
         """
-        return AirportService.get_map_url(self.icao)
+        return AirportService.map_url_from_info(self.get_info())
 
     def fit_name(self, maxlen: int) -> str:
         """
@@ -67,8 +106,9 @@ class Airport(BaseJsonModel):
         
         Matches PHP: Airport->fitName()
         """
-        name = self.get_name() or ""
-        city = self.get_city() or ""
+        info = self.get_info() or {}
+        name = info.get('name') or ""
+        city = info.get('municipality') or ""
         
         if len(name) < maxlen:
             return name
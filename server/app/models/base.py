@@ -4,8 +4,15 @@ Base model with PHP-compatible JSON serialization.
 Matches behavior of PHP's JsonHelper::toJson().
 """
 from datetime import datetime, timedelta
-from typing import Any
-from pydantic import BaseModel, ConfigDict
+from functools import cache
+from typing import Any, Optional, Union, get_args, get_origin
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+
+# Version of the JSON the server stores in json_data, recorded in it under
+# JSON_SCHEMA_KEY. Rows at the current version are trusted by row_json().
+# Bump it whenever a model's fields or their serialization change.
+JSON_SCHEMA_VERSION = 1
+JSON_SCHEMA_KEY = "_schema"
 
 
 def timedelta_to_iso8601(td: timedelta) -> str:
@@ -30,6 +37,16 @@ def iso8601_to_timedelta(duration: str) -> timedelta:
     return timedelta(hours=hours, minutes=minutes, seconds=seconds)
 
 
+def stamp_json(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Mark JSON built by the server for storage as JSON_SCHEMA_VERSION.
+
+    Only for JSON whose values are as the models serialize them (e.g. from
+    to_json(), or validated request data), so row_json() can trust it.
+    """
+    return {**data, JSON_SCHEMA_KEY: JSON_SCHEMA_VERSION}
+
+
 class BaseJsonModel(BaseModel):
     """
     Base model with PHP-compatible JSON serialization.
@@ -45,7 +62,9 @@ class BaseJsonModel(BaseModel):
         populate_by_name=True,  # Allow both field name and alias
         use_enum_values=True,
         json_encoders={
-            datetime: lambda v: (v.isoformat() + "+00:00" if v.tzinfo is None else v.isoformat()) if v else None,
+            datetime: lambda v: (
+                (v.isoformat() + "+00:00" if v.tzinfo is None else v.isoformat()) if v else None
+            ),
             timedelta: timedelta_to_iso8601,
         },
     )
@@ -77,3 +96,75 @@ class BaseJsonModel(BaseModel):
         """
         return {}
 
+    @classmethod
+    def row_json(cls, json_data: dict[str, Any], **columns: Any) -> dict[str, Any]:
+        """
+        to_json() of an entity from its row: json_data and the fields kept in
+        columns (ids, identifier, stats), as model_validate({**json_data, **columns}).to_json().
+
+        json_data stamped with the current JSON_SCHEMA_VERSION (see stamp_json)
+        is not validated: its values are already serialized, so it is only
+        reduced to the model's keys without defaults, and the columns validated.
+        Other rows (PHP backend, earlier versions) go through model_validate.
+        """
+        if json_data.get(JSON_SCHEMA_KEY) != JSON_SCHEMA_VERSION:
+            return cls.model_validate({**json_data, **columns}).to_json()
+        # Ids and identifiers are taken as they are, other columns (stats) validated
+        fields, serialized = {}, {}
+        for name, value in columns.items():
+            key = cls.model_fields[name].alias or name
+            if isinstance(value, (int, str)):
+                fields[name] = serialized[key] = value
+            else:
+                adapter = _adapter(cls, name)
+                fields[name] = adapter.validate_python(value)
+                serialized[key] = adapter.dump_python(
+                    fields[name], mode="json", by_alias=True, exclude_defaults=True
+                )
+        data = _project(cls, {**json_data, **serialized})
+        data.update(cls.model_construct(**{**data, **fields}).unique_identifier())
+        return data
+
+
+@cache
+def _adapter(model: type[BaseJsonModel], name: str) -> TypeAdapter:
+    """Validator and serializer of one field of a model."""
+    return TypeAdapter(model.model_fields[name].annotation)
+
+
+@cache
+def _plan(model: type[BaseJsonModel]) -> list[tuple[str, str, Any, Optional[type], bool]]:
+    """
+    Fields of a model for _project: (output key, field name, default, nested
+    model or None, nested is a list).
+    """
+    plan = []
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        is_list = get_origin(annotation) is list
+        if is_list or get_origin(annotation) is Union:
+            args = [arg for arg in get_args(annotation) if arg is not type(None)]
+            annotation = args[0] if len(args) == 1 else None
+        is_model = isinstance(annotation, type) and issubclass(annotation, BaseJsonModel)
+        nested = annotation if is_model else None
+        plan.append((field.alias or name, name, field.default, nested, is_list))
+    return plan
+
+
+def _project(model: type[BaseJsonModel], data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Serialized JSON reduced as model_dump(exclude_defaults=True, by_alias=True)
+    would: the model's keys (alias or field name), defaults and other keys left out.
+    """
+    result = {}
+    for key, name, default, nested, is_list in _plan(model):
+        value = data[key] if key in data else data.get(name, default)
+        if value == default:
+            continue
+        if nested is not None and value is not None:
+            if is_list:
+                value = [_project(nested, item) for item in value]
+            else:
+                value = _project(nested, value)
+        result[key] = value
+    return result
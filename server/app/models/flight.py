@@ -3,6 +3,7 @@ Flight domain model.
 
 Matches PHP Flight class structure and JSON serialization.
 """
+import asyncio
 from datetime import datetime
 from typing import Optional
 from pydantic import Field
@@ -53,6 +54,10 @@ class Flight(BaseJsonModel):
             result["stats"] = [stat.to_json() for stat in self.stats]
         return result
 
+    async def load_airports(self) -> None:
+        """Load origin and destination airport info (see Airport.load())."""
+        await asyncio.gather(self.origin.load(), self.destination.load())
+
     def has_flight_number(self) -> bool:
         """
         Check if flight has a valid flight number.
@@ -77,10 +82,11 @@ class Flight(BaseJsonModel):
         
         date_to_display = self.scheduled_departure_date
         
-        # Apply timezone if origin has timezone_identifier
-        if self.origin.timezone_identifier:
+        # Apply origin timezone (client-provided, else resolved from airport coordinates or country)
+        timezone_identifier = self.origin.get_timezone_identifier()
+        if timezone_identifier:
             try:
-                tz = ZoneInfo(self.origin.timezone_identifier)
+                tz = ZoneInfo(timezone_identifier)
                 # Convert to timezone-aware if needed
                 if date_to_display.tzinfo is None:
                     date_to_display = date_to_display.replace(tzinfo=timezone.utc)
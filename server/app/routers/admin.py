@@ -0,0 +1,105 @@
+"""
+Admin API router.
+
+System-level maintenance endpoints (airport data, schema migrations, stats,
+duplicate cleanup), authenticated with SystemAuth (settings.SECRET).
+"""
+from fastapi import APIRouter, Query
+
+from app.dependencies import SystemAuth
+from app.services.airport_service import AirportService
+
+router = APIRouter()
+
+
+@router.post("/airport/reload")
+async def reload_airports(_: SystemAuth):
+    """
+    Reload airport data from AIRPORT_DB_PATH.
+    
+    The new data is built in the background and swapped in atomically;
+    requests keep being served from the previous data until then.
+    
+    Returns:
+        Airport data version now being served
+    """
+    version = await AirportService.reload_async()
+    return {"version": version}
+
+
+@router.get("/airport/stats")
+async def get_airport_stats(_: SystemAuth):
+    """
+    Get airport lookup statistics.
+    
+    Returns:
+        Executor size (max concurrent queries), queries in flight,
+        query/cache hit/error counts and latencies in milliseconds
+    """
+    return AirportService.stats()
+
+
+@router.post("/migrate")
+async def migrate_schema(_: SystemAuth):
+    """
+    Apply pending schema migrations (see app/database/migrations.py), on every shard.
+    
+    Returns:
+        Versions applied by this call (on the default database), and by shard
+    """
+    from app.database.connection import shard_engines
+    from app.database.migrations import migrate
+    from app.database.sharding import DEFAULT_SHARD
+    
+    applied = {}
+    for shard, engine in shard_engines.items():
+        async with engine.connect() as conn:
+            applied[shard] = await migrate(conn, shard)
+    return {"applied": applied[DEFAULT_SHARD], "shards": applied}
+
+
+@router.post("/stats/reconcile")
+async def reconcile_entity_stats(_: SystemAuth):
+    """
+    Rebuild materialized entity stats (see app/database/stats.py).
+    
+    Returns:
+        Number of airlines reconciled
+    """
+    from app.database.connection import shard_engines
+    from app.database.stats import reconcile_stats
+    
+    count = 0
+    for engine in shard_engines.values():
+        async with engine.connect() as conn:
+            count += await reconcile_stats(conn)
+    return {"airlines": count}
+
+
+@router.post("/dedup")
+async def deduplicate_data(
+    _: SystemAuth,
+    dry_run: bool = Query(True, description="Only count what would be removed"),
+):
+    """
+    Remove duplicate tickets and merge duplicate passengers (see app/database/dedup.py), on every shard.
+    
+    Deletes data, so only counts unless dry_run=false. Migrations 5 and 6
+    wait for this to build their unique indexes: migrate again afterwards.
+    
+    Returns:
+        Tickets removed and passengers merged (or to, with dry_run), by shard
+    """
+    from app.database.connection import shard_engines
+    from app.database.dedup import deduplicate
+    
+    counts = {}
+    for shard, engine in shard_engines.items():
+        async with engine.connect() as conn:
+            counts[shard] = await deduplicate(conn, dry_run)
+    return {
+        "dry_run": dry_run,
+        "tickets": sum(shard_counts["tickets"] for shard_counts in counts.values()),
+        "passengers": sum(shard_counts["passengers"] for shard_counts in counts.values()),
+        "shards": counts,
+    }
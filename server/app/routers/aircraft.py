@@ -3,19 +3,21 @@ Aircraft API router.
 
 Matches PHP AircraftController endpoints.
 """
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select, delete
+from fastapi import APIRouter, Request, Response, status
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.mysql import insert as mysql_insert
 import uuid
 
 from datetime import datetime
 
-from app.dependencies import CurrentAirline, DbSession
+from app.dependencies import CurrentAirline, DbSession, ReadDbSession, Pagination
 from app.database.tables import aircrafts, flights
 from app.schemas.aircraft import AircraftCreate, AircraftResponse
 from app.models.aircraft import Aircraft
+from app.models.base import stamp_json
 from app.core.exceptions import NotFoundError
+from app.core.streaming import list_response
+from app.core.conditional import list_etag, not_modified
 
 router = APIRouter()
 
@@ -50,94 +52,77 @@ async def create_aircraft(
     
     Matches PHP: POST /v1/airline/{airline_identifier}/aircraft/create
     """
+    from app.database.repository import AircraftRepository
+    
     aircraft_identifier = aircraft_identifier_from_registration(aircraft_data.registration)
     
-    json_data = {
+    json_data = stamp_json({
         "registration": aircraft_data.registration,
         "type": aircraft_data.type,
-    }
+    })
     
-    stmt = mysql_insert(aircrafts).values(
-        airline_id=airline.airline_id,
-        aircraft_identifier=aircraft_identifier,
-        json_data=json_data,
-    )
-    stmt = stmt.on_duplicate_key_update(
-        json_data=json_data,
+    repo = AircraftRepository(aircrafts, Aircraft)
+    aircraft = await repo.upsert(
+        {
+            "airline_id": airline.airline_id,
+            "aircraft_identifier": aircraft_identifier,
+            "json_data": json_data,
+        },
+        db,
     )
-    await db.execute(stmt)
     await db.commit()
-    
-    # Fetch the created/updated aircraft
-    query = select(
-        aircrafts.c.aircraft_id,
-        aircrafts.c.aircraft_identifier,
-        aircrafts.c.json_data,
-        aircrafts.c.airline_id,
-        aircrafts.c.modified,
-    ).where(
-        aircrafts.c.aircraft_identifier == aircraft_identifier,
-        aircrafts.c.airline_id == airline.airline_id,
-    )
-    result = await db.execute(query)
-    row = result.fetchone()
-    
-    if not row:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Failed to create aircraft",
-        )
-    
-    aircraft_dict = dict(row._mapping)
-    aircraft_json = aircraft_dict.get("json_data", {})
-    aircraft_json["aircraft_id"] = aircraft_dict["aircraft_id"]
-    aircraft_json["aircraft_identifier"] = aircraft_dict["aircraft_identifier"]
-    aircraft = Aircraft.model_validate(aircraft_json)
     return aircraft.to_json()
 
 
 @router.get("/list")
 async def list_aircrafts(
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
+    page: Pagination,
+    request: Request,
+    response: Response,
 ):
     """
     List all aircrafts with stats.
     
     Matches PHP: GET /v1/airline/{airline_identifier}/aircraft/list
+    Supports keyset pagination (limit/after, next cursor in X-Next-Cursor)
+    and NDJSON streaming (Accept: application/x-ndjson).
     """
     from app.database.repository import AircraftRepository
     
     repo = AircraftRepository(aircrafts, Aircraft)
-    results = await repo.list_with_stats(airline.airline_id, db, [flights])
-    
-    # Convert to model and return JSON
-    aircraft_list = []
-    for row_dict in results:
-        # Extract json_data and merge with identifiers
-        json_data = row_dict.get("json_data", {})
-        json_data["aircraft_id"] = row_dict.get("aircraft_id")
-        json_data["aircraft_identifier"] = row_dict.get("aircraft_identifier")
-        # Add stats
-        stats = []
-        if "flights_count" in row_dict:
-            stats.append({
-                "table": "Flights",
-                "count": row_dict.get("flights_count", 0),
-                "last": _format_iso8601(row_dict.get("flights_last")),
-            })
-        json_data["stats"] = stats
-        aircraft = Aircraft.model_validate(json_data)
-        aircraft_list.append(aircraft.to_json())
-    
-    return aircraft_list
+    etag = await list_etag(request, db, airline.airline_id, [aircrafts, flights])
+    cached = not_modified(request, response, etag)
+    if cached is not None:
+        return cached
+    
+    async def aircraft_list():
+        # Yield JSON, from json_data merged with identifiers and stats
+        async for row_dict in repo.stream_with_stats(airline.airline_id, db, [flights], page):
+            # Add stats
+            stats = []
+            if "flights_count" in row_dict:
+                stats.append({
+                    "table": "Flights",
+                    "count": row_dict.get("flights_count", 0),
+                    "last": _format_iso8601(row_dict.get("flights_last")),
+                })
+            yield Aircraft.row_json(
+                row_dict.get("json_data") or {},
+                aircraft_id=row_dict.get("aircraft_id"),
+                aircraft_identifier=row_dict.get("aircraft_identifier"),
+                stats=stats,
+            )
+    
+    return await list_response(request, response, aircraft_list(), page, etag)
 
 
 @router.get("/{aircraft_identifier}", response_model=AircraftResponse)
 async def get_aircraft(
     aircraft_identifier: str,
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
 ):
     """
     Get aircraft by identifier.
@@ -159,12 +144,17 @@ async def get_aircraft(
 async def list_aircraft_flights(
     aircraft_identifier: str,
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
+    page: Pagination,
+    request: Request,
+    response: Response,
 ):
     """
     List flights for an aircraft.
     
     Matches PHP: GET /v1/airline/{airline_identifier}/aircraft/{aircraft_identifier}/flights
+    Supports keyset pagination (limit/after, next cursor in X-Next-Cursor)
+    and NDJSON streaming (Accept: application/x-ndjson).
     """
     from app.database.repository import AircraftRepository, FlightRepository
     from app.models.flight import Flight
@@ -177,15 +167,10 @@ async def list_aircraft_flights(
         raise NotFoundError("Aircraft", aircraft_identifier)
     
     # List flights for this aircraft
-    query = select(flights).where(
-        flights.c.aircraft_id == aircraft.aircraft_id,
-        flights.c.airline_id == airline.airline_id,
-    )
-    result = await db.execute(query)
-    rows = result.fetchall()
-    
     flight_repo = FlightRepository(flights, Flight)
-    flights_list = [flight_repo._row_to_model(row) for row in rows]
+    flights_list = flight_repo.stream_json(
+        airline.airline_id, db, page, where=(flights.c.aircraft_id == aircraft.aircraft_id,)
+    )
     
-    return [flight.to_json() for flight in flights_list]
+    return await list_response(request, response, flights_list, page)
 
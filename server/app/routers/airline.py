@@ -4,12 +4,12 @@ Airline management endpoints.
 Matches PHP AirlineController functionality.
 """
 from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.mysql import insert as mysql_insert
 import hashlib
 
-from app.dependencies import CurrentAirline, DbSession
+from app.dependencies import CurrentAirline, DbSession, ReadDbSession
+from app.core.access_token import access_tokens_enabled, issue_access_token
+from app.core.auth_cache import airline_auth_cache
 from app.database.tables import airlines
 from app.schemas.airline import AirlineCreate, AirlineResponse
 from app.models.airline import Airline
@@ -38,6 +38,10 @@ async def create_airline(
     Matches PHP: POST /v1/airline/create
     The apple_identifier itself serves as the credential (from Apple Sign In).
     """
+    from app.database.connection import shard_directory, shard_sessions
+    from app.database.repository import BaseRepository
+    from app.database.sharding import DEFAULT_SHARD
+
     # Generate airline_identifier from apple_identifier
     airline_identifier = airline_identifier_from_apple_identifier(
         airline_data.apple_identifier
@@ -49,43 +53,30 @@ async def create_airline(
         "airline_name": airline_data.airline_name,
     }
 
-    # MySQL INSERT ... ON DUPLICATE KEY UPDATE
-    stmt = mysql_insert(airlines).values(
-        airline_identifier=airline_identifier,
-        json_data=json_data,
-    )
-    stmt = stmt.on_duplicate_key_update(json_data=json_data)
-
-    await db.execute(stmt)
-    await db.commit()
-
-    # Retrieve the created/updated airline
-    query = select(airlines).where(
-        airlines.c.airline_identifier == airline_identifier
-    )
-    result = await db.execute(query)
-    row = result.fetchone()
-
-    if not row:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid Airline",
+    # The injected session is on the default database: the path has no airline to route by
+    shard = await shard_directory.place_airline(airline_identifier)
+    if shard != DEFAULT_SHARD:
+        db = shard_sessions[shard]()
+
+    repo = BaseRepository(airlines, Airline)
+    async with db:
+        airline = await repo.upsert(
+            {
+                "airline_identifier": airline_identifier,
+                "json_data": json_data,
+            },
+            db,
         )
+        await db.commit()
+    await airline_auth_cache.invalidate(airline_identifier)
 
-    # Convert to model
-    airline_dict = dict(row._mapping)
-    airline_json = airline_dict.get("json_data", {})
-    airline_json["airline_id"] = airline_dict["airline_id"]
-    airline_json["airline_identifier"] = airline_dict["airline_identifier"]
-
-    airline = Airline.model_validate(airline_json)
     return airline.to_json()
 
 
 @router.get("/{airline_identifier}", response_model=AirlineResponse)
 async def get_airline(
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
 ):
     """
     Get airline by identifier.
@@ -96,7 +87,7 @@ async def get_airline(
     # Airline is already validated and loaded by dependency
     airline_model = Airline.model_validate(
         {
-            **airline.airline_data,
+            **await airline.load_data(db),
             "airline_id": airline.airline_id,
             "airline_identifier": airline.airline_identifier,
         }
@@ -107,7 +98,7 @@ async def get_airline(
 @router.get("/{airline_identifier}/keys")
 async def get_airline_keys(
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
 ):
     """
     Get airline's public keys.
@@ -118,7 +109,7 @@ async def get_airline_keys(
     from app.services.signature_service import SignatureService
     
     # Get apple_identifier from airline data
-    apple_identifier = airline.airline_data.get("apple_identifier")
+    apple_identifier = (await airline.load_data(db)).get("apple_identifier")
     if not apple_identifier:
         return []
     
@@ -132,6 +123,38 @@ async def get_airline_keys(
     return [public_keys]
 
 
+@router.post("/{airline_identifier}/token", status_code=status.HTTP_200_OK)
+async def create_access_token(
+    airline: CurrentAirline,
+):
+    """
+    Exchange the airline's credential for a short-lived access token.
+    
+    Path: POST /v1/airline/{airline_identifier}/token
+    Authenticated with the apple_identifier as for other endpoints (not with
+    an access token, so tokens cannot be renewed without the credential).
+    The returned token is sent as Bearer instead, and is checked by its
+    signature alone (see app.core.access_token).
+    """
+    if airline.access_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid Bearer Token",
+        )
+    if not access_tokens_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Access tokens not configured",
+        )
+    
+    token, expires_in = issue_access_token(airline.airline_id, airline.airline_identifier)
+    return {
+        "access_token": token,
+        "token_type": "Bearer",
+        "expires_in": expires_in,
+    }
+
+
 @router.delete("/{airline_identifier}", status_code=status.HTTP_200_OK)
 async def delete_airline(
     airline: CurrentAirline,
@@ -147,6 +170,7 @@ async def delete_airline(
     stmt = delete(airlines).where(airlines.c.airline_id == airline.airline_id)
     await db.execute(stmt)
     await db.commit()
+    await airline_auth_cache.invalidate(airline.airline_identifier)
 
     return {
         "status": 1,
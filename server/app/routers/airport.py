@@ -24,7 +24,7 @@ async def get_airport_by_icao(icao: Optional[str] = Query(None, description="ICA
             detail="Bad Request, Airport not found"
         )
     
-    airport_info = AirportService.get_airport_by_icao(icao)
+    airport_info = await AirportService.get_airport_by_icao_async(icao)
     
     if not airport_info:
         raise HTTPException(
@@ -42,7 +42,7 @@ async def get_airport_info(icao: str):
     
     Matches PHP: GET /v1/airport/info/{icao}
     """
-    airport_info = AirportService.get_airport_by_icao(icao)
+    airport_info = await AirportService.get_airport_by_icao_async(icao)
     
     if not airport_info:
         raise HTTPException(
@@ -52,3 +52,19 @@ async def get_airport_info(icao: str):
     
     return airport_info
 
+
+
+@router.get("/{icao}/runways")
+async def get_airport_runways(icao: str):
+    """
+    Get runways for an airport (length, surface, headings).
+    
+    Path: GET /v1/airport/{icao}/runways
+    """
+    if not await AirportService.get_airport_by_icao_async(icao):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bad Request, Airport not found"
+        )
+    
+    return [runway._asdict() for runway in await AirportService.get_runways_async(icao)]
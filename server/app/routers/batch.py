@@ -0,0 +1,189 @@
+"""
+Batch API router.
+
+Runs an ordered list of airline-scoped operations (create aircraft,
+passengers, flights, tickets...) in one request: one authentication and
+one transaction instead of a round trip and a commit per call.
+"""
+import inspect
+import logging
+import re
+from typing import Any, Callable, get_type_hints
+
+from fastapi import APIRouter, HTTPException, status
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.dependencies import CurrentAirline, DbSession
+from app.core.exceptions import APIError
+from app.routers import aircraft, passenger, flight, ticket
+from app.schemas.batch import BatchOperation
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Operations: (method, path under the airline) -> endpoint. Endpoints are
+# called directly with the batch's airline and session; more specific paths
+# come first.
+OPERATIONS: list[tuple[str, str, Callable]] = [
+    ("POST", "aircraft/create", aircraft.create_aircraft),
+    ("GET", "aircraft/{aircraft_identifier}", aircraft.get_aircraft),
+    ("POST", "passenger/create", passenger.create_passenger),
+    ("POST", "passenger/bulk", passenger.bulk_create_passengers),
+    ("GET", "passenger/{passenger_identifier}", passenger.get_passenger),
+    ("POST", "flight/plan/{aircraft_identifier}/series", flight.plan_flight_series),
+    ("POST", "flight/plan/{aircraft_identifier}", flight.plan_flight),
+    ("POST", "flight/amend/{flight_identifier}", flight.amend_flight),
+    ("GET", "flight/{flight_identifier}", flight.get_flight),
+    ("DELETE", "flight/{flight_identifier}", flight.delete_flight),
+    ("POST", "ticket/issue/{flight_identifier}/{passenger_identifier}", ticket.issue_ticket),
+    ("POST", "ticket/issue/{flight_identifier}", ticket.issue_tickets),
+    ("GET", "ticket/{ticket_identifier}", ticket.get_ticket),
+    ("DELETE", "ticket/{ticket_identifier}", ticket.delete_ticket),
+]
+
+# "$name.field": field of the result of the operation with ref name
+_REFERENCE_RE = re.compile(r"^\$(\w+)\.(\w+)$")
+
+
+class _BatchSession:
+    """Session shared by the operations of a batch: their commits are deferred to the end."""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    async def commit(self) -> None:
+        pass
+
+
+def _match(method: str, path: str) -> tuple[Callable, dict[str, str]] | None:
+    """Find the endpoint for an operation, and its path parameters."""
+    segments = path.strip("/").split("/")
+    for operation_method, template, endpoint in OPERATIONS:
+        parts = template.split("/")
+        if operation_method != method or len(parts) != len(segments):
+            continue
+        params = {}
+        for part, segment in zip(parts, segments, strict=True):
+            if part.startswith("{"):
+                params[part[1:-1]] = segment
+            elif part != segment:
+                break
+        else:
+            return endpoint, params
+    return None
+
+
+def _resolve(value: Any, results: dict[str, Any]) -> Any:
+    """Replace "$name.field" references by values from earlier results."""
+    if isinstance(value, str):
+        match = _REFERENCE_RE.match(value)
+        if not match:
+            return value
+        name, field = match.groups()
+        if name not in results or not isinstance(results[name], dict) or field not in results[name]:
+            raise ValueError(f"unknown reference '{value}'")
+        return results[name][field]
+    if isinstance(value, list):
+        return [_resolve(item, results) for item in value]
+    if isinstance(value, dict):
+        return {key: _resolve(item, results) for key, item in value.items()}
+    return value
+
+
+async def _run(
+    operation: BatchOperation, results: dict[str, Any], airline, db: _BatchSession
+) -> Any:
+    """Run one operation and return its result."""
+    try:
+        path = "/".join(
+            str(_resolve(segment, results)) for segment in operation.path.strip("/").split("/")
+        )
+        body = _resolve(operation.body, results)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Bad Request, {e}"
+        ) from e
+    matched = _match(operation.method.upper(), path)
+    if matched is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Bad Request, unsupported operation {operation.method.upper()} {operation.path}"
+            ),
+        )
+    endpoint, kwargs = matched
+
+    # The remaining parameter, if any, is the request body
+    hints = get_type_hints(endpoint)
+    for name in inspect.signature(endpoint).parameters:
+        if name in kwargs or name in ("airline", "db"):
+            continue
+        try:
+            kwargs[name] = TypeAdapter(hints[name]).validate_python(body)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=422,
+                detail="; ".join(
+                    f"{'.'.join(str(x) for x in error['loc'])}: {error['msg']}"
+                    for error in e.errors()
+                ),
+            ) from e
+    return await endpoint(**kwargs, airline=airline, db=db)
+
+
+@router.post("", status_code=status.HTTP_200_OK)
+async def batch(
+    operations: list[BatchOperation],
+    airline: CurrentAirline,
+    db: DbSession,
+):
+    """
+    Run several operations in one transaction.
+    
+    Path: POST /v1/airline/{airline_identifier}/batch
+    Body is a JSON array of {method, path, body, ref}: path is relative to
+    the airline (e.g. "aircraft/create", "flight/plan/{aircraft_identifier}")
+    and body is the endpoint's request body. A string "$name.field" in a path
+    segment or the body is replaced by that field of the result of the
+    earlier operation with ref name (e.g. "$plane.aircraft_identifier").
+    Operations run in order and are committed together; if one fails,
+    nothing is written and the error names the operation.
+    
+    Returns:
+        One {"status", "body"} per operation, in order
+    """
+    if len(operations) > settings.BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bad Request, at most {settings.BULK_MAX_ROWS} operations per request",
+        )
+    
+    batch_db = _BatchSession(db)
+    results = {}
+    responses = []
+    for index, operation in enumerate(operations):
+        name = f"Operation {index} ({operation.method.upper()} {operation.path})"
+        try:
+            result = await _run(operation, results, airline, batch_db)
+        except (APIError, HTTPException) as e:
+            await db.rollback()
+            raise HTTPException(status_code=e.status_code, detail=f"{name}: {e.detail}") from e
+        except Exception as e:
+            # e.g. an IntegrityError: the session is unusable until rolled back
+            await db.rollback()
+            logger.exception("%s failed", name)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"{name}: Internal server error",
+            ) from e
+        if operation.ref:
+            results[operation.ref] = result
+        responses.append({"status": status.HTTP_200_OK, "body": result})
+    await db.commit()
+    
+    return responses
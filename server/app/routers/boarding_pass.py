@@ -8,7 +8,7 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 import io
 
-from app.dependencies import CurrentAirline, DbSession
+from app.dependencies import CurrentAirline, ReadDbSession
 from app.database.tables import tickets
 from app.models.ticket import Ticket
 from app.models.settings import Settings
@@ -60,6 +60,9 @@ async def _get_boarding_pass_data(
     airline_model.airline_id = airline_id
     airline_model.airline_identifier = airline_identifier
     
+    # Load airport info off the event loop before building the pass
+    await ticket.flight.load_airports()
+    
     # Create boarding pass service
     boarding_pass_service = BoardingPassService(
         ticket=ticket,
@@ -74,7 +77,7 @@ async def _get_boarding_pass_data(
 async def get_boarding_pass_debug(
     ticket_identifier: str,
     airline: CurrentAirline = None,
-    db: DbSession = None,
+    db: ReadDbSession = None,
 ):
     """
     Get boarding pass JSON data (debug mode) - path-based alternative to ?debug.
@@ -86,7 +89,7 @@ async def get_boarding_pass_debug(
         ticket_identifier,
         airline.airline_id,
         airline.airline_identifier,
-        airline.airline_data,
+        await airline.load_data(db),
         db
     )
     return pass_data
@@ -97,7 +100,7 @@ async def get_boarding_pass(
     ticket_identifier: str,
     debug: bool = Query(False, description="Return JSON instead of PKPass file"),
     airline: CurrentAirline = None,
-    db: DbSession = None,
+    db: ReadDbSession = None,
 ):
     """
     Get boarding pass as PKPass file or JSON (debug mode via query param).
@@ -113,7 +116,7 @@ async def get_boarding_pass(
             ticket_identifier,
             airline.airline_id,
             airline.airline_identifier,
-            airline.airline_data,
+            await airline.load_data(db),
             db
         )
         return pass_data
@@ -143,11 +146,14 @@ async def get_boarding_pass(
             airline_settings = Settings()  # Use defaults
         
         # Create airline model
-        airline_data = airline.airline_data
+        airline_data = await airline.load_data(db)
         airline_model = Airline.model_validate(airline_data)
         airline_model.airline_id = airline.airline_id
         airline_model.airline_identifier = airline.airline_identifier
         
+        # Load airport info off the event loop before building the pass
+        await ticket.flight.load_airports()
+        
         # Create boarding pass service
         boarding_pass_service = BoardingPassService(
             ticket=ticket,
@@ -243,6 +249,9 @@ async def _get_public_boarding_pass_data(
     else:
         airline_settings = Settings()  # Use defaults
     
+    # Load airport info off the event loop before building the pass
+    await ticket.flight.load_airports()
+    
     # Create boarding pass service
     boarding_pass_service = BoardingPassService(
         ticket=ticket,
@@ -256,7 +265,7 @@ async def _get_public_boarding_pass_data(
 @public_router.get("/{ticket_identifier}/debug")
 async def get_public_boarding_pass_debug(
     ticket_identifier: str,
-    db: DbSession = None,
+    db: ReadDbSession = None,
 ):
     """
     Public boarding pass JSON data (debug mode) - path-based alternative to ?debug.
@@ -273,7 +282,7 @@ async def get_public_boarding_pass_debug(
 async def get_public_boarding_pass(
     ticket_identifier: str,
     debug: bool = Query(False, description="Return JSON instead of PKPass file"),
-    db: DbSession = None,
+    db: ReadDbSession = None,
 ):
     """
     Public boarding pass endpoint - no airline auth required.
@@ -353,6 +362,9 @@ async def get_public_boarding_pass(
         else:
             airline_settings = Settings()  # Use defaults
         
+        # Load airport info off the event loop before building the pass
+        await ticket.flight.load_airports()
+        
         # Create boarding pass service
         boarding_pass_service = BoardingPassService(
             ticket=ticket,
@@ -3,20 +3,33 @@ Flight API router.
 
 Matches PHP FlightController endpoints.
 """
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.mysql import insert as mysql_insert
 import uuid
+import zoneinfo
 
-from datetime import datetime
+from datetime import datetime, timezone
 
-from app.dependencies import CurrentAirline, DbSession
-from app.database.tables import flights, aircrafts, tickets
-from app.schemas.flight import FlightCreate, FlightResponse
+from app.config import settings
+
+from app.dependencies import CurrentAirline, DbSession, ReadDbSession, FlightFilters, Pagination
+from app.database.filters import departure_key
+from app.database.tables import flights, aircrafts, passengers, tickets
+from app.database.stats import refresh_stats
+from app.database.snapshots import refresh_ticket_snapshots
+from app.database.versions import list_changed
+from app.schemas.flight import FlightCreate, FlightResponse, FlightSeriesCreate
+from app.schemas.airport import AirportSchema
 from app.models.flight import Flight
 from app.models.aircraft import Aircraft
+from app.models.passenger import Passenger
+from app.models.base import stamp_json
+from app.core.recurrence import expand, parse_rrule
 from app.core.exceptions import NotFoundError
+from app.core.streaming import list_response
+from app.core.conditional import list_etag, not_modified
+from app.services.airport_service import AirportService
 
 router = APIRouter()
 
@@ -41,26 +54,43 @@ def flight_identifier_from_data(flight_data: dict) -> str:
     return str(uuid.uuid4())
 
 
-@router.post("/plan/{aircraft_identifier}", response_model=FlightResponse, status_code=status.HTTP_200_OK)
-async def plan_flight(
-    aircraft_identifier: str,
-    flight_data: FlightCreate,
-    airline: CurrentAirline,
-    db: DbSession,
-):
+async def airport_json_with_snapshot(airport: AirportSchema) -> dict:
     """
-    Create or plan a flight for an aircraft.
+    Build airport JSON for storage, including a snapshot of the airport info.
     
-    Matches PHP: POST /v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}
+    The snapshot (name, city, coordinates, country...) is resolved once here
+    so that serving passes and pages does not need the airport database.
+    A missing timezone_identifier is filled from the resolved airport timezone.
     """
+    airport_json = airport.model_dump(by_alias=True)
+    info = await AirportService.snapshot_async(airport.icao)
+    if info:
+        airport_json["info"] = info
+        if not airport_json.get("timezone_identifier") and info.get("timezone_identifier"):
+            airport_json["timezone_identifier"] = info["timezone_identifier"]
+    return airport_json
+
+
+async def flight_json(flight_data: FlightCreate, aircraft: Aircraft) -> dict:
+    """Build the stored JSON of a flight - include aircraft in the JSON."""
+    return stamp_json({
+        "origin": await airport_json_with_snapshot(flight_data.origin),
+        "destination": await airport_json_with_snapshot(flight_data.destination),
+        "gate": flight_data.gate,
+        "flightNumber": flight_data.flight_number,
+        "aircraft": aircraft.to_json(),
+        # Stored in UTC, so the generated scheduled_departure column orders correctly
+        "scheduledDepartureDate": departure_key(flight_data.scheduled_departure_date) + "+00:00",
+    })
+
+
+async def find_aircraft(aircraft_identifier: str, airline_id: int, db: AsyncSession) -> Aircraft:
+    """Get the aircraft a flight is planned for, by identifier or numeric id."""
     from app.database.repository import AircraftRepository
     
-    # Get the aircraft
     aircraft_repo = AircraftRepository(aircrafts, Aircraft)
     # First try by identifier (Python tests / new clients)
-    aircraft = await aircraft_repo.get_by_identifier(
-        aircraft_identifier, airline.airline_id, db
-    )
+    aircraft = await aircraft_repo.get_by_identifier(aircraft_identifier, airline_id, db)
 
     # For backwards compatibility with PHP, also support numeric aircraft_id
     # used in the original /flight/plan/{aircraft_id} endpoint.
@@ -71,127 +101,273 @@ async def plan_flight(
             aircraft_id = None
 
         if aircraft_id is not None:
-            aircraft = await aircraft_repo.get_by_id(
-                aircraft_id, airline.airline_id, db
-            )
+            aircraft = await aircraft_repo.get_by_id(aircraft_id, airline_id, db)
     
     if not aircraft:
         raise NotFoundError("Aircraft", aircraft_identifier)
+    return aircraft
+
+
+@router.post(
+    "/plan/{aircraft_identifier}", response_model=FlightResponse, status_code=status.HTTP_200_OK
+)
+async def plan_flight(
+    aircraft_identifier: str,
+    flight_data: FlightCreate,
+    airline: CurrentAirline,
+    db: DbSession,
+):
+    """
+    Create or plan a flight for an aircraft.
+    
+    Matches PHP: POST /v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}
+    """
+    from app.database.repository import FlightRepository
+    
+    aircraft = await find_aircraft(aircraft_identifier, airline.airline_id, db)
     
     # Generate flight identifier
     flight_identifier = flight_identifier_from_data(flight_data.model_dump())
     
-    # Build JSON data - include aircraft in the JSON
-    json_data = {
-        "origin": flight_data.origin.model_dump(by_alias=True),
-        "destination": flight_data.destination.model_dump(by_alias=True),
-        "gate": flight_data.gate,
-        "flightNumber": flight_data.flight_number,
-        "aircraft": aircraft.to_json(),
-        "scheduledDepartureDate": flight_data.scheduled_departure_date.isoformat(),
-    }
-    
-    stmt = mysql_insert(flights).values(
-        airline_id=airline.airline_id,
-        aircraft_id=aircraft.aircraft_id,
-        flight_identifier=flight_identifier,
-        json_data=json_data,
-    )
-    stmt = stmt.on_duplicate_key_update(json_data=json_data)
-    await db.execute(stmt)
-    await db.commit()
+    json_data = await flight_json(flight_data, aircraft)
     
-    # Fetch the created/updated flight
-    query = select(
-        flights.c.flight_id,
-        flights.c.flight_identifier,
-        flights.c.aircraft_id,
-        flights.c.json_data,
-        flights.c.airline_id,
-        flights.c.modified,
-    ).where(
-        flights.c.flight_identifier == flight_identifier,
-        flights.c.airline_id == airline.airline_id,
+    flight_repo = FlightRepository(flights, Flight)
+    flight = await flight_repo.upsert(
+        {
+            "airline_id": airline.airline_id,
+            "aircraft_id": aircraft.aircraft_id,
+            "flight_identifier": flight_identifier,
+            "json_data": json_data,
+        },
+        db,
     )
-    result = await db.execute(query)
-    row = result.fetchone()
+    await refresh_stats(db, aircrafts, [aircraft.aircraft_id])
+    await db.commit()
+    return flight.to_json()
+
+
+@router.post("/plan/{aircraft_identifier}/series", status_code=status.HTTP_200_OK)
+async def plan_flight_series(
+    aircraft_identifier: str,
+    series_data: FlightSeriesCreate,
+    airline: CurrentAirline,
+    db: DbSession,
+):
+    """
+    Plan a recurring series of flights for an aircraft.
+    
+    Path: POST /v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}/series
+    Body is a flight as for /flight/plan, with scheduledDepartureDate the first
+    departure, a recurrence rule (RRULE subset, see app.core.recurrence, e.g.
+    "FREQ=WEEKLY;BYDAY=SA;COUNT=10") and optionally passengers
+    ({passenger_identifier, seatNumber, customLabelValue}) issued a ticket on
+    each flight. Departures keep their local time at the origin airport. The
+    flights are inserted with one multi-row INSERT and the tickets issued as
+    by /ticket/issue, with one multi-row upsert, in one transaction.
+    
+    Returns:
+        Flights in departure order
+    """
+    from app.database.repository import PassengerRepository
+    from app.routers.ticket import write_tickets
+    from app.schemas.ticket import TicketCreate
     
-    if not row:
+    try:
+        recurrence = parse_rrule(series_data.recurrence)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bad Request, invalid recurrence: {e}",
+        ) from e
+    
+    aircraft = await find_aircraft(aircraft_identifier, airline.airline_id, db)
+    
+    # Airports are resolved once for the whole series
+    json_data = await flight_json(series_data, aircraft)
+    try:
+        zone = zoneinfo.ZoneInfo(json_data["origin"].get("timezone_identifier") or "UTC")
+    except (ValueError, zoneinfo.ZoneInfoNotFoundError):
+        zone = timezone.utc
+    try:
+        departures = expand(
+            recurrence, series_data.scheduled_departure_date, zone, settings.BULK_MAX_ROWS
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bad Request, {e} in series",
+        ) from e
+    if len(departures) * len(series_data.passengers) > settings.BULK_MAX_ROWS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Failed to create flight",
+            detail=f"Bad Request, at most {settings.BULK_MAX_ROWS} tickets per request",
         )
     
-    flight_dict = dict(row._mapping)
-    flight_json = flight_dict.get("json_data", {})
-    flight_json["flight_id"] = flight_dict["flight_id"]
-    flight_json["flight_identifier"] = flight_dict["flight_identifier"]
-    flight_json["aircraft_id"] = flight_dict["aircraft_id"]
-    flight = Flight.model_validate(flight_json)
-    return flight.to_json()
+    # Template passengers, with one IN query
+    by_identifier = {}
+    if series_data.passengers:
+        passenger_repo = PassengerRepository(passengers, Passenger)
+        identifiers = list({passenger.passenger_identifier for passenger in series_data.passengers})
+        by_identifier = {
+            passenger.passenger_identifier: passenger
+            async for passenger in passenger_repo.stream(
+                airline.airline_id, db, where=(passengers.c.passenger_identifier.in_(identifiers),)
+            )
+        }
+        missing = [identifier for identifier in identifiers if identifier not in by_identifier]
+        if missing:
+            raise NotFoundError("Passenger", ", ".join(sorted(missing)))
+    
+    rows = []
+    for departure in departures:
+        rows.append({
+            "airline_id": airline.airline_id,
+            "aircraft_id": aircraft.aircraft_id,
+            "flight_identifier": flight_identifier_from_data(series_data.model_dump()),
+            "json_data": {
+                **json_data,
+                "scheduledDepartureDate": departure_key(departure) + "+00:00",
+            },
+        })
+    if not rows:
+        return []
+    await db.execute(insert(flights).values(rows))
+    # Multi-row inserts do not report every id: read them back by identifier
+    query = select(flights.c.flight_identifier, flights.c.flight_id).where(
+        flights.c.flight_identifier.in_([row["flight_identifier"] for row in rows])
+    )
+    flight_ids = {row.flight_identifier: row.flight_id for row in await db.execute(query)}
+    
+    series = []
+    for row in rows:
+        flight_json_data = dict(row["json_data"])
+        flight_json_data["flight_id"] = flight_ids[row["flight_identifier"]]
+        flight_json_data["flight_identifier"] = row["flight_identifier"]
+        flight_json_data["aircraft_id"] = aircraft.aircraft_id
+        series.append(Flight.model_validate(flight_json_data))
+    
+    if series_data.passengers:
+        # One ticket per passenger and flight (the last entry wins)
+        template = {
+            passenger.passenger_identifier: TicketCreate(
+                seatNumber=passenger.seat_number, customLabelValue=passenger.custom_label_value
+            )
+            for passenger in series_data.passengers
+        }
+        await write_tickets(
+            db,
+            airline.airline_id,
+            [
+                (flight, by_identifier[identifier], ticket_data)
+                for flight in series
+                for identifier, ticket_data in template.items()
+            ],
+        )
+    await refresh_stats(db, aircrafts, [aircraft.aircraft_id])
+    list_changed(db, airline.airline_id)
+    await db.commit()
+    
+    return [flight.to_json() for flight in series]
+
+
+@router.post(
+    "/amend/{flight_identifier}", response_model=FlightResponse, status_code=status.HTTP_200_OK
+)
+async def amend_flight(
+    flight_identifier: str,
+    flight_data: FlightCreate,
+    airline: CurrentAirline,
+    db: DbSession,
+):
+    """
+    Amend a flight (gate, time, airports, flight number).
+    
+    Matches PHP: POST /v1/airline/{airline_identifier}/flight/amend/{flight_identifier}
+    The flight keeps its aircraft. The copy of the flight in its tickets is
+    rewritten in the same transaction, so their passes show the change.
+    """
+    from app.database.repository import FlightRepository
+    
+    flight_repo = FlightRepository(flights, Flight)
+    flight = await flight_repo.get_by_identifier(flight_identifier, airline.airline_id, db)
+    
+    if not flight:
+        raise NotFoundError("Flight", flight_identifier)
+    
+    json_data = await flight_json(flight_data, flight.aircraft)
+    await db.execute(
+        update(flights).where(flights.c.flight_id == flight.flight_id).values(json_data=json_data)
+    )
+    await refresh_ticket_snapshots(db, flights, [flight.flight_id])
+    list_changed(db, airline.airline_id)
+    await db.commit()
+    
+    json_data["flight_id"] = flight.flight_id
+    json_data["flight_identifier"] = flight.flight_identifier
+    return Flight.model_validate(json_data).to_json()
 
 
 @router.get("/list")
 async def list_flights(
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
+    page: Pagination,
+    flight_filter: FlightFilters,
+    request: Request,
+    response: Response,
 ):
     """
     List all flights with stats.
     
     Matches PHP: GET /v1/airline/{airline_identifier}/flight/list
+    Supports keyset pagination (limit/after, next cursor in X-Next-Cursor)
+    and NDJSON streaming (Accept: application/x-ndjson).
+    Filters: from, to (departure date), origin, destination (ICAO), upcoming=true.
     """
     from app.database.repository import FlightRepository
-    from sqlalchemy import select, func as sql_func
-    
-    # Custom query for flights with stats that includes aircraft_id
-    table_ref = flights
-    select_cols = [
-        table_ref.c.flight_id,
-        table_ref.c.flight_identifier,
-        table_ref.c.aircraft_id,  # Include aircraft_id for flights
-        table_ref.c.json_data,
-        table_ref.c.airline_id,
-        table_ref.c.modified,
-        sql_func.count(tickets.c.ticket_id).label("tickets_count"),
-        sql_func.max(tickets.c.modified).label("tickets_last"),
-    ]
-    
-    query = select(*select_cols).select_from(table_ref)
-    query = query.outerjoin(tickets, table_ref.c.flight_id == tickets.c.flight_id)
-    query = query.where(table_ref.c.airline_id == airline.airline_id)
-    query = query.group_by(table_ref.c.flight_id)
-    
-    result = await db.execute(query)
-    results = [dict(row._mapping) for row in result.fetchall()]
-    
-    # Convert to model and return JSON
-    flight_list = []
-    for row_dict in results:
-        json_data = row_dict.get("json_data", {})
-        json_data["flight_id"] = row_dict.get("flight_id")
-        json_data["flight_identifier"] = row_dict.get("flight_identifier")
-        json_data["aircraft_id"] = row_dict.get("aircraft_id", -1)
-        # Add stats
-        stats = []
-        if "tickets_count" in row_dict and row_dict.get("tickets_count", 0) > 0:
-            stats.append({
-                "table": "Tickets",
-                "count": row_dict.get("tickets_count", 0),
-                "last": _format_iso8601(row_dict.get("tickets_last")),
-            })
-        json_data["stats"] = stats
-        flight = Flight.model_validate(json_data)
-        flight_list.append(flight.to_json())
-    
-    return flight_list
+    
+    # Rows include aircraft_id (Flights link to Aircrafts)
+    repo = FlightRepository(flights, Flight)
+    etag = await list_etag(
+        request,
+        db,
+        airline.airline_id,
+        [flights, tickets],
+        flight_filter.etag_part(flights, airline.airline_id),
+    )
+    cached = not_modified(request, response, etag)
+    if cached is not None:
+        return cached
+    
+    async def flight_list():
+        # Yield JSON, from json_data merged with identifiers and stats
+        async for row_dict in repo.stream_with_stats(
+            airline.airline_id, db, [tickets], page, where=flight_filter.conditions(flights)
+        ):
+            # Add stats
+            stats = []
+            if "tickets_count" in row_dict and row_dict.get("tickets_count", 0) > 0:
+                stats.append({
+                    "table": "Tickets",
+                    "count": row_dict.get("tickets_count", 0),
+                    "last": _format_iso8601(row_dict.get("tickets_last")),
+                })
+            yield Flight.row_json(
+                row_dict.get("json_data") or {},
+                flight_id=row_dict.get("flight_id"),
+                flight_identifier=row_dict.get("flight_identifier"),
+                aircraft_id=row_dict.get("aircraft_id", -1),
+                stats=stats,
+            )
+    
+    return await list_response(request, response, flight_list(), page, etag)
 
 
 @router.get("/{flight_identifier}", response_model=FlightResponse)
 async def get_flight(
     flight_identifier: str,
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
 ):
     """
     Get flight by identifier.
@@ -213,12 +389,17 @@ async def get_flight(
 async def list_flight_tickets(
     flight_identifier: str,
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
+    page: Pagination,
+    request: Request,
+    response: Response,
 ):
     """
     List tickets for a flight.
     
     Matches PHP: GET /v1/airline/{airline_identifier}/flight/{flight_identifier}/tickets
+    Supports keyset pagination (limit/after, next cursor in X-Next-Cursor)
+    and NDJSON streaming (Accept: application/x-ndjson).
     """
     from app.database.repository import FlightRepository, TicketRepository
     from app.models.ticket import Ticket
@@ -231,25 +412,12 @@ async def list_flight_tickets(
         raise NotFoundError("Flight", flight_identifier)
     
     # List tickets for this flight
-    query = select(
-        tickets.c.ticket_id,
-        tickets.c.ticket_identifier,
-        tickets.c.passenger_id,
-        tickets.c.flight_id,
-        tickets.c.json_data,
-        tickets.c.airline_id,
-        tickets.c.modified,
-    ).where(
-        tickets.c.flight_id == flight.flight_id,
-        tickets.c.airline_id == airline.airline_id,
-    )
-    result = await db.execute(query)
-    rows = result.fetchall()
-    
     ticket_repo = TicketRepository(tickets, Ticket)
-    tickets_list = [ticket_repo._row_to_model(row) for row in rows]
+    tickets_list = ticket_repo.stream_json(
+        airline.airline_id, db, page, where=(tickets.c.flight_id == flight.flight_id,)
+    )
     
-    return [ticket.to_json() for ticket in tickets_list]
+    return await list_response(request, response, tickets_list, page)
 
 
 @router.delete("/{flight_identifier}", status_code=status.HTTP_200_OK)
@@ -274,7 +442,9 @@ async def delete_flight(
     return {"status": 1, "flight_identifier": flight_identifier}
 
 
-@router.post("/check/{flight_identifier}", response_model=FlightResponse, status_code=status.HTTP_200_OK)
+@router.post(
+    "/check/{flight_identifier}", response_model=FlightResponse, status_code=status.HTTP_200_OK
+)
 async def check_flight(
     flight_identifier: str,
     airline: CurrentAirline,
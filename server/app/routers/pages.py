@@ -12,7 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
 from typing import Optional
 
-from app.dependencies import DbSession
+from app.dependencies import ReadDbSession
 from app.database.tables import tickets, airlines, settings as settings_table
 from app.models.ticket import Ticket
 from app.models.airline import Airline
@@ -35,7 +35,7 @@ async def your_boarding_pass_by_path(
     request: Request,
     ticket_identifier: str,
     lang: Optional[str] = Query(None, description="Language code"),
-    db: DbSession = None,
+    db: ReadDbSession = None,
 ):
     """Path-based boarding pass page: /pages/yourBoardingPass/{ticket_identifier}"""
     return await your_boarding_pass(request, ticket=ticket_identifier, lang=lang, db=db)
@@ -46,7 +46,7 @@ async def your_boarding_pass(
     request: Request,
     ticket: Optional[str] = Query(None, pattern="^[a-zA-Z0-9-]+$", description="Ticket identifier"),
     lang: Optional[str] = Query(None, description="Language code"),
-    db: DbSession = None,
+    db: ReadDbSession = None,
 ):
     """
     Display boarding pass HTML page with disclaimer and 'Add to Apple Wallet' button.
@@ -144,6 +144,9 @@ async def your_boarding_pass(
                 pass_foreground_color = airline_settings.foreground_color
                 pass_label_color = airline_settings.label_color
                 
+                # Load airport info off the event loop before building the pass
+                await ticket_obj.flight.load_airports()
+                
                 # Create boarding pass service
                 boarding_pass_service = BoardingPassService(
                     ticket=ticket_obj,
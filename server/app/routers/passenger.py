@@ -3,19 +3,27 @@ Passenger API router.
 
 Matches PHP PassengerController endpoints.
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Body, HTTPException, Request, Response, status
+from pydantic import ValidationError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.mysql import insert as mysql_insert
+from typing import Annotated, Any
 import uuid
 
 from datetime import datetime
 
-from app.dependencies import CurrentAirline, DbSession
+from app.config import settings
+from app.dependencies import CurrentAirline, DbSession, ReadDbSession, Pagination
+from app.database.dialect import insert_or_update
 from app.database.tables import passengers, tickets
+from app.database.snapshots import refresh_ticket_snapshots
+from app.database.versions import list_changed
 from app.schemas.passenger import PassengerCreate, PassengerResponse
 from app.models.passenger import Passenger
+from app.models.base import stamp_json
 from app.core.exceptions import NotFoundError
+from app.core.streaming import list_response
+from app.core.conditional import list_etag, not_modified
 
 router = APIRouter()
 
@@ -27,16 +35,40 @@ def _format_iso8601(dt: datetime | None) -> str | None:
     return dt.isoformat() + "+00:00" if dt.tzinfo is None else dt.isoformat()
 
 
-def passenger_identifier_from_apple_identifier(apple_identifier: str) -> str:
+# Namespace of the name-based passenger identifiers
+PASSENGER_IDENTIFIER_NAMESPACE = uuid.UUID("90750fea-8814-4323-8357-c84c830c622c")
+
+
+def passenger_identifier_from_apple_identifier(apple_identifier: str, airline_identifier: str) -> str:
     """
     Generate passenger identifier from Apple identifier.
     
     PHP uses UUIDs (36 characters) for identifiers.
-    The database column has DEFAULT (uuid()), but we generate it explicitly
-    to ensure consistency and allow lookups.
+    The identifier is a UUID5 of the airline and contact, so importing the
+    same contact again gives the same passenger. Passengers created before
+    keep their random UUID4: the (airline_id, apple_identifier) unique index
+    makes the upsert update them, and their stored identifier is returned.
     """
-    # Use UUID4 for unique identifiers (matches PHP's uuid() default)
-    return str(uuid.uuid4())
+    return str(uuid.uuid5(PASSENGER_IDENTIFIER_NAMESPACE, f"{airline_identifier}/{apple_identifier}"))
+
+
+def passenger_json(passenger_data: PassengerCreate) -> dict[str, Any]:
+    """Build the stored JSON of a passenger (matches PHP Passenger->toJson())."""
+    return stamp_json({
+        "formattedName": passenger_data.formatted_name,
+        "firstName": passenger_data.first_name,
+        "middleName": passenger_data.middle_name,
+        "lastName": passenger_data.last_name,
+        "apple_identifier": passenger_data.apple_identifier,
+    })
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Summarize a validation error for one row of a bulk request."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'passenger'}: {detail['msg']}"
+        for detail in error.errors()
+    )
 
 
 @router.post("/create", response_model=PassengerResponse, status_code=status.HTTP_200_OK)
@@ -49,95 +81,143 @@ async def create_passenger(
     Create or update a passenger.
     
     Matches PHP: POST /v1/airline/{airline_identifier}/passenger/create
+    Updating a passenger also refreshes the copy of it in their tickets.
     """
-    passenger_identifier = passenger_identifier_from_apple_identifier(passenger_data.apple_identifier)
+    from app.database.repository import PassengerRepository
     
-    json_data = {
-        "formattedName": passenger_data.formatted_name,
-        "firstName": passenger_data.first_name,
-        "middleName": passenger_data.middle_name,
-        "lastName": passenger_data.last_name,
-        "apple_identifier": passenger_data.apple_identifier,
-    }
+    passenger_identifier = passenger_identifier_from_apple_identifier(
+        passenger_data.apple_identifier, airline.airline_identifier
+    )
+    json_data = passenger_json(passenger_data)
     
-    stmt = mysql_insert(passengers).values(
-        airline_id=airline.airline_id,
-        passenger_identifier=passenger_identifier,
-        json_data=json_data,
+    repo = PassengerRepository(passengers, Passenger)
+    passenger = await repo.upsert(
+        {
+            "airline_id": airline.airline_id,
+            "passenger_identifier": passenger_identifier,
+            "json_data": json_data,
+        },
+        db,
     )
-    stmt = stmt.on_duplicate_key_update(json_data=json_data)
-    await db.execute(stmt)
+    await refresh_ticket_snapshots(db, passengers, [passenger.passenger_id])
     await db.commit()
+    return passenger.to_json()
+
+
+@router.post("/bulk", status_code=status.HTTP_200_OK)
+async def bulk_create_passengers(
+    airline: CurrentAirline,
+    db: DbSession,
+    passengers_data: Annotated[list[Any], Body()],
+):
+    """
+    Create passengers in bulk (contact import).
     
-    # Fetch the created/updated passenger
-    query = select(
-        passengers.c.passenger_id,
-        passengers.c.passenger_identifier,
-        passengers.c.json_data,
-        passengers.c.airline_id,
-        passengers.c.modified,
-    ).where(
-        passengers.c.passenger_identifier == passenger_identifier,
-        passengers.c.airline_id == airline.airline_id,
-    )
-    result = await db.execute(query)
-    row = result.fetchone()
+    Path: POST /v1/airline/{airline_identifier}/passenger/bulk
+    Body is a JSON array of passengers, as for /passenger/create. Valid rows
+    are written with one multi-row INSERT ... ON DUPLICATE KEY UPDATE in one
+    transaction; invalid rows are skipped. A contact already imported updates
+    its passenger, and the copy of it in their tickets.
     
-    if not row:
+    Returns:
+        One result per input row, in input order: {"passenger_identifier": ...}
+        or {"error": ...}
+    """
+    if len(passengers_data) > settings.BULK_MAX_ROWS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Failed to create passenger",
+            detail=f"Bad Request, at most {settings.BULK_MAX_ROWS} passengers per request",
         )
     
-    passenger_dict = dict(row._mapping)
-    passenger_json = passenger_dict.get("json_data", {})
-    passenger_json["passenger_id"] = passenger_dict["passenger_id"]
-    passenger_json["passenger_identifier"] = passenger_dict["passenger_identifier"]
-    passenger = Passenger.model_validate(passenger_json)
-    return passenger.to_json()
+    # Validated rows by apple_identifier (the last one wins), or error per input row
+    rows = {}
+    results = []
+    for item in passengers_data:
+        try:
+            passenger_data = PassengerCreate.model_validate(item)
+        except ValidationError as e:
+            results.append({"error": _validation_message(e)})
+            continue
+        rows[passenger_data.apple_identifier] = {
+            "airline_id": airline.airline_id,
+            "passenger_identifier": passenger_identifier_from_apple_identifier(
+                passenger_data.apple_identifier, airline.airline_identifier
+            ),
+            "json_data": passenger_json(passenger_data),
+        }
+        results.append(passenger_data.apple_identifier)
+    
+    if rows:
+        stmt = insert_or_update(db, passengers, ["json_data"]).values(list(rows.values()))
+        await db.execute(stmt)
+        # Passengers created before identifiers were name-based keep theirs
+        query = select(
+            passengers.c.apple_identifier, passengers.c.passenger_identifier, passengers.c.passenger_id
+        ).where(
+            passengers.c.airline_id == airline.airline_id,
+            passengers.c.apple_identifier.in_(list(rows)),
+        )
+        written = (await db.execute(query)).all()
+        identifiers = {row.apple_identifier: row.passenger_identifier for row in written}
+        await refresh_ticket_snapshots(db, passengers, [row.passenger_id for row in written])
+        list_changed(db, airline.airline_id)
+        await db.commit()
+    
+    return [
+        {"passenger_identifier": identifiers[result]} if isinstance(result, str) else result
+        for result in results
+    ]
 
 
 @router.get("/list")
 async def list_passengers(
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
+    page: Pagination,
+    request: Request,
+    response: Response,
 ):
     """
     List all passengers with stats.
     
     Matches PHP: GET /v1/airline/{airline_identifier}/passenger/list
+    Supports keyset pagination (limit/after, next cursor in X-Next-Cursor)
+    and NDJSON streaming (Accept: application/x-ndjson).
     """
     from app.database.repository import PassengerRepository
     
     repo = PassengerRepository(passengers, Passenger)
-    results = await repo.list_with_stats(airline.airline_id, db, [tickets])
-    
-    # Convert to model and return JSON
-    passenger_list = []
-    for row_dict in results:
-        json_data = row_dict.get("json_data", {})
-        json_data["passenger_id"] = row_dict.get("passenger_id")
-        json_data["passenger_identifier"] = row_dict.get("passenger_identifier")
-        # Add stats
-        stats = []
-        if "tickets_count" in row_dict:
-            stats.append({
-                "table": "Tickets",
-                "count": row_dict.get("tickets_count", 0),
-                "last": _format_iso8601(row_dict.get("tickets_last")),
-            })
-        json_data["stats"] = stats
-        passenger = Passenger.model_validate(json_data)
-        passenger_list.append(passenger.to_json())
-    
-    return passenger_list
+    etag = await list_etag(request, db, airline.airline_id, [passengers, tickets])
+    cached = not_modified(request, response, etag)
+    if cached is not None:
+        return cached
+    
+    async def passenger_list():
+        # Yield JSON, from json_data merged with identifiers and stats
+        async for row_dict in repo.stream_with_stats(airline.airline_id, db, [tickets], page):
+            # Add stats
+            stats = []
+            if "tickets_count" in row_dict:
+                stats.append({
+                    "table": "Tickets",
+                    "count": row_dict.get("tickets_count", 0),
+                    "last": _format_iso8601(row_dict.get("tickets_last")),
+                })
+            yield Passenger.row_json(
+                row_dict.get("json_data") or {},
+                passenger_id=row_dict.get("passenger_id"),
+                passenger_identifier=row_dict.get("passenger_identifier"),
+                stats=stats,
+            )
+    
+    return await list_response(request, response, passenger_list(), page, etag)
 
 
 @router.get("/{passenger_identifier}", response_model=PassengerResponse)
 async def get_passenger(
     passenger_identifier: str,
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
 ):
     """
     Get passenger by identifier.
@@ -159,12 +239,17 @@ async def get_passenger(
 async def list_passenger_tickets(
     passenger_identifier: str,
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
+    page: Pagination,
+    request: Request,
+    response: Response,
 ):
     """
     List tickets for a passenger.
     
     Matches PHP: GET /v1/airline/{airline_identifier}/passenger/{passenger_identifier}/tickets
+    Supports keyset pagination (limit/after, next cursor in X-Next-Cursor)
+    and NDJSON streaming (Accept: application/x-ndjson).
     """
     from app.database.repository import PassengerRepository, TicketRepository
     from app.models.ticket import Ticket
@@ -177,15 +262,10 @@ async def list_passenger_tickets(
         raise NotFoundError("Passenger", passenger_identifier)
     
     # List tickets for this passenger
-    query = select(tickets).where(
-        tickets.c.passenger_id == passenger.passenger_id,
-        tickets.c.airline_id == airline.airline_id,
-    )
-    result = await db.execute(query)
-    rows = result.fetchall()
-    
     ticket_repo = TicketRepository(tickets, Ticket)
-    tickets_list = [ticket_repo._row_to_model(row) for row in rows]
+    tickets_list = ticket_repo.stream_json(
+        airline.airline_id, db, page, where=(tickets.c.passenger_id == passenger.passenger_id,)
+    )
     
-    return [ticket.to_json() for ticket in tickets_list]
+    return await list_response(request, response, tickets_list, page)
 
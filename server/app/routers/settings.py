@@ -6,9 +6,9 @@ Matches PHP SettingsController endpoints.
 from fastapi import APIRouter, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.mysql import insert as mysql_insert
 
-from app.dependencies import CurrentAirline, DbSession
+from app.dependencies import CurrentAirline, DbSession, ReadDbSession
+from app.database.dialect import insert_or_update
 from app.database.tables import settings as settings_table
 from app.schemas.settings import SettingsUpdate, SettingsResponse
 from app.models.settings import Settings
@@ -19,7 +19,7 @@ router = APIRouter()
 @router.get("", response_model=SettingsResponse)
 async def get_settings(
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
 ):
     """
     Get airline settings.
@@ -85,11 +85,10 @@ async def update_settings(
     
     # Save to database
     json_data = updated_settings.model_dump(by_alias=True)
-    stmt = mysql_insert(settings_table).values(
+    stmt = insert_or_update(db, settings_table, ["json_data"]).values(
         airline_id=airline.airline_id,
         json_data=json_data,
     )
-    stmt = stmt.on_duplicate_key_update(json_data=json_data)
     await db.execute(stmt)
     await db.commit()
     
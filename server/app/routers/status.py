@@ -4,7 +4,7 @@ Status API router.
 Matches PHP StatusController endpoint.
 """
 from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import text
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies import DbSession
@@ -22,11 +22,11 @@ async def get_status(db: DbSession):
     """
     try:
         # Check if Airlines table exists (same as PHP status() method)
-        query = text("SHOW TABLES LIKE 'Airlines'")
-        result = await db.execute(query)
-        row = result.fetchone()
+        has_airlines = await db.run_sync(
+            lambda session: inspect(session.connection()).has_table("Airlines")
+        )
         
-        if row:
+        if has_airlines:
             status_value = True
             message = "OK"
             status_code = status.HTTP_200_OK
@@ -0,0 +1,103 @@
+"""
+Sync API router.
+
+Delta sync for the iOS app: entities changed since a sync token, plus
+tombstones of deleted ones, instead of re-pulling every list.
+"""
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, HTTPException, Query, status
+from sqlalchemy import select, func as sql_func
+from typing import Optional
+
+from app.dependencies import CurrentAirline, DbSession
+from app.database.pagination import decode_cursor, encode_cursor
+from app.database.tables import aircrafts, passengers, flights, tickets, deletions
+from app.models.aircraft import Aircraft
+from app.models.passenger import Passenger
+from app.models.flight import Flight
+from app.models.ticket import Ticket
+
+router = APIRouter()
+
+# Rows modified this long before the previous token are sent again: `modified`
+# has one second resolution and a transaction may commit after the token was taken.
+SYNC_OVERLAP = timedelta(seconds=2)
+
+
+def _format_iso8601(dt: datetime | None) -> str | None:
+    """Format datetime as ISO 8601 with timezone (matches PHP DateTime->format('c'))."""
+    if dt is None:
+        return None
+    return dt.isoformat() + "+00:00" if dt.tzinfo is None else dt.isoformat()
+
+
+@router.get("")
+async def sync(
+    airline: CurrentAirline,
+    db: DbSession,
+    since: Optional[str] = Query(None, description="Token from the previous sync, omit for a full sync"),
+):
+    """
+    Get changes since the previous sync.
+
+    Path: GET /v1/airline/{airline_identifier}/sync?since=<token>
+    Returns entities created or updated since the token (in dependency order:
+    aircrafts, passengers, flights, tickets; each ordered by modified),
+    tombstones of entities deleted since then, and the token for the next sync.
+    Clients apply the tombstones first, then the upserts.
+    Read from the primary: a replica's clock and rows may lag by more than
+    SYNC_OVERLAP, and rows committed before the token would never be sent.
+    """
+    from app.database.repository import (
+        AircraftRepository, PassengerRepository, FlightRepository, TicketRepository,
+    )
+
+    since_modified = None
+    since_deletion = 0
+    if since:
+        try:
+            since_modified, since_deletion = decode_cursor(since)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Bad Request, invalid sync token",
+            ) from e
+
+    # Take the next token first: anything changing from here on is in the next sync
+    now = (await db.execute(select(sql_func.now()))).scalar_one()
+    last_deletion = (await db.execute(
+        select(sql_func.max(deletions.c.deletion_id)).where(deletions.c.airline_id == airline.airline_id)
+    )).scalar() or 0
+
+    result = {}
+    for key, repo in (
+        ("aircrafts", AircraftRepository(aircrafts, Aircraft)),
+        ("passengers", PassengerRepository(passengers, Passenger)),
+        ("flights", FlightRepository(flights, Flight)),
+        ("tickets", TicketRepository(tickets, Ticket)),
+    ):
+        where = (repo.table.c.modified >= since_modified - SYNC_OVERLAP,) if since_modified else ()
+        result[key] = [entity async for entity in repo.stream_json(airline.airline_id, db, where=where)]
+
+    deleted = []
+    if since:
+        query = select(
+            deletions.c.table_name,
+            deletions.c.identifier,
+            deletions.c.deleted,
+        ).where(
+            deletions.c.airline_id == airline.airline_id,
+            deletions.c.deletion_id > since_deletion,
+            deletions.c.deletion_id <= last_deletion,
+        ).order_by(deletions.c.deletion_id)
+        for row in (await db.execute(query)).fetchall():
+            deleted.append({
+                "table": row.table_name,
+                "identifier": row.identifier,
+                "deleted": _format_iso8601(row.deleted),
+            })
+    result["deleted"] = deleted
+    result["token"] = encode_cursor(now, last_deletion)
+
+    return result
@@ -3,19 +3,27 @@ Ticket API router.
 
 Matches PHP TicketController endpoints.
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.mysql import insert as mysql_insert
+from typing import Any
 import uuid
 
-from app.dependencies import CurrentAirline, DbSession
+from app.config import settings
+
+from app.dependencies import CurrentAirline, DbSession, ReadDbSession, FlightFilters, Pagination
+from app.database.dialect import insert_or_update
 from app.database.tables import tickets, flights, passengers
-from app.schemas.ticket import TicketCreate, TicketResponse, TicketVerify
+from app.database.stats import refresh_stats
+from app.database.versions import list_changed
+from app.schemas.ticket import TicketCreate, TicketIssue, TicketResponse, TicketVerify
 from app.models.ticket import Ticket
 from app.models.flight import Flight
 from app.models.passenger import Passenger
+from app.models.base import stamp_json
 from app.core.exceptions import NotFoundError
+from app.core.streaming import list_response
+from app.core.conditional import list_etag, not_modified
 from app.services.signature_service import SignatureService
 
 router = APIRouter()
@@ -33,6 +41,97 @@ def ticket_identifier_from_data() -> str:
     return str(uuid.uuid4())
 
 
+def ticket_json(passenger: Passenger, flight: Flight, ticket_data: TicketCreate) -> dict[str, Any]:
+    """Build the stored JSON of a ticket - include flight and passenger in the JSON."""
+    return stamp_json({
+        "passenger": passenger.to_json(),
+        "flight": flight.to_json(),
+        "seatNumber": ticket_data.seat_number,
+        "customLabelValue": ticket_data.custom_label_value or "1",
+    })
+
+
+async def existing_ticket_identifiers(
+    db: AsyncSession, flight_ids: list[int], passenger_ids: list[int]
+) -> dict[tuple[int, int], str]:
+    """
+    Identifiers of the tickets passengers already have on flights, while re-issues can not rely on the index.
+    
+    Issues are upserts that the unique (flight_id, passenger_id) index turns
+    into updates of a passenger's ticket. Until migration 5 has built it (it
+    waits for the dedup job on databases with duplicates), a passenger's
+    existing ticket, the first as dedup keeps, is looked up so the upsert
+    updates it through its identifier. Keyed by (flight_id, passenger_id);
+    empty once the index exists.
+    """
+    from app.database.migrations import UNIQUE_TICKETS_MIGRATION, is_applied
+    
+    if await is_applied(db.bind, UNIQUE_TICKETS_MIGRATION):
+        return {}
+    result = await db.execute(
+        select(tickets.c.flight_id, tickets.c.passenger_id, tickets.c.ticket_identifier)
+        .where(tickets.c.flight_id.in_(flight_ids), tickets.c.passenger_id.in_(passenger_ids))
+        .order_by(tickets.c.ticket_id.desc())
+    )
+    # Descending ids: the first ticket wins
+    return {(row.flight_id, row.passenger_id): row.ticket_identifier for row in result}
+
+
+async def write_tickets(
+    db: AsyncSession,
+    airline_id: int,
+    issues: list[tuple[Flight, Passenger, TicketCreate]],
+) -> dict[tuple[int, int], dict[str, Any]]:
+    """
+    Issue tickets with one multi-row upsert, in the caller's transaction.
+    
+    One ticket per flight and passenger (the last entry wins); as for a
+    single issue, a passenger already on a flight keeps their ticket. The
+    stats of the flights and passengers are refreshed and the list change
+    recorded; the caller commits.
+    
+    Returns:
+        Ticket JSON by (flight_id, passenger_id)
+    """
+    flight_ids = list({flight.flight_id for flight, _, _ in issues})
+    passenger_ids = list({passenger.passenger_id for _, passenger, _ in issues})
+    existing = await existing_ticket_identifiers(db, flight_ids, passenger_ids)
+    rows = {}
+    for flight, passenger, ticket_data in issues:
+        key = (flight.flight_id, passenger.passenger_id)
+        rows[key] = {
+            "airline_id": airline_id,
+            "flight_id": flight.flight_id,
+            "passenger_id": passenger.passenger_id,
+            "ticket_identifier": existing.get(key) or ticket_identifier_from_data(),
+            "json_data": ticket_json(passenger, flight, ticket_data),
+        }
+    
+    stmt = insert_or_update(db, tickets, ["json_data"]).values(list(rows.values()))
+    await db.execute(stmt)
+    # Re-issued tickets keep their id and identifier (the first, with duplicates awaiting dedup)
+    query = select(
+        tickets.c.ticket_id, tickets.c.ticket_identifier, tickets.c.flight_id, tickets.c.passenger_id
+    ).where(
+        tickets.c.flight_id.in_(flight_ids),
+        tickets.c.passenger_id.in_(passenger_ids),
+    ).order_by(tickets.c.ticket_id.desc())
+    written = {(row.flight_id, row.passenger_id): row for row in await db.execute(query)}
+    await refresh_stats(db, passengers, passenger_ids)
+    await refresh_stats(db, flights, flight_ids)
+    list_changed(db, airline_id)
+    
+    issued = {}
+    for key, row in rows.items():
+        ticket_json_data = dict(row["json_data"])
+        ticket_json_data["ticket_id"] = written[key].ticket_id
+        ticket_json_data["ticket_identifier"] = written[key].ticket_identifier
+        ticket_json_data["flight_id"] = row["flight_id"]
+        ticket_json_data["passenger_id"] = row["passenger_id"]
+        issued[key] = Ticket.model_validate(ticket_json_data).to_json()
+    return issued
+
+
 @router.post("/issue/{flight_identifier}/{passenger_identifier}", response_model=TicketResponse, status_code=status.HTTP_200_OK)
 async def issue_ticket(
     flight_identifier: str,
@@ -48,7 +147,7 @@ async def issue_ticket(
     
     Note: Only one ticket per passenger per flight is allowed.
     """
-    from app.database.repository import FlightRepository, PassengerRepository
+    from app.database.repository import FlightRepository, PassengerRepository, TicketRepository
     
     # Get flight and passenger
     flight_repo = FlightRepository(flights, Flight)
@@ -62,116 +161,129 @@ async def issue_ticket(
     if not passenger:
         raise NotFoundError("Passenger", passenger_identifier)
     
-    # Check for existing ticket (only one ticket per passenger per flight)
-    query = select(
-        tickets.c.ticket_id,
-        tickets.c.ticket_identifier,
-        tickets.c.passenger_id,
-        tickets.c.flight_id,
-        tickets.c.json_data,
-        tickets.c.airline_id,
-        tickets.c.modified,
-    ).where(
-        tickets.c.flight_id == flight.flight_id,
-        tickets.c.passenger_id == passenger.passenger_id,
-        tickets.c.airline_id == airline.airline_id,
+    json_data = ticket_json(passenger, flight, ticket_data)
+    
+    # One statement: the unique (flight_id, passenger_id) index turns a re-issue
+    # into an update of the existing ticket (only one ticket per passenger per flight)
+    existing = await existing_ticket_identifiers(db, [flight.flight_id], [passenger.passenger_id])
+    ticket_repo = TicketRepository(tickets, Ticket)
+    ticket = await ticket_repo.upsert(
+        {
+            "airline_id": airline.airline_id,
+            "flight_id": flight.flight_id,
+            "passenger_id": passenger.passenger_id,
+            "ticket_identifier": (
+                existing.get((flight.flight_id, passenger.passenger_id)) or ticket_identifier_from_data()
+            ),
+            "json_data": json_data,
+        },
+        db,
     )
-    result = await db.execute(query)
-    existing_row = result.fetchone()
-    
-    ticket_identifier = None
-    ticket_id = None
-    
-    if existing_row:
-        # Use existing ticket
-        existing_dict = dict(existing_row._mapping)
-        ticket_identifier = existing_dict.get("ticket_identifier")
-        ticket_id = existing_dict.get("ticket_id")
-    else:
-        # Generate new ticket identifier
-        ticket_identifier = ticket_identifier_from_data()
-    
-    # Build JSON data - include flight and passenger in the JSON
-    json_data = {
-        "passenger": passenger.to_json(),
-        "flight": flight.to_json(),
-        "seatNumber": ticket_data.seat_number,
-        "customLabelValue": ticket_data.custom_label_value or "1",
-    }
-    
-    # Prepare insert/update data
-    insert_data = {
-        "airline_id": airline.airline_id,
-        "flight_id": flight.flight_id,
-        "passenger_id": passenger.passenger_id,
-        "json_data": json_data,
-    }
+    await refresh_stats(db, passengers, [passenger.passenger_id])
+    await refresh_stats(db, flights, [flight.flight_id])
+    await db.commit()
     
-    if ticket_identifier:
-        insert_data["ticket_identifier"] = ticket_identifier
-    if ticket_id:
-        insert_data["ticket_id"] = ticket_id
+    return ticket.to_json()
+
+
+@router.post("/issue/{flight_identifier}", status_code=status.HTTP_200_OK)
+async def issue_tickets(
+    flight_identifier: str,
+    tickets_data: list[TicketIssue],
+    airline: CurrentAirline,
+    db: DbSession,
+):
+    """
+    Issue tickets for several passengers on a flight.
     
-    stmt = mysql_insert(tickets).values(**insert_data)
-    stmt = stmt.on_duplicate_key_update(json_data=json_data)
-    await db.execute(stmt)
-    await db.commit()
+    Path: POST /v1/airline/{airline_identifier}/ticket/issue/{flight_identifier}
+    Body is a JSON array of {passenger_identifier, seatNumber, customLabelValue}.
+    The flight is loaded once, the passengers with one IN query, and all
+    tickets are written with one multi-row upsert, in one transaction. As for
+    a single issue, a passenger already on the flight keeps their ticket.
     
-    # Fetch the created/updated ticket
-    query = select(
-        tickets.c.ticket_id,
-        tickets.c.ticket_identifier,
-        tickets.c.passenger_id,
-        tickets.c.flight_id,
-        tickets.c.json_data,
-        tickets.c.airline_id,
-        tickets.c.modified,
-    ).where(
-        tickets.c.ticket_identifier == ticket_identifier,
-        tickets.c.airline_id == airline.airline_id,
-    )
-    result = await db.execute(query)
-    row = result.fetchone()
+    Returns:
+        Tickets in input order
+    """
+    from app.database.repository import FlightRepository, PassengerRepository
     
-    if not row:
+    if len(tickets_data) > settings.BULK_MAX_ROWS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Failed to create ticket",
+            detail=f"Bad Request, at most {settings.BULK_MAX_ROWS} tickets per request",
         )
     
-    ticket_dict = dict(row._mapping)
-    ticket_json = ticket_dict.get("json_data", {})
-    ticket_json["ticket_id"] = ticket_dict["ticket_id"]
-    ticket_json["ticket_identifier"] = ticket_dict["ticket_identifier"]
-    ticket_json["flight_id"] = ticket_dict["flight_id"]
-    ticket_json["passenger_id"] = ticket_dict["passenger_id"]
-    ticket = Ticket.model_validate(ticket_json)
-    return ticket.to_json()
+    flight_repo = FlightRepository(flights, Flight)
+    flight = await flight_repo.get_by_identifier(flight_identifier, airline.airline_id, db)
+    if not flight:
+        raise NotFoundError("Flight", flight_identifier)
+    if not tickets_data:
+        return []
+    
+    passenger_repo = PassengerRepository(passengers, Passenger)
+    passenger_identifiers = list({ticket_data.passenger_identifier for ticket_data in tickets_data})
+    by_identifier = {
+        passenger.passenger_identifier: passenger
+        async for passenger in passenger_repo.stream(
+            airline.airline_id,
+            db,
+            where=(passengers.c.passenger_identifier.in_(passenger_identifiers),),
+        )
+    }
+    missing = [identifier for identifier in passenger_identifiers if identifier not in by_identifier]
+    if missing:
+        raise NotFoundError("Passenger", ", ".join(sorted(missing)))
+    
+    issued = await write_tickets(
+        db,
+        airline.airline_id,
+        [(flight, by_identifier[ticket_data.passenger_identifier], ticket_data) for ticket_data in tickets_data],
+    )
+    await db.commit()
+    
+    return [
+        issued[(flight.flight_id, by_identifier[ticket_data.passenger_identifier].passenger_id)]
+        for ticket_data in tickets_data
+    ]
 
 
 @router.get("/list")
 async def list_tickets(
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
+    page: Pagination,
+    flight_filter: FlightFilters,
+    request: Request,
+    response: Response,
 ):
     """
     List all tickets for the airline.
     
     Matches PHP: GET /v1/airline/{airline_identifier}/ticket/list
+    Supports keyset pagination (limit/after, next cursor in X-Next-Cursor)
+    and NDJSON streaming (Accept: application/x-ndjson).
+    Filters on the ticket's flight: from, to (departure date), origin, destination (ICAO), upcoming=true.
     """
     from app.database.repository import TicketRepository
     
     repo = TicketRepository(tickets, Ticket)
-    ticket_list = await repo.list_all(airline.airline_id, db)
+    etag = await list_etag(
+        request, db, airline.airline_id, [tickets], flight_filter.etag_part(tickets, airline.airline_id)
+    )
+    cached = not_modified(request, response, etag)
+    if cached is not None:
+        return cached
+    
+    ticket_list = repo.stream_json(airline.airline_id, db, page, where=flight_filter.conditions(tickets))
     
-    return [ticket.to_json() for ticket in ticket_list]
+    return await list_response(request, response, ticket_list, page, etag)
 
 
 @router.get("/{ticket_identifier}", response_model=TicketResponse)
 async def get_ticket(
     ticket_identifier: str,
     airline: CurrentAirline,
-    db: DbSession,
+    db: ReadDbSession,
 ):
     """
     Get ticket by identifier.
@@ -242,7 +354,7 @@ async def verify_ticket(
     
     # Get signature service for the airline
     from app.dependencies import get_airline_context
-    airline_data = airline.airline_data
+    airline_data = await airline.load_data(db)
     apple_identifier = airline_data.get("apple_identifier", "")
     
     signature_service = SignatureService(apple_identifier)
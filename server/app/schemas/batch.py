@@ -0,0 +1,13 @@
+"""
+API schemas for the Batch endpoint.
+"""
+from typing import Any, Optional
+from pydantic import BaseModel, Field
+
+
+class BatchOperation(BaseModel):
+    """One operation of a batch: an airline-scoped endpoint and its body."""
+    method: str = "POST"
+    path: str  # Relative to the airline, e.g. "flight/plan/$plane.aircraft_identifier"
+    body: Any = None
+    ref: Optional[str] = Field(None, pattern=r"^\w+$")  # Name later operations refer to this result by
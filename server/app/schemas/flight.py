@@ -21,6 +21,22 @@ class FlightCreate(BaseModel):
         populate_by_name = True
 
 
+class SeriesPassenger(BaseModel):
+    """Passenger issued a ticket on each flight of a series."""
+    passenger_identifier: str
+    seat_number: str = Field(..., alias="seatNumber")
+    custom_label_value: Optional[str] = Field(default="1", alias="customLabelValue")
+
+    class Config:
+        populate_by_name = True
+
+
+class FlightSeriesCreate(FlightCreate):
+    """Schema for planning a series of flights (scheduledDepartureDate is the first one)."""
+    recurrence: str  # RRULE, e.g. "FREQ=WEEKLY;BYDAY=SA;COUNT=10"
+    passengers: list[SeriesPassenger] = []
+
+
 class FlightResponse(BaseModel):
     """Schema for flight API responses."""
     origin: AirportSchema
@@ -11,7 +11,7 @@ class PassengerCreate(BaseModel):
     first_name: Optional[str] = Field(None, alias="firstName")
     middle_name: Optional[str] = Field(None, alias="middleName")
     last_name: Optional[str] = Field(None, alias="lastName")
-    apple_identifier: str = Field(..., alias="apple_identifier")
+    apple_identifier: str = Field(..., alias="apple_identifier", max_length=255)
 
     class Config:
         populate_by_name = True
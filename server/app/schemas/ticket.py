@@ -16,6 +16,11 @@ class TicketCreate(BaseModel):
         populate_by_name = True
 
 
+class TicketIssue(TicketCreate):
+    """Schema for one ticket of a bulk issue."""
+    passenger_identifier: str
+
+
 class TicketResponse(BaseModel):
     """Schema for ticket API responses."""
     passenger: PassengerResponse
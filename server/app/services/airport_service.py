@@ -4,14 +4,96 @@ Airport service for airport data access.
 Uses euro_aip library (DO NOT read airports.db directly).
 Matches PHP Airport class behavior.
 """
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, NamedTuple, Optional, TypeVar
 from pathlib import Path
+import asyncio
 import logging
+import re
+import threading
+import time
 
 from app.config import settings
+from app.services.timezone_service import TimezoneService
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Values allowed in DatabaseSource where clauses (ICAO idents, ISO country codes)
+_IDENT_RE = re.compile(r"^[A-Z0-9][A-Z0-9-]{0,15}$")
+
+# DatabaseSource of each thread, and the AirportData generation it was opened for
+_thread = threading.local()
+
+
+def _close(source) -> None:
+    """Close a DatabaseSource, in the thread that opened it (sqlite connections can not be closed elsewhere)."""
+    close = getattr(source, 'close', None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception as e:
+        logger.warning(f"Error closing airport DatabaseSource: {e}")
+
+
+class Runway(NamedTuple):
+    """Compact runway record kept in the per-airport runway cache."""
+    le_ident: Optional[str]
+    he_ident: Optional[str]
+    length_ft: Optional[float]
+    width_ft: Optional[float]
+    surface: Optional[str]
+    le_heading_degT: Optional[float]
+    he_heading_degT: Optional[float]
+    lighted: bool
+    closed: bool
+
+
+class AirportData:
+    """
+    One generation of airport data: the DatabaseSource and every cache derived from it.
+    
+    Replaced as a whole on reload, so a request always reads from a single
+    consistent generation and derived caches are invalidated with it.
+    sqlite connections are not shared across threads: each thread querying
+    this generation gets its own DatabaseSource (see connection()).
+    """
+
+    def __init__(self, source, version: int, db_mtime: Optional[float], connect: Callable[[], object]):
+        self.source = source
+        self.version = version
+        self.db_mtime = db_mtime
+        self._connect = connect
+        # source was opened in the calling thread: it is that thread's DatabaseSource
+        self.release()
+        _thread.source, _thread.data = source, self
+        self.index: dict[str, Optional[dict]] = {}  # Resident index: ICAO -> airport info (None if not found)
+        self.runways: dict[str, tuple[Runway, ...]] = {}  # Runway cache: ICAO -> runways, loaded lazily
+        self.countries: dict[str, list[dict]] = {}  # Country listings: ISO code -> airports
+
+    def connection(self):
+        """
+        Get the DatabaseSource of the calling thread, opened on first use.
+        
+        A thread keeps one DatabaseSource open, for the last generation it
+        queried: moving to another generation closes the previous one (see
+        release()).
+        """
+        if getattr(_thread, 'data', None) is not self:
+            self.release()
+            _thread.source, _thread.data = self._connect(), self
+        return _thread.source
+    
+    @staticmethod
+    def release() -> None:
+        """Close the DatabaseSource of the calling thread, whatever its generation."""
+        source = getattr(_thread, 'source', None)
+        _thread.data = _thread.source = None
+        if source is not None:
+            _close(source)
+
 
 class AirportService:
     """
@@ -23,37 +105,195 @@ class AirportService:
     - Get map URLs
     
     Uses DatabaseSource from euro_aip.sources for read-only access to airports.db.
+    Data can be reloaded without restart (see reload() and watch()).
+    
+    Methods are synchronous; async routes use the *_async variants, which
+    answer from the resident caches or run the query on a dedicated
+    executor (AIRPORT_DB_THREADS workers) so lookups never block the event loop.
     """
     
-    _source = None  # Cached DatabaseSource instance
+    _data: Optional[AirportData] = None  # Current generation of airport data
+    _reload_lock = threading.Lock()
+    
+    # Dedicated executor for airport queries, and its statistics
+    _executor: Optional[ThreadPoolExecutor] = None
+    _stats_lock = threading.Lock()
+    _stats = {"queries": 0, "cache_hits": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0,
+              "total_ms": 0.0, "max_ms": 0.0}
+    
+    # Version of the airport info snapshot stored in flight JSON (see snapshot()).
+    # Bump when the snapshot fields change so stale snapshots fall back to lookups.
+    INFO_VERSION = 6
+    
+    @classmethod
+    def _connect(cls):
+        """
+        Open a new DatabaseSource on AIRPORT_DB_PATH.
+        
+        Returns:
+            DatabaseSource instance, or None if unavailable
+        """
+        try:
+            # Import from euro_aip.sources (where DatabaseSource is actually defined)
+            from euro_aip.sources import DatabaseSource
+            
+            airport_db_path = Path(settings.AIRPORT_DB_PATH)
+            if not airport_db_path.exists():
+                logger.warning(f"Airport database not found at {airport_db_path}")
+                return None
+            
+            return DatabaseSource(str(airport_db_path))
+        except ImportError as e:
+            logger.warning(f"Could not import euro_aip library: {e}. Airport data will not be available.")
+        except Exception as e:
+            logger.error(f"Error initializing DatabaseSource: {e}")
+        return None
+    
+    @staticmethod
+    def _db_mtime() -> Optional[float]:
+        """Modification time of AIRPORT_DB_PATH, None if missing."""
+        try:
+            return Path(settings.AIRPORT_DB_PATH).stat().st_mtime
+        except OSError:
+            return None
+    
+    @classmethod
+    def _open_data(cls, version: int) -> Optional[AirportData]:
+        """
+        Open a new generation of airport data.
+        
+        Returns:
+            AirportData, or None if airport data is unavailable
+        """
+        source = cls._connect()
+        if source is None:
+            return None
+        return AirportData(source, version, cls._db_mtime(), cls._connect)
+    
+    @classmethod
+    def _get_data(cls) -> Optional[AirportData]:
+        """
+        Get the current generation of airport data, loading it on first use.
+        
+        Returns:
+            AirportData, or None if airport data is unavailable
+        """
+        if cls._data is None:
+            with cls._reload_lock:
+                if cls._data is None:
+                    cls._data = cls._open_data(1)
+        return cls._data
     
     @classmethod
     def _get_source(cls):
         """
-        Get or create DatabaseSource instance (singleton pattern).
+        Get the DatabaseSource instance of the current generation.
         
         Returns:
             DatabaseSource instance, or None if unavailable
         """
-        if cls._source is None:
+        data = cls._get_data()
+        return data.source if data else None
+    
+    @classmethod
+    def version(cls) -> int:
+        """
+        Get the airport data version (incremented on every reload).
+        
+        Caches derived from airport data outside this service should be keyed on it.
+        """
+        return cls._data.version if cls._data else 0
+    
+    @classmethod
+    def data_version(cls) -> Optional[float]:
+        """
+        Identify the airport data served: the mtime of its airports.db.
+        
+        Unlike version(), the same across restarts and workers, so it is
+        stored in snapshots. Before the data is loaded, the mtime of the
+        file (None if missing).
+        """
+        return cls._data.db_mtime if cls._data else cls._db_mtime()
+    
+    @classmethod
+    def reload(cls) -> int:
+        """
+        Build a new generation of airport data and atomically swap it in.
+        
+        Blocking: run it in a worker thread (see reload_async()). Airports and
+        runways resident in the previous generation are resolved again on the
+        new source before the swap, so requests do not hit a cold index.
+        
+        The previous generation's DatabaseSources are closed on swap: the
+        reloading thread's at once, each airport worker's before its next
+        query (sqlite connections are closed in the thread that opened them).
+        
+        Returns:
+            The airport data version now being served
+        """
+        with cls._reload_lock:
+            previous = cls._data
+            data = cls._open_data((previous.version if previous else 0) + 1)
+            if data is None:
+                # Keep serving the previous generation
+                return previous.version if previous else 0
+            
+            if previous is not None:
+                for icao in list(previous.index):
+                    cls._lookup_airport(data, icao)
+                for icao in list(previous.runways):
+                    cls._lookup_runways(data, icao)
+            
+            cls._data = data
+            logger.info(f"Airport data reloaded (version {data.version}, {len(data.index)} airports warm)")
+            return data.version
+    
+    @classmethod
+    async def reload_async(cls) -> int:
+        """Reload airport data in a worker thread without blocking the event loop."""
+        return await asyncio.to_thread(cls.reload)
+    
+    @classmethod
+    async def watch(cls, interval: float) -> None:
+        """
+        Watch AIRPORT_DB_PATH and reload when the file changes.
+        
+        Intended to run as a background task. Replace the database file
+        atomically (write elsewhere, then rename) so a half-written file is
+        never picked up.
+        
+        Args:
+            interval: Polling interval in seconds
+        """
+        airport_db_path = Path(settings.AIRPORT_DB_PATH)
+        while True:
+            await asyncio.sleep(interval)
             try:
-                # Import from euro_aip.sources (where DatabaseSource is actually defined)
-                from euro_aip.sources import DatabaseSource
-                
-                airport_db_path = Path(settings.AIRPORT_DB_PATH)
-                if not airport_db_path.exists():
-                    logger.warning(f"Airport database not found at {airport_db_path}")
-                    return None
-                
-                cls._source = DatabaseSource(str(airport_db_path))
-            except ImportError as e:
-                logger.warning(f"Could not import euro_aip library: {e}. Airport data will not be available.")
-                cls._source = None
-            except Exception as e:
-                logger.error(f"Error initializing DatabaseSource: {e}")
-                cls._source = None
-        
-        return cls._source
+                mtime = airport_db_path.stat().st_mtime
+            except OSError:
+                continue
+            data = cls._data
+            if data is None or data.db_mtime != mtime:
+                try:
+                    await cls.reload_async()
+                except Exception as e:
+                    logger.error(f"Error reloading airport data: {e}")
+    
+    @staticmethod
+    def _where(column: str, value: str) -> Optional[str]:
+        """
+        Build an equality where clause for DatabaseSource.
+        
+        DatabaseSource only accepts where clauses as strings, so instead of
+        interpolating user input the value must be a plain identifier
+        (letters, digits, dashes) and is quoted as a literal.
+        
+        Returns:
+            Where clause, or None if the value can not be a valid identifier
+        """
+        if not _IDENT_RE.match(value):
+            return None
+        return f"{column} = '{value}'"
     
     @classmethod
     def get_airport_by_icao(cls, icao: str) -> Optional[dict]:
@@ -61,6 +301,8 @@ class AirportService:
         Get airport information by ICAO code.
         
         Matches PHP: Airport->getInfo()
+        Results are kept in the resident index, so each airport is only
+        queried (and its timezone resolved) once.
         
         Args:
             icao: ICAO code (e.g., 'EGLL')
@@ -68,51 +310,180 @@ class AirportService:
         Returns:
             Dictionary with airport information, or None if not found
         """
-        source = cls._get_source()
-        if source is None:
+        data = cls._get_data()
+        if data is None:
             return None
+        return cls._lookup_airport(data, icao)
+    
+    @classmethod
+    def _lookup_airport(cls, data: AirportData, icao: str) -> Optional[dict]:
+        """Get airport information from a generation of airport data."""
+        # Normalize ICAO to uppercase
+        icao = icao.upper()
+        if icao in data.index:
+            return data.index[icao]
         
+        where = cls._where("ident", icao)
+        if where is None:
+            return None
         try:
-            # Normalize ICAO to uppercase
-            icao = icao.upper()
-            
             # Query airport by ICAO using DatabaseSource
-            airports = source.get_airports(where=f"ident = '{icao}'")
-            
-            if airports and len(airports) > 0:
-                airport = airports[0]
-                # Convert Airport object to dictionary format matching PHP structure
-                return {
-                    'ident': airport.ident,
-                    'name': airport.name,
-                    'municipality': airport.municipality,
-                    'iso_country': airport.iso_country,
-                    'latitude_deg': airport.latitude_deg,
-                    'longitude_deg': airport.longitude_deg,
-                    'elevation_ft': airport.elevation_ft,
-                    'iata_code': airport.iata_code,
-                    'type': airport.type,
-                }
+            airports = data.connection().get_airports(where=where)
+            
+            info = cls._airport_to_dict(airports[0]) if airports else None
         except Exception as e:
             logger.error(f"Error getting airport {icao}: {e}")
             return None
         
-        return None
+        data.index[icao] = info
+        return info
+    
+    @staticmethod
+    def _airport_to_dict(airport) -> dict:
+        """
+        Convert euro_aip Airport object to dictionary format matching PHP structure.
+        
+        Adds the IANA timezone resolved offline from the airport coordinates,
+        else its country (see TimezoneService), None if neither resolves.
+        """
+        return {
+            'ident': airport.ident,
+            'name': airport.name,
+            'municipality': airport.municipality,
+            'iso_country': airport.iso_country,
+            'latitude_deg': airport.latitude_deg,
+            'longitude_deg': airport.longitude_deg,
+            'elevation_ft': airport.elevation_ft,
+            'iata_code': airport.iata_code,
+            'type': airport.type,
+            'timezone_identifier': TimezoneService.resolve(
+                airport.iso_country, airport.latitude_deg, airport.longitude_deg
+            ),
+        }
     
     @classmethod
-    def get_map_url(cls, icao: str) -> Optional[str]:
+    def snapshot(cls, icao: str) -> Optional[dict]:
         """
-        Get Google Maps URL for airport location.
+        Get a versioned snapshot of airport information.
         
-        Matches PHP: Airport->getMapURL()
+        Stored in the flight JSON at plan time so that rendering passes and
+        pages does not need to query the airport database again.
         
         Args:
             icao: ICAO code
             
         Returns:
-            Google Maps URL, or None if airport not found
+            Airport information with 'version' and 'data_version' tags, or None if not found
         """
         info = cls.get_airport_by_icao(icao)
+        if not info:
+            return None
+        return {
+            **info,
+            'runways': cls.runways_summary(icao),
+            'version': cls.INFO_VERSION,
+            'data_version': cls.data_version(),
+        }
+    
+    @classmethod
+    def is_current(cls, info: Optional[dict]) -> bool:
+        """
+        Check whether a snapshot can be used instead of a lookup.
+        
+        Current when it has the snapshot fields of INFO_VERSION and was taken
+        from the airport data served (always, where airports.db is missing).
+        """
+        if not info or info.get('version') != cls.INFO_VERSION:
+            return False
+        data_version = cls.data_version()
+        return data_version is None or info.get('data_version') == data_version
+    
+    @classmethod
+    def get_runways(cls, icao: str) -> tuple[Runway, ...]:
+        """
+        Get runways for an airport.
+        
+        Runways are loaded once per airport and kept as compact tuples.
+        
+        Args:
+            icao: ICAO code
+            
+        Returns:
+            Tuple of Runway records (empty if unknown)
+        """
+        data = cls._get_data()
+        if data is None:
+            return ()
+        return cls._lookup_runways(data, icao)
+    
+    @classmethod
+    def _lookup_runways(cls, data: AirportData, icao: str) -> tuple[Runway, ...]:
+        """Get runways from a generation of airport data."""
+        icao = icao.upper()
+        if icao in data.runways:
+            return data.runways[icao]
+        
+        where = cls._where("airport_ident", icao)
+        if where is None:
+            return ()
+        try:
+            # runways table is indexed by airport_ident
+            rows = data.connection().get_runways(where=where)
+            runways = tuple(
+                Runway(
+                    le_ident=getattr(row, 'le_ident', None),
+                    he_ident=getattr(row, 'he_ident', None),
+                    length_ft=getattr(row, 'length_ft', None),
+                    width_ft=getattr(row, 'width_ft', None),
+                    surface=getattr(row, 'surface', None),
+                    le_heading_degT=getattr(row, 'le_heading_degT', None),
+                    he_heading_degT=getattr(row, 'he_heading_degT', None),
+                    lighted=bool(getattr(row, 'lighted', False)),
+                    closed=bool(getattr(row, 'closed', False)),
+                )
+                for row in rows or []
+            )
+        except Exception as e:
+            logger.error(f"Error getting runways for {icao}: {e}")
+            return ()
+        
+        data.runways[icao] = runways
+        return runways
+    
+    @classmethod
+    def runways_summary(cls, icao: str) -> Optional[str]:
+        """
+        Get a one-line summary of open runways (e.g. '09L/27R 12802ft ASP').
+        
+        Args:
+            icao: ICAO code
+            
+        Returns:
+            Summary string, or None if no open runway is known
+        """
+        parts = []
+        for runway in cls.get_runways(icao):
+            if runway.closed:
+                continue
+            part = '/'.join(ident for ident in (runway.le_ident, runway.he_ident) if ident)
+            if runway.length_ft:
+                part += f" {int(runway.length_ft)}ft"
+            if runway.surface:
+                part += f" {runway.surface}"
+            parts.append(part.strip())
+        return ', '.join(parts) if parts else None
+    
+    @staticmethod
+    def map_url_from_info(info: Optional[dict]) -> Optional[str]:
+        """
+        Build Google Maps URL from airport information.
+        
+        Args:
+            info: Airport information dictionary (or snapshot)
+            
+        Returns:
+            Google Maps URL, or None if coordinates are missing
+        """
         if not info or not info.get('latitude_deg') or not info.get('longitude_deg'):
             return None
         
@@ -120,6 +491,40 @@ class AirportService:
         lon = info['longitude_deg']
         return f"https://www.google.com/maps/place/{lat},{lon}"
     
+    @staticmethod
+    def location_from_info(info: Optional[dict]) -> Optional[dict[str, float]]:
+        """
+        Build location (latitude, longitude) from airport information.
+        
+        Args:
+            info: Airport information dictionary (or snapshot)
+            
+        Returns:
+            Dictionary with 'latitude' and 'longitude', or None
+        """
+        if not info or not info.get('latitude_deg') or not info.get('longitude_deg'):
+            return None
+        
+        return {
+            'latitude': float(info['latitude_deg']),
+            'longitude': float(info['longitude_deg'])
+        }
+    
+    @classmethod
+    def get_map_url(cls, icao: str) -> Optional[str]:
+        """
+        Get Google Maps URL for airport location.
+        
+        Matches PHP: Airport->getMapURL()
+        
+        Args:
+            icao: ICAO code
+            
+        Returns:
+            Google Maps URL, or None if airport not found
+        """
+        return cls.map_url_from_info(cls.get_airport_by_icao(icao))
+    
     @classmethod
     def get_city(cls, icao: str) -> Optional[str]:
         """
@@ -165,49 +570,173 @@ class AirportService:
         Returns:
             Dictionary with 'latitude' and 'longitude', or None
         """
-        info = cls.get_airport_by_icao(icao)
-        if not info or not info.get('latitude_deg') or not info.get('longitude_deg'):
-            return None
-        
-        return {
-            'latitude': float(info['latitude_deg']),
-            'longitude': float(info['longitude_deg'])
-        }
+        return cls.location_from_info(cls.get_airport_by_icao(icao))
     
     @classmethod
     def list_airports_by_country(cls, country_code: str) -> list[dict]:
         """
         List airports by country code.
         
+        Listings are cached with the current generation of airport data.
+        
         Args:
             country_code: ISO country code (e.g., 'FR', 'GB')
             
         Returns:
             List of airport dictionaries
         """
-        source = cls._get_source()
-        if source is None:
+        data = cls._get_data()
+        if data is None:
             return []
         
+        country_code = country_code.upper()
+        if country_code in data.countries:
+            return data.countries[country_code]
+        
+        where = cls._where("iso_country", country_code)
+        if where is None:
+            return []
         try:
             # Query airports by country using DatabaseSource
-            airports = source.get_airports(where=f"iso_country = '{country_code}'")
-            
-            result = []
-            for airport in airports:
-                result.append({
-                    'ident': airport.ident,
-                    'name': airport.name,
-                    'municipality': airport.municipality,
-                    'iso_country': airport.iso_country,
-                    'latitude_deg': airport.latitude_deg,
-                    'longitude_deg': airport.longitude_deg,
-                    'elevation_ft': airport.elevation_ft,
-                    'iata_code': airport.iata_code,
-                    'type': airport.type,
-                })
-            return result
+            airports = data.connection().get_airports(where=where)
+            result = [cls._airport_to_dict(airport) for airport in airports]
         except Exception as e:
             logger.error(f"Error listing airports for country {country_code}: {e}")
             return []
+        
+        data.countries[country_code] = result
+        return result
 
+    # Async facade
+    
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """Get the dedicated executor for airport queries."""
+        if cls._executor is None:
+            with cls._stats_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=settings.AIRPORT_DB_THREADS,
+                        thread_name_prefix="airport-db",
+                    )
+        return cls._executor
+    
+    @classmethod
+    def shutdown(cls) -> None:
+        """Stop the airport executor (application shutdown)."""
+        with cls._stats_lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    @classmethod
+    async def _run(cls, function: Callable[..., T], *args) -> T:
+        """
+        Run a blocking lookup on the airport executor, recording its latency.
+        
+        Latency includes the time spent waiting for a free worker.
+        """
+        with cls._stats_lock:
+            cls._stats["queries"] += 1
+            cls._stats["in_flight"] += 1
+            cls._stats["max_in_flight"] = max(cls._stats["max_in_flight"], cls._stats["in_flight"])
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(cls._get_executor(), function, *args)
+        except Exception:
+            with cls._stats_lock:
+                cls._stats["errors"] += 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with cls._stats_lock:
+                cls._stats["in_flight"] -= 1
+                cls._stats["total_ms"] += elapsed
+                cls._stats["max_ms"] = max(cls._stats["max_ms"], elapsed)
+    
+    @classmethod
+    def _cache_hit(cls) -> None:
+        """Count a lookup answered from the resident caches."""
+        with cls._stats_lock:
+            cls._stats["cache_hits"] += 1
+    
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Get airport lookup statistics.
+        
+        Returns:
+            Dictionary with executor size, current/max concurrent queries,
+            query/cache hit/error counts and latencies in milliseconds
+        """
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+        queries = stats.pop("queries")
+        total_ms = stats.pop("total_ms")
+        return {
+            "version": cls.version(),
+            "threads": settings.AIRPORT_DB_THREADS,
+            "queries": queries,
+            **stats,
+            "average_ms": round(total_ms / queries, 3) if queries else 0.0,
+            "max_ms": round(stats["max_ms"], 3),
+        }
+    
+    @classmethod
+    async def get_airport_by_icao_async(cls, icao: str) -> Optional[dict]:
+        """Async get_airport_by_icao(): resident index, else query on the executor."""
+        data = cls._data
+        if data is not None and icao.upper() in data.index:
+            cls._cache_hit()
+            return data.index[icao.upper()]
+        return await cls._run(cls.get_airport_by_icao, icao)
+    
+    @classmethod
+    async def get_runways_async(cls, icao: str) -> tuple[Runway, ...]:
+        """Async get_runways(): runway cache, else query on the executor."""
+        data = cls._data
+        if data is not None and icao.upper() in data.runways:
+            cls._cache_hit()
+            return data.runways[icao.upper()]
+        return await cls._run(cls.get_runways, icao)
+    
+    @classmethod
+    async def snapshot_async(cls, icao: str) -> Optional[dict]:
+        """Async snapshot()."""
+        await cls.prefetch([icao])
+        return cls.snapshot(icao)
+    
+    @classmethod
+    async def list_airports_by_country_async(cls, country_code: str) -> list[dict]:
+        """Async list_airports_by_country()."""
+        data = cls._data
+        if data is not None and country_code.upper() in data.countries:
+            cls._cache_hit()
+            return data.countries[country_code.upper()]
+        return await cls._run(cls.list_airports_by_country, country_code)
+    
+    @classmethod
+    async def prefetch(cls, icaos: Iterable[str]) -> None:
+        """
+        Load airports and their runways into the resident caches.
+        
+        After this the synchronous accessors for these airports are dict
+        lookups, safe to call from async code (e.g. while building a pass).
+        """
+        data = cls._data
+        missing = {
+            icao.upper() for icao in icaos
+            if data is None or icao.upper() not in data.index or icao.upper() not in data.runways
+        }
+        if not missing:
+            cls._cache_hit()
+            return
+        await asyncio.gather(*(
+            cls._run(cls._prefetch_one, icao) for icao in sorted(missing)
+        ))
+    
+    @classmethod
+    def _prefetch_one(cls, icao: str) -> None:
+        """Load one airport and its runways."""
+        cls.get_airport_by_icao(icao)
+        cls.get_runways(icao)
@@ -15,6 +15,7 @@ from app.models.ticket import Ticket
 from app.models.settings import Settings
 from app.models.airline import Airline
 from app.services.signature_service import SignatureService
+from app.services.airport_service import AirportService
 
 logger = logging.getLogger(__name__)
 
@@ -165,7 +166,7 @@ class BoardingPassService:
         for which, info in [('origin', origin_info), ('destination', destination_info)]:
             if info:
                 # Map URL
-                map_url = self.flight.origin.get_map_url() if which == 'origin' else self.flight.destination.get_map_url()
+                map_url = AirportService.map_url_from_info(info)
                 if map_url:
                     label = 'Origin Airport Location' if which == 'origin' else 'Destination Airport Location'
                     boardingpass['backFields'].append(
@@ -181,6 +182,14 @@ class BoardingPassService:
                         boardingpass['backFields'].append(
                             self.text_field(field_key, label, str(info[key]))
                         )
+                
+                # Runways summary
+                airport = self.flight.origin if which == 'origin' else self.flight.destination
+                runways = airport.get_runways_summary()
+                if runways:
+                    boardingpass['backFields'].append(
+                        self.text_field(f'{which}-runways', f'{which.title()} Airport Runways', runways)
+                    )
         
         # Locations
         locations = self.location_data()
@@ -197,15 +206,20 @@ class BoardingPassService:
         """
         locations = []
         
-        origin_location = self.flight.origin.get_location()
+        # Read airport info once per airport (snapshot from the flight JSON when available)
+        origin_info = self.flight.origin.get_info()
+        origin_location = AirportService.location_from_info(origin_info)
         if origin_location:
-            origin_location['relevantText'] = f'Welcome to {self.flight.origin.get_name() or self.flight.origin.icao}'
+            origin_name = origin_info.get('name') or self.flight.origin.icao
+            origin_location['relevantText'] = f'Welcome to {origin_name}'
             locations.append(origin_location)
         
         if self.flight.destination.icao != self.flight.origin.icao:
-            destination_location = self.flight.destination.get_location()
+            destination_info = self.flight.destination.get_info()
+            destination_location = AirportService.location_from_info(destination_info)
             if destination_location:
-                destination_location['relevantText'] = f'Thank you for flying with us to {self.flight.destination.get_name() or self.flight.destination.icao}'
+                destination_name = destination_info.get('name') or self.flight.destination.icao
+                destination_location['relevantText'] = f'Thank you for flying with us to {destination_name}'
                 locations.append(destination_location)
         
         return locations
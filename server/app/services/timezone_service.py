@@ -0,0 +1,162 @@
+"""
+Timezone service for resolving IANA timezones of airports.
+
+Works offline. Coordinates are looked up in the zone boundary polygons
+bundled with timezonefinder, so airports get their zone in countries
+spanning several UTC offsets too (KSEA America/Los_Angeles, not the zone of
+the nearest reference city, America/Boise; GCLP Atlantic/Canary).
+
+Without coordinates, outside every land zone (Etc/GMT... ocean zones), or
+without timezonefinder, the country decides from the system tz database
+(zone1970.tab), the one ZoneInfo uses to localize departure times, when
+that is unambiguous: every zone of the country keeps the same UTC offsets
+(e.g. France, or Germany, whose Europe/Zurich row only covers Büsingen).
+Otherwise nothing is resolved and the timezone sent by the client is the
+only one used.
+"""
+import zoneinfo
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Instants the offsets of zones are compared at: twice a month, 2000-2037
+_SAMPLE_START = datetime(2000, 1, 1, tzinfo=timezone.utc)
+_SAMPLE_STEP = timedelta(days=15)
+_SAMPLE_COUNT = 38 * 24
+
+
+class TimezoneService:
+    """
+    Offline coordinates and country to IANA timezone resolver.
+
+    Coordinates go through a TimezoneFinder, loaded once (lookups are
+    serialized, instances are not shared across threads). The country table
+    is built once from zone1970.tab: for each country, its zone when it has
+    a single zone or all its zones have the same offsets at every sampled
+    instant (the zone whose first country it is, e.g. Europe/Berlin for
+    DE), else no zone.
+    """
+
+    _by_country: Optional[dict[str, Optional[str]]] = None  # ISO country code -> zone, None if ambiguous
+    _finder = None  # TimezoneFinder, False if timezonefinder is unavailable
+    _finder_lock = threading.Lock()
+
+    @classmethod
+    def _zone_table_path(cls) -> Optional[Path]:
+        """Locate zone1970.tab (or the older zone.tab) in the tz database."""
+        for directory in zoneinfo.TZPATH:
+            for name in ("zone1970.tab", "zone.tab"):
+                path = Path(directory) / name
+                if path.exists():
+                    return path
+        try:
+            from importlib.resources import files
+
+            path = files("tzdata").joinpath("zoneinfo", "zone1970.tab")
+            if path.is_file():
+                return Path(str(path))
+        except Exception:
+            pass
+        return None
+
+    @staticmethod
+    def _offsets(zone: str) -> Optional[tuple]:
+        """UTC offsets of a zone at the sampled instants, None if the zone is unknown."""
+        try:
+            tz = zoneinfo.ZoneInfo(zone)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            return None
+        return tuple((_SAMPLE_START + _SAMPLE_STEP * index).astimezone(tz).utcoffset() for index in range(_SAMPLE_COUNT))
+
+    @classmethod
+    def _load(cls) -> dict[str, Optional[str]]:
+        """
+        Build the country table (once).
+
+        Returns:
+            ISO country code -> zone (None if the country spans several offsets),
+            empty if tz data is unavailable
+        """
+        if cls._by_country is not None:
+            return cls._by_country
+
+        zones_by_country: dict[str, list[tuple[bool, str]]] = {}  # (first country of the row, zone)
+        path = cls._zone_table_path()
+        if path is None:
+            logger.warning("Timezone table not found, timezone resolution disabled")
+        else:
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if not line or line.startswith("#"):
+                    continue
+                fields = line.split("\t")
+                if len(fields) < 3:
+                    continue
+                for position, country in enumerate(fields[0].split(",")):
+                    zones_by_country.setdefault(country.upper(), []).append((position == 0, fields[2]))
+
+        offsets: dict[str, Optional[tuple]] = {}
+        by_country: dict[str, Optional[str]] = {}
+        for country, zones in zones_by_country.items():
+            if len(zones) > 1:
+                for _, zone in zones:
+                    if zone not in offsets:
+                        offsets[zone] = cls._offsets(zone)
+                distinct = {offsets[zone] for _, zone in zones}
+            else:
+                distinct = {()}
+            if len(distinct) == 1 and None not in distinct:
+                # The zone of the country's own row first (Europe/Berlin before Europe/Zurich for DE)
+                by_country[country] = sorted(zones, key=lambda entry: not entry[0])[0][1]
+            else:
+                by_country[country] = None
+
+        cls._by_country = by_country
+        return by_country
+
+    @classmethod
+    def _at(cls, latitude: float, longitude: float) -> Optional[str]:
+        """Zone whose boundary contains a point, None at sea or without timezonefinder."""
+        with cls._finder_lock:
+            if cls._finder is None:
+                try:
+                    from timezonefinder import TimezoneFinder
+
+                    cls._finder = TimezoneFinder()
+                except ImportError as e:
+                    logger.warning(f"Could not import timezonefinder: {e}. Timezones resolved from countries only.")
+                    cls._finder = False
+            if not cls._finder:
+                return None
+            try:
+                zone = cls._finder.timezone_at(lng=float(longitude), lat=float(latitude))
+            except ValueError:
+                return None
+        # Etc/GMT... zones are the ocean between land boundaries
+        return zone if zone and not zone.startswith("Etc/") else None
+
+    @classmethod
+    def resolve(
+        cls, country: Optional[str], latitude: Optional[float] = None, longitude: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        Resolve the IANA timezone of a location from its coordinates, else its country.
+
+        Args:
+            country: ISO country code
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+
+        Returns:
+            IANA timezone identifier (e.g., 'Europe/Paris'), or None if the
+            location is not within a zone and its country is unknown or spans
+            several UTC offsets
+        """
+        if latitude is not None and longitude is not None:
+            zone = cls._at(latitude, longitude)
+            if zone is not None:
+                return zone
+        return cls._load().get((country or "").upper())
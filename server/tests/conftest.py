@@ -8,9 +8,26 @@ from typing import AsyncGenerator
 
 from httpx import AsyncClient, ASGITransport
 
+from app.config import settings
+from app.database.connection import engine
+from app.database.migrations import migrate
 from app.main import app, API
 
 
+@pytest.fixture(scope="session", autouse=True)
+async def database() -> AsyncGenerator[None, None]:
+    """
+    Prepare the test database schema.
+
+    With DB_BACKEND=sqlite, a new DB_SQLITE_PATH file gets the schema from
+    tables.py, so the suite runs in-process without a MySQL server.
+    """
+    if settings.DB_BACKEND == "sqlite":
+        async with engine.connect() as conn:
+            await migrate(conn)
+    yield
+
+
 @pytest.fixture(scope="session")
 async def client() -> AsyncGenerator[AsyncClient, None]:
     """
@@ -5,6 +5,7 @@ These tests match the endpoints from tests/test.zsh:
 - POST /v1/airline/create
 - GET /v1/airline/{airline_identifier}
 - GET /v1/airline/{airline_identifier}/keys
+- POST /v1/airline/{airline_identifier}/token
 """
 import pytest
 from httpx import AsyncClient
@@ -153,3 +154,117 @@ async def test_airline_authentication_failure(client: AsyncClient):
     assert "Invalid Bearer Token" in data["detail"]
     print("✅ Authentication failure handled correctly")
 
+
+
+@pytest.mark.asyncio
+async def test_airline_authentication_cached(client: AsyncClient):
+    """Test that a cached airline still rejects an invalid bearer token."""
+    from app.config import settings
+
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+
+    create_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.auth.cached.123",
+            "airline_name": "Auth Cache Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+
+    if create_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+
+    airline_identifier = create_response.json()["airline_identifier"]
+    apple_identifier = create_response.json()["apple_identifier"]
+
+    # Authenticated twice (the second from the auth cache)
+    for _ in range(2):
+        response = await client.get(
+            f"/api/v1/airline/{airline_identifier}",
+            headers={"Authorization": f"Bearer {apple_identifier}"}
+        )
+        assert response.status_code == 200
+        assert response.json()["airline_name"] == "Auth Cache Test Airline"
+
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}",
+        headers={"Authorization": "Bearer wrong_token"}
+    )
+    assert response.status_code == 401
+
+    # Updating the airline invalidates its cached data
+    await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.auth.cached.123",
+            "airline_name": "Renamed Auth Cache Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}",
+        headers={"Authorization": f"Bearer {apple_identifier}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["airline_name"] == "Renamed Auth Cache Test Airline"
+    print("✅ Cached authentication checked")
+
+
+@pytest.mark.asyncio
+async def test_access_token(client: AsyncClient):
+    """Test exchanging the airline credential for an access token and using it."""
+    from app.config import settings
+
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+
+    create_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.access.token.123",
+            "airline_name": "Access Token Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+
+    if create_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+
+    airline_identifier = create_response.json()["airline_identifier"]
+    apple_identifier = create_response.json()["apple_identifier"]
+
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/token",
+        headers={"Authorization": f"Bearer {apple_identifier}"}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["token_type"] == "Bearer"
+    assert data["expires_in"] > 0
+    access_token = data["access_token"]
+
+    # The access token authenticates like the credential
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}",
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["airline_name"] == "Access Token Test Airline"
+
+    # But cannot be exchanged for a new one
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/token",
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert response.status_code == 401
+
+    # Nor tampered with
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}",
+        headers={"Authorization": f"Bearer {access_token[:-4]}AAAA"}
+    )
+    assert response.status_code == 401
+    print("✅ Access token issued and verified")
@@ -0,0 +1,143 @@
+"""
+Test airport data generations: DatabaseSource lifetime, snapshot contents and checks.
+
+Generations are built on stand-in sources recording whether they were
+closed, so these tests run without airports.db.
+"""
+import threading
+from types import SimpleNamespace
+
+
+class Source:
+    """Stand-in DatabaseSource."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class AirportSource(Source):
+    """Stand-in DatabaseSource with one airport and its runways, counting queries."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.queries = 0
+
+    def get_airports(self, where: str):
+        self.queries += 1
+        return [SimpleNamespace(
+            ident="EGLL", name="London Heathrow Airport", municipality="London", iso_country="GB",
+            latitude_deg=51.4706, longitude_deg=-0.461941, elevation_ft=83, iata_code="LHR",
+            type="large_airport",
+        )]
+
+    def get_runways(self, where: str):
+        self.queries += 1
+        return [
+            SimpleNamespace(le_ident="09L", he_ident="27R", length_ft=12802, surface="ASP", closed=False),
+            SimpleNamespace(le_ident="09R", he_ident="27L", length_ft=12008, surface="ASP", closed=False),
+            SimpleNamespace(le_ident="05", he_ident="23", length_ft=6000, surface="ASP", closed=True),
+        ]
+
+
+def test_previous_generation_closed():
+    """Test that each thread closes its DatabaseSource of a replaced generation."""
+    from app.services.airport_service import AirportData
+
+    opened = []
+
+    def connect():
+        opened.append(Source(f"worker{len(opened)}"))
+        return opened[-1]
+
+    first_source = Source("reload1")
+    first = AirportData(first_source, 1, 1.0, connect)
+    assert first.connection() is first_source
+
+    worker_sources = []
+    barrier = threading.Barrier(2, timeout=5)
+    step = threading.Event()
+
+    def serve():
+        worker_sources.append(first.connection())
+        barrier.wait()
+        step.wait(5)
+        worker_sources.append(second.connection())
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    barrier.wait()
+    assert worker_sources[0] is not first_source and not worker_sources[0].closed
+
+    # Reload: the new generation's source replaces the reloading thread's
+    second_source = Source("reload2")
+    second = AirportData(second_source, 2, 2.0, connect)
+    assert first_source.closed
+    assert second.connection() is second_source
+
+    # The worker closes its own on its next query
+    step.set()
+    thread.join()
+    assert worker_sources[0].closed
+    assert not worker_sources[1].closed
+
+    AirportData.release()
+    assert second_source.closed
+    print("✅ DatabaseSources of the previous generation closed in their threads")
+
+
+def test_snapshot_current(monkeypatch):
+    """Test that snapshots from other airport data, or older fields, are not current."""
+    from app.services.airport_service import AirportData, AirportService
+
+    data = AirportData(Source("current"), 1, 1700000000.5, Source)
+    monkeypatch.setattr(AirportService, "_data", data)
+    snapshot = {"ident": "EGLL", "version": AirportService.INFO_VERSION, "data_version": 1700000000.5}
+
+    assert AirportService.is_current(snapshot)
+    assert not AirportService.is_current({**snapshot, "data_version": 1600000000.0})
+    assert not AirportService.is_current({**snapshot, "version": AirportService.INFO_VERSION - 1})
+    assert not AirportService.is_current(None)
+
+    # Without airports.db, snapshots are all there is
+    monkeypatch.setattr(AirportService, "_data", None)
+    monkeypatch.setattr(AirportService, "_db_mtime", staticmethod(lambda: None))
+    assert AirportService.is_current({**snapshot, "data_version": 1600000000.0})
+    AirportData.release()
+    print("✅ Snapshot checked against the airport data version")
+
+
+def test_snapshot_contents(monkeypatch):
+    """Test that a snapshot holds the airport info, runways and versions, and answers without queries."""
+    from app.models.airport import Airport
+    from app.services.airport_service import AirportData, AirportService
+
+    source = AirportSource("current")
+    data = AirportData(source, 1, 1700000000.5, Source)
+    monkeypatch.setattr(AirportService, "_data", data)
+
+    snapshot = AirportService.snapshot("egll")
+    assert snapshot["ident"] == "EGLL"
+    assert snapshot["name"] == "London Heathrow Airport"
+    assert snapshot["municipality"] == "London"
+    assert (snapshot["latitude_deg"], snapshot["longitude_deg"]) == (51.4706, -0.461941)
+    assert snapshot["timezone_identifier"] == "Europe/London"
+    # Closed runways are left out
+    assert snapshot["runways"] == "09L/27R 12802ft ASP, 09R/27L 12008ft ASP"
+    assert snapshot["version"] == AirportService.INFO_VERSION
+    assert snapshot["data_version"] == 1700000000.5
+
+    # Stored and sent with the flight JSON, and read from there
+    airport = Airport(icao="EGLL", info=snapshot)
+    assert airport.to_json()["info"] == snapshot
+    queries = source.queries
+    monkeypatch.setattr(AirportService, "_data", AirportData(AirportSource("next"), 2, 1700000000.5, Source))
+    assert airport.get_name() == "London Heathrow Airport"
+    assert airport.get_runways_summary() == snapshot["runways"]
+    assert airport.get_timezone_identifier() == "Europe/London"
+    assert AirportService._data.source.queries == 0 and source.queries == queries
+    AirportData.release()
+    print("✅ Snapshot holds the airport info, runways and versions")
@@ -108,3 +108,86 @@ async def test_get_airport_case_insensitive(client: AsyncClient):
     assert data_lower["ident"] == data_upper["ident"]
     print("✅ Case-insensitive ICAO handling works")
 
+
+
+@pytest.mark.asyncio
+async def test_get_airport_runways(client: AsyncClient):
+    """Test getting runways for an airport."""
+    from app.services.airport_service import AirportService
+    
+    # Skip if airport service is not available
+    if AirportService._get_source() is None:
+        pytest.skip("Airport service not available (euro_aip library not installed or database not found)")
+    
+    response = await client.get("/api/v1/airport/EGLL/runways")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data, list)
+    for runway in data:
+        assert "length_ft" in runway
+        assert "surface" in runway
+        assert "le_heading_degT" in runway
+        assert "he_heading_degT" in runway
+    print(f"✅ Retrieved {len(data)} runways")
+
+
+@pytest.mark.asyncio
+async def test_get_airport_runways_not_found(client: AsyncClient):
+    """Test getting runways for a non-existent airport."""
+    response = await client.get("/api/v1/airport/XXXX/runways")
+    
+    assert response.status_code == 400
+    data = response.json()
+    assert "not found" in data["detail"].lower()
+    print("✅ Not found error handled correctly (runways)")
+
+
+@pytest.mark.asyncio
+async def test_reload_airports(client: AsyncClient):
+    """Test reloading airport data (system auth)."""
+    from app.config import settings
+    from app.services.airport_service import AirportService
+    
+    response = await client.post("/api/v1/admin/airport/reload")
+    assert response.status_code == 401
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured")
+    if AirportService._get_source() is None:
+        pytest.skip("Airport service not available (euro_aip library not installed or database not found)")
+    
+    version = AirportService.version()
+    response = await client.post(
+        "/api/v1/admin/airport/reload",
+        headers={"Authorization": f"Bearer {settings.SECRET}"},
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["version"] == version + 1
+    assert AirportService.get_airport_by_icao("EGLL") is not None
+    print(f"✅ Airport data reloaded (version {version + 1})")
+
+
+@pytest.mark.asyncio
+async def test_airport_stats(client: AsyncClient):
+    """Test airport lookup statistics (system auth)."""
+    from app.config import settings
+    
+    response = await client.get("/api/v1/admin/airport/stats")
+    assert response.status_code == 401
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured")
+    
+    response = await client.get(
+        "/api/v1/admin/airport/stats",
+        headers={"Authorization": f"Bearer {settings.SECRET}"},
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["threads"] >= 1
+    assert "in_flight" in data
+    assert "average_ms" in data
+    print(f"✅ Airport stats: {data['queries']} queries, {data['cache_hits']} cache hits")
@@ -0,0 +1,72 @@
+"""
+Test timezones resolved for airports without a timezone from the client.
+
+Coordinates are looked up in zone boundaries, so airports in countries
+spanning several UTC offsets get their own zone, also near boundaries where
+the nearest zone reference city is wrong (KSEA is nearer Boise than Los
+Angeles). Without coordinates, only single-offset countries resolve.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+
+def _airport(ident: str, country: str, latitude, longitude) -> SimpleNamespace:
+    return SimpleNamespace(ident=ident, name=ident, municipality=None, iso_country=country,
+                           latitude_deg=latitude, longitude_deg=longitude, elevation_ft=0,
+                           iata_code=None, type="large_airport")
+
+
+@pytest.mark.parametrize("airport,zone", [
+    (_airport("KSEA", "US", 47.449, -122.309), "America/Los_Angeles"),  # Nearest reference city Boise
+    (_airport("KBOI", "US", 43.564, -116.223), "America/Boise"),
+    (_airport("KDFW", "US", 32.897, -97.038), "America/Chicago"),       # Nearest reference city Denver
+    (_airport("KELP", "US", 31.807, -106.378), "America/Denver"),       # Nearest reference city Phoenix
+    (_airport("KMSP", "US", 44.882, -93.222), "America/Chicago"),       # Nearest reference city Menominee
+    (_airport("CYVR", "CA", 49.194, -123.184), "America/Vancouver"),
+    (_airport("LEMD", "ES", 40.472, -3.561), "Europe/Madrid"),
+    (_airport("GCLP", "ES", 27.932, -15.387), "Atlantic/Canary"),
+    (_airport("LPPT", "PT", 38.781, -9.136), "Europe/Lisbon"),
+    (_airport("LPPD", "PT", 37.741, -25.698), "Atlantic/Azores"),
+    (_airport("UUEE", "RU", 55.973, 37.415), "Europe/Moscow"),
+    (_airport("YSSY", "AU", -33.946, 151.177), "Australia/Sydney"),
+    (_airport("YPPH", "AU", -31.940, 115.967), "Australia/Perth"),
+    (_airport("SBGR", "BR", -23.432, -46.470), "America/Sao_Paulo"),
+])
+def test_multi_offset_country_from_coordinates(airport, zone):
+    pytest.importorskip("timezonefinder")
+    from app.services.airport_service import AirportService
+
+    assert AirportService._airport_to_dict(airport)["timezone_identifier"] == zone
+
+
+@pytest.mark.parametrize("airport,zone", [
+    (_airport("LFPG", "FR", 49.01, 2.55), "Europe/Paris"),
+    (_airport("EDDF", "DE", 50.033, 8.571), "Europe/Berlin"),  # Europe/Zurich also lists DE (Büsingen)
+    (_airport("EGLL", "GB", 51.471, -0.462), "Europe/London"),
+    (_airport("LSGG", "CH", 46.238, 6.109), "Europe/Zurich"),  # Next to the French border
+    (_airport("EBBR", "BE", 50.901, 4.484), "Europe/Brussels"),
+])
+def test_single_offset_country_timezone(airport, zone):
+    from app.services.airport_service import AirportService
+    
+    info = AirportService._airport_to_dict(airport)
+    if info["timezone_identifier"] is None:
+        pytest.skip("Timezone database not available")
+    
+    assert info["timezone_identifier"] == zone
+
+
+@pytest.mark.parametrize("country,latitude,longitude,zone", [
+    ("FR", None, None, "Europe/Paris"),   # No coordinates
+    ("FR", 46.0, -10.0, "Europe/Paris"),  # At sea, off the French coast
+    ("US", None, None, None),             # Several offsets: no guess
+    ("ES", None, None, None),
+])
+def test_country_fallback(country, latitude, longitude, zone):
+    from app.services.timezone_service import TimezoneService
+
+    if TimezoneService.resolve("FR") is None:
+        pytest.skip("Timezone database not available")
+
+    assert TimezoneService.resolve(country, latitude, longitude) == zone
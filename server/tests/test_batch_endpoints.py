@@ -0,0 +1,189 @@
+"""
+Test batch endpoint using httpx.
+
+- POST /v1/airline/{airline_identifier}/batch
+"""
+import pytest
+from httpx import AsyncClient
+from datetime import datetime, timedelta
+
+
+@pytest.mark.asyncio
+async def test_batch(client: AsyncClient):
+    """Test creating an aircraft, flight, passenger and ticket in one batch."""
+    from app.config import settings
+
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.batch.airline.123",
+            "airline_name": "Batch Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/batch",
+        json=[
+            {
+                "path": "aircraft/create",
+                "body": {"registration": "N67890", "type": "Piper PA-28"},
+                "ref": "plane"
+            },
+            {
+                "path": "flight/plan/$plane.aircraft_identifier",
+                "body": {
+                    "origin": {"icao": "EGLL"},
+                    "destination": {"icao": "LFPG"},
+                    "gate": "D4",
+                    "flightNumber": "BATCH1",
+                    "scheduledDepartureDate": (datetime.now() + timedelta(days=1)).isoformat()
+                },
+                "ref": "flight"
+            },
+            {
+                "path": "passenger/create",
+                "body": {"formattedName": "Batch Passenger", "apple_identifier": "test.batch.passenger.123"},
+                "ref": "passenger"
+            },
+            {
+                "path": "ticket/issue/$flight.flight_identifier/$passenger.passenger_identifier",
+                "body": {"seatNumber": "4D"}
+            }
+        ],
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [result["status"] for result in data] == [200, 200, 200, 200]
+    flight_identifier = data[1]["body"]["flight_identifier"]
+    ticket = data[3]["body"]
+    assert ticket["seatNumber"] == "4D"
+
+    # Written together
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/flight/{flight_identifier}/tickets",
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert ticket["ticket_identifier"] in {item["ticket_identifier"] for item in response.json()}
+    print(f"✅ Ran batch of {len(data)} operations")
+
+
+@pytest.mark.asyncio
+async def test_batch_rollback(client: AsyncClient):
+    """Test a failing operation rolls back the whole batch."""
+    from app.config import settings
+
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.batch.airline.123",
+            "airline_name": "Batch Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/batch",
+        json=[
+            {
+                "path": "passenger/create",
+                "body": {"formattedName": "Rolled Back", "apple_identifier": "test.batch.rollback.123"},
+                "ref": "passenger"
+            },
+            {
+                "path": "ticket/issue/nonexistent-flight-id/$passenger.passenger_identifier",
+                "body": {"seatNumber": "1A"}
+            }
+        ],
+        headers=headers
+    )
+
+    assert response.status_code == 404
+    assert "Operation 1" in response.json()["detail"]
+
+    response = await client.get(f"/api/v1/airline/{airline_identifier}/passenger/list", headers=headers)
+    assert response.status_code == 200
+    assert "test.batch.rollback.123" not in {item["apple_identifier"] for item in response.json()}
+    print("✅ Failed batch rolled back")
+
+
+@pytest.mark.asyncio
+async def test_batch_rollback_database_error(client: AsyncClient, monkeypatch):
+    """Test an operation failing in the database rolls back the whole batch."""
+    from sqlalchemy import insert
+    from app.config import settings
+    from app.database.tables import airlines
+    from app.routers import batch
+
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.batch.dberror.123",
+            "airline_name": "Batch Database Error Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+
+    async def duplicate_airline(airline, db):
+        # Primary key conflict: IntegrityError
+        await db.execute(insert(airlines).values(
+            airline_id=airline.airline_id,
+            airline_identifier=airline.airline_identifier,
+            json_data={},
+        ))
+
+    monkeypatch.setattr(batch, "OPERATIONS", [("POST", "duplicate", duplicate_airline), *batch.OPERATIONS])
+
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/batch",
+        json=[
+            {
+                "path": "passenger/create",
+                "body": {"formattedName": "Rolled Back", "apple_identifier": "test.batch.dberror.passenger"}
+            },
+            {"path": "duplicate"}
+        ],
+        headers=headers
+    )
+
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Operation 1 (POST duplicate)")
+
+    response = await client.get(f"/api/v1/airline/{airline_identifier}/passenger/list", headers=headers)
+    assert response.status_code == 200
+    assert "test.batch.dberror.passenger" not in {item["apple_identifier"] for item in response.json()}
+    print("✅ Batch failing in the database rolled back")
@@ -0,0 +1,119 @@
+"""
+Test the duplicate cleanup job and the migrations waiting for it.
+
+Each test runs on a SQLite database of its own, where a unique index is
+dropped and its migration marked pending, as on a database with duplicates.
+"""
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_duplicate_tickets_wait_for_dedup(tmp_path):
+    """Test that migration 5 leaves duplicates alone until the explicit job removes them."""
+    from sqlalchemy import func as sql_func, insert, inspect, select, text
+    from app.database.connection import _create_engine
+    from app.database.dedup import deduplicate
+    from app.database.migrations import migrate
+    from app.database.tables import (
+        aircrafts, airlines, deletions, flights, list_versions, passengers, tickets,
+    )
+
+    engine = _create_engine(f"sqlite+aiosqlite:///{tmp_path / 'dedup.sqlite'}")
+    async with engine.connect() as conn:
+        await migrate(conn)
+        await conn.execute(text("DROP INDEX ux_tickets_flight_passenger"))
+        await conn.execute(text("DELETE FROM SchemaMigrations WHERE version = 5"))
+        await conn.execute(insert(airlines).values(airline_id=1, airline_identifier="dedup", json_data={}))
+        await conn.execute(insert(aircrafts).values(aircraft_id=1, aircraft_identifier="a", airline_id=1, json_data={}))
+        await conn.execute(insert(flights).values(
+            flight_id=1, flight_identifier="f", aircraft_id=1, airline_id=1, json_data={}
+        ))
+        await conn.execute(insert(passengers).values(
+            passenger_id=1, passenger_identifier="p", airline_id=1, json_data={}
+        ))
+        await conn.execute(insert(tickets), [
+            {"ticket_identifier": identifier, "flight_id": 1, "passenger_id": 1, "airline_id": 1, "json_data": {}}
+            for identifier in ("t1", "t2")
+        ])
+        await conn.commit()
+
+        async def ticket_count() -> int:
+            return (await conn.execute(select(sql_func.count()).select_from(tickets))).scalar_one()
+
+        # Startup migrations do not delete: migration 5 stays pending
+        assert await migrate(conn) == []
+        assert await ticket_count() == 2
+
+        assert await deduplicate(conn, dry_run=True) == {"tickets": 1, "passengers": 0}
+        assert await ticket_count() == 2
+
+        assert await deduplicate(conn) == {"tickets": 1, "passengers": 0}
+        assert await ticket_count() == 1
+        assert (await conn.execute(select(deletions.c.identifier))).scalars().all() == ["t2"]
+        assert (await conn.execute(select(list_versions.c.version))).scalar_one() == 1
+
+        assert await migrate(conn) == [5]
+        indexes = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_indexes(tickets.name))
+        assert "ux_tickets_flight_passenger" in {index["name"] for index in indexes}
+    await engine.dispose()
+    print("✅ Duplicate tickets removed by the dedup job, then migration 5 applied")
+
+
+@pytest.mark.asyncio
+async def test_duplicate_passengers_wait_for_dedup(tmp_path):
+    """Test that migration 6 leaves passengers of the same contact alone until the job merges them."""
+    from sqlalchemy import insert, inspect, select, text
+    from app.database.connection import _create_engine
+    from app.database.dedup import deduplicate
+    from app.database.migrations import migrate
+    from app.database.tables import airlines, deletions, passengers
+
+    engine = _create_engine(f"sqlite+aiosqlite:///{tmp_path / 'dedup.sqlite'}")
+    async with engine.connect() as conn:
+        await migrate(conn)
+        await conn.execute(text("DROP INDEX ux_passengers_airline_apple"))
+        await conn.execute(text("DELETE FROM SchemaMigrations WHERE version = 6"))
+        await conn.execute(insert(airlines).values(airline_id=1, airline_identifier="dedup", json_data={}))
+        await conn.execute(insert(passengers), [
+            {"passenger_identifier": identifier, "airline_id": 1, "json_data": {"apple_identifier": "same.contact"}}
+            for identifier in ("p1", "p2")
+        ])
+        await conn.commit()
+
+        async def passenger_identifiers() -> list[str]:
+            return (await conn.execute(select(passengers.c.passenger_identifier))).scalars().all()
+
+        assert await migrate(conn) == []
+        assert sorted(await passenger_identifiers()) == ["p1", "p2"]
+
+        assert await deduplicate(conn, dry_run=True) == {"tickets": 0, "passengers": 1}
+        assert sorted(await passenger_identifiers()) == ["p1", "p2"]
+
+        assert await deduplicate(conn) == {"tickets": 0, "passengers": 1}
+        assert await passenger_identifiers() == ["p1"]
+        assert (await conn.execute(select(deletions.c.identifier))).scalars().all() == ["p2"]
+
+        assert await migrate(conn) == [6]
+        indexes = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_indexes(passengers.name))
+        assert "ux_passengers_airline_apple" in {index["name"] for index in indexes}
+    await engine.dispose()
+    print("✅ Duplicate passengers merged by the dedup job, then migration 6 applied")
+
+
+@pytest.mark.asyncio
+async def test_dedup_endpoint(client):
+    """Test that POST admin/dedup needs system auth and only counts by default."""
+    from app.config import settings
+
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+
+    response = await client.post("/api/v1/admin/dedup")
+    assert response.status_code == 401
+
+    response = await client.post("/api/v1/admin/dedup", headers={"Authorization": f"Bearer {settings.SECRET}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["dry_run"] is True
+    assert {"tickets", "passengers", "shards"} <= set(data)
+    print(f"✅ Dedup dry run: {data['tickets']} tickets, {data['passengers']} passengers")
@@ -3,10 +3,13 @@ Test flight endpoints using httpx.
 
 These tests match the endpoints from tests/test.zsh:
 - POST /v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}
+- POST /v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}/series
+- POST /v1/airline/{airline_identifier}/flight/amend/{flight_identifier}
 - GET /v1/airline/{airline_identifier}/flight/list
 - GET /v1/airline/{airline_identifier}/flight/{flight_identifier}
 - GET /v1/airline/{airline_identifier}/flight/{flight_identifier}/tickets
 - DELETE /v1/airline/{airline_identifier}/flight/{flight_identifier}
+- list stats after creates and deletes (aircraft, flight and passenger lists)
 - POST /v1/airline/{airline_identifier}/flight/check/{flight_identifier}
 """
 import pytest
@@ -84,6 +87,192 @@ async def test_plan_flight(client: AsyncClient):
     print(f"✅ Created flight: {data['flight_identifier']}")
 
 
+@pytest.mark.asyncio
+async def test_plan_flight_series(client: AsyncClient):
+    """Test planning a weekly series of flights."""
+    from app.config import settings
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # First create an airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.flight.airline.123",
+            "airline_name": "Flight Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+    
+    # Create an aircraft
+    aircraft_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/aircraft/create",
+        json={
+            "registration": "N12345",
+            "type": "Cessna 172"
+        },
+        headers=headers
+    )
+    
+    if aircraft_response.status_code != 200:
+        pytest.skip("Could not create test aircraft")
+    
+    aircraft_identifier = aircraft_response.json()["aircraft_identifier"]
+    
+    # Plan three weekly flights
+    series = {
+        "origin": {"icao": "EGLL", "timezone_identifier": "Europe/London"},
+        "destination": {"icao": "LFPG"},
+        "gate": "C3",
+        "flightNumber": "FF300",
+        "scheduledDepartureDate": (datetime.now() + timedelta(days=1)).isoformat(),
+        "recurrence": "FREQ=WEEKLY;COUNT=3"
+    }
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}/series",
+        json=series,
+        headers=headers
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 3
+    assert len({flight["flight_identifier"] for flight in data}) == 3
+    departures = [datetime.fromisoformat(flight["scheduledDepartureDate"]) for flight in data]
+    assert departures == sorted(departures)
+    assert all(flight["gate"] == "C3" for flight in data)
+    
+    # Unbounded recurrence
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}/series",
+        json={**series, "recurrence": "FREQ=WEEKLY"},
+        headers=headers
+    )
+    assert response.status_code == 400
+    print(f"✅ Planned series of {len(data)} flights")
+
+
+@pytest.mark.asyncio
+async def test_amend_flight(client: AsyncClient):
+    """Test amending a flight updates the flight copied into its tickets."""
+    from app.config import settings
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # First create an airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.flight.airline.123",
+            "airline_name": "Flight Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+    
+    # Create an aircraft, a flight, a passenger and a ticket
+    aircraft_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/aircraft/create",
+        json={
+            "registration": "N12345",
+            "type": "Cessna 172"
+        },
+        headers=headers
+    )
+    
+    if aircraft_response.status_code != 200:
+        pytest.skip("Could not create test aircraft")
+    
+    aircraft_identifier = aircraft_response.json()["aircraft_identifier"]
+    
+    flight = {
+        "origin": {"icao": "EGLL"},
+        "destination": {"icao": "KJFK"},
+        "gate": "A12",
+        "flightNumber": "FF124",
+        "scheduledDepartureDate": (datetime.now() + timedelta(days=1)).isoformat()
+    }
+    flight_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}",
+        json=flight,
+        headers=headers
+    )
+    
+    if flight_response.status_code != 200:
+        pytest.skip("Could not create test flight")
+    
+    flight_identifier = flight_response.json()["flight_identifier"]
+    
+    passenger_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/passenger/create",
+        json={
+            "formattedName": "Amend Passenger",
+            "apple_identifier": "test.amend.passenger.123"
+        },
+        headers=headers
+    )
+    
+    if passenger_response.status_code != 200:
+        pytest.skip("Could not create test passenger")
+    
+    passenger_identifier = passenger_response.json()["passenger_identifier"]
+    
+    ticket_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/ticket/issue/{flight_identifier}/{passenger_identifier}",
+        json={"seatNumber": "1A"},
+        headers=headers
+    )
+    
+    if ticket_response.status_code != 200:
+        pytest.skip("Could not create test ticket")
+    
+    ticket_identifier = ticket_response.json()["ticket_identifier"]
+    
+    # Amend the gate
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/flight/amend/{flight_identifier}",
+        json={**flight, "gate": "B7"},
+        headers=headers
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["flight_identifier"] == flight_identifier
+    assert data["gate"] == "B7"
+    
+    # The ticket carries the amended flight
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/ticket/{ticket_identifier}",
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["flight"]["gate"] == "B7"
+    
+    # Unknown flight
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/flight/amend/nonexistent-flight-id",
+        json=flight,
+        headers=headers
+    )
+    assert response.status_code == 404
+    print(f"✅ Amended flight: {flight_identifier}")
+
+
 @pytest.mark.asyncio
 async def test_list_flights(client: AsyncClient):
     """Test listing flights."""
@@ -157,6 +346,237 @@ async def test_list_flights(client: AsyncClient):
     print(f"✅ Listed {len(data)} flights")
 
 
+@pytest.mark.asyncio
+async def test_list_flights_filtered(client: AsyncClient):
+    """Test filtering flights by departure date and airport."""
+    from app.config import settings
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.filter.flights.123",
+            "airline_name": "Filter Flights Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    
+    # Create aircraft
+    aircraft_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/aircraft/create",
+        json={
+            "registration": "N77777",
+            "type": "Piper PA-28"
+        },
+        headers={"Authorization": f"Bearer {apple_identifier}"}
+    )
+    
+    if aircraft_response.status_code != 200:
+        pytest.skip("Could not create test aircraft")
+    
+    aircraft_identifier = aircraft_response.json()["aircraft_identifier"]
+    
+    # One past flight from EGLL, one upcoming flight from LFPG
+    planned = {}
+    for origin, days in (("EGLL", -10), ("LFPG", 10)):
+        response = await client.post(
+            f"/api/v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}",
+            json={
+                "origin": {"icao": origin},
+                "destination": {"icao": "KJFK"},
+                "gate": "B1",
+                "flightNumber": f"FLT{origin}",
+                "scheduledDepartureDate": (datetime.now() + timedelta(days=days)).isoformat() + "Z"
+            },
+            headers={"Authorization": f"Bearer {apple_identifier}"}
+        )
+        assert response.status_code == 200
+        planned[origin] = response.json()["flight_identifier"]
+    
+    async def listed(params: dict) -> set[str]:
+        response = await client.get(
+            f"/api/v1/airline/{airline_identifier}/flight/list",
+            params=params,
+            headers={"Authorization": f"Bearer {apple_identifier}"}
+        )
+        assert response.status_code == 200
+        return {flight["flight_identifier"] for flight in response.json()}
+    
+    assert await listed({"upcoming": "true"}) == {planned["LFPG"]}
+    assert await listed({"origin": "EGLL"}) == {planned["EGLL"]}
+    assert await listed({"destination": "KJFK", "to": datetime.now().isoformat()}) == {planned["EGLL"]}
+    print("✅ Filtered flights by date and airport")
+
+
+@pytest.mark.asyncio
+async def test_list_flights_upcoming_not_modified(client: AsyncClient, monkeypatch):
+    """Test that an upcoming list keeps its ETag as time passes, until its first flight departs."""
+    from app.config import settings
+    from app.database import filters
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.upcoming.etag.123",
+            "airline_name": "Upcoming ETag Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    
+    # Create aircraft
+    aircraft_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/aircraft/create",
+        json={
+            "registration": "N78787",
+            "type": "Piper PA-28"
+        },
+        headers={"Authorization": f"Bearer {apple_identifier}"}
+    )
+    
+    if aircraft_response.status_code != 200:
+        pytest.skip("Could not create test aircraft")
+    
+    aircraft_identifier = aircraft_response.json()["aircraft_identifier"]
+    
+    for days in (1, 10):
+        response = await client.post(
+            f"/api/v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}",
+            json={
+                "origin": {"icao": "LFPG"},
+                "destination": {"icao": "KJFK"},
+                "gate": "B1",
+                "flightNumber": f"UPC{days}",
+                "scheduledDepartureDate": (datetime.now() + timedelta(days=days)).isoformat() + "Z"
+            },
+            headers={"Authorization": f"Bearer {apple_identifier}"}
+        )
+        assert response.status_code == 200
+    
+    shift = timedelta()
+    
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + shift
+    
+    monkeypatch.setattr(filters, "datetime", Clock)
+    
+    async def listed(etag: str = None):
+        return await client.get(
+            f"/api/v1/airline/{airline_identifier}/flight/list",
+            params={"upcoming": "true"},
+            headers={"Authorization": f"Bearer {apple_identifier}", **({"If-None-Match": etag} if etag else {})}
+        )
+    
+    response = await listed()
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    etag = response.headers["ETag"]
+    
+    # An hour later the same flights are upcoming
+    shift = timedelta(hours=1)
+    response = await listed(etag)
+    assert response.status_code == 304
+    
+    # Two days later the first one has departed
+    shift = timedelta(days=2)
+    response = await listed(etag)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.headers["ETag"] != etag
+    print("✅ Upcoming flight list not modified until a flight departs")
+
+
+@pytest.mark.asyncio
+async def test_list_flights_filtered_local_offset(client: AsyncClient):
+    """Test that departure filters compare in UTC for dates stored with a local offset."""
+    from app.config import settings
+    from app.database.connection import engine
+    from app.database.tables import flights
+    from sqlalchemy import update, func as sql_func
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.offset.flights.123",
+            "airline_name": "Offset Flights Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+    
+    aircraft_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/aircraft/create",
+        json={"registration": "N55555", "type": "Piper PA-28"},
+        headers=headers
+    )
+    aircraft_identifier = aircraft_response.json()["aircraft_identifier"]
+    
+    # As written by earlier clients or the PHP backend: 10:00+05:00 departs before 06:00+00:00
+    planned = {}
+    for departure in ("2030-01-01T10:00:00+05:00", "2030-01-01T06:00:00+00:00"):
+        response = await client.post(
+            f"/api/v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}",
+            json={
+                "origin": {"icao": "EGLL"},
+                "destination": {"icao": "LFPG"},
+                "gate": "A1",
+                "flightNumber": "OFF1",
+                "scheduledDepartureDate": departure
+            },
+            headers=headers
+        )
+        assert response.status_code == 200
+        planned[departure] = response.json()["flight_identifier"]
+        async with engine.begin() as conn:
+            await conn.execute(
+                update(flights)
+                .where(flights.c.flight_identifier == planned[departure])
+                .values(json_data=sql_func.json_set(flights.c.json_data, "$.scheduledDepartureDate", departure))
+            )
+    
+    async def listed(params: dict) -> list[str]:
+        response = await client.get(
+            f"/api/v1/airline/{airline_identifier}/flight/list", params=params, headers=headers
+        )
+        assert response.status_code == 200
+        return [flight["flight_identifier"] for flight in response.json()]
+    
+    assert await listed({"from": "2030-01-01T05:30:00Z"}) == [planned["2030-01-01T06:00:00+00:00"]]
+    assert await listed({"to": "2030-01-01T05:30:00Z", "from": "2029-12-31T00:00:00Z"}) == [
+        planned["2030-01-01T10:00:00+05:00"]
+    ]
+    print("✅ Filtered flights stored with a local offset")
+
+
 @pytest.mark.asyncio
 async def test_get_flight(client: AsyncClient):
     """Test getting a flight by identifier."""
@@ -426,6 +846,116 @@ async def test_delete_flight(client: AsyncClient):
     print(f"✅ Deleted flight: {flight_identifier}")
 
 
+@pytest.mark.asyncio
+async def test_list_stats_follow_writes(client: AsyncClient):
+    """Test that list stats follow flights and tickets being created and deleted."""
+    from app.config import settings
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.stats.flight.123",
+            "airline_name": "Stats Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    headers = {"Authorization": f"Bearer {airline_response.json()['apple_identifier']}"}
+    base = f"/api/v1/airline/{airline_identifier}"
+    
+    async def counts(entity: str, related: str) -> dict[str, int]:
+        """Related row count of each listed entity (0 when it has no stats entry)."""
+        response = await client.get(f"{base}/{entity}/list", headers=headers)
+        assert response.status_code == 200
+        return {
+            item[f"{entity}_identifier"]: sum(stat["count"] for stat in item.get("stats", []) if stat["table"] == related)
+            for item in response.json()
+        }
+    
+    aircraft_response = await client.post(
+        f"{base}/aircraft/create",
+        json={"registration": "N33333", "type": "Cessna 182"},
+        headers=headers
+    )
+    assert aircraft_response.status_code == 200
+    aircraft_identifier = aircraft_response.json()["aircraft_identifier"]
+    
+    flight_identifiers = []
+    for flight_number in ("FF301", "FF302"):
+        flight_response = await client.post(
+            f"{base}/flight/plan/{aircraft_identifier}",
+            json={
+                "origin": {"icao": "EGLL", "timezone_identifier": "Europe/London"},
+                "destination": {"icao": "LFPG", "timezone_identifier": "Europe/Paris"},
+                "gate": "B1",
+                "flightNumber": flight_number,
+                "scheduledDepartureDate": (datetime.now() + timedelta(days=1)).isoformat()
+            },
+            headers=headers
+        )
+        assert flight_response.status_code == 200
+        flight_identifiers.append(flight_response.json()["flight_identifier"])
+    
+    passenger_response = await client.post(
+        f"{base}/passenger/create",
+        json={"apple_identifier": "test.stats.passenger", "formattedName": "Stats Passenger"},
+        headers=headers
+    )
+    assert passenger_response.status_code == 200
+    passenger_identifier = passenger_response.json()["passenger_identifier"]
+    
+    ticket_response = await client.post(
+        f"{base}/ticket/issue/{flight_identifiers[0]}/{passenger_identifier}",
+        json={"seatNumber": "2B"},
+        headers=headers
+    )
+    assert ticket_response.status_code == 200
+    ticket_identifier = ticket_response.json()["ticket_identifier"]
+    
+    assert await counts("aircraft", "Flights") == {aircraft_identifier: 2}
+    assert await counts("flight", "Tickets") == {flight_identifiers[0]: 1, flight_identifiers[1]: 0}
+    assert await counts("passenger", "Tickets") == {passenger_identifier: 1}
+    
+    # Deletes refresh the stats of the entities the rows linked to
+    response = await client.delete(f"{base}/ticket/{ticket_identifier}", headers=headers)
+    assert response.status_code == 200
+    response = await client.delete(f"{base}/flight/{flight_identifiers[1]}", headers=headers)
+    assert response.status_code == 200
+    
+    assert await counts("aircraft", "Flights") == {aircraft_identifier: 1}
+    assert await counts("flight", "Tickets") == {flight_identifiers[0]: 0}
+    assert await counts("passenger", "Tickets") == {passenger_identifier: 0}
+    
+    # A series issues its passengers' tickets as ticket/issue does
+    response = await client.post(
+        f"{base}/flight/plan/{aircraft_identifier}/series",
+        json={
+            "origin": {"icao": "EGLL", "timezone_identifier": "Europe/London"},
+            "destination": {"icao": "LFPG", "timezone_identifier": "Europe/Paris"},
+            "gate": "B2",
+            "flightNumber": "FF303",
+            "scheduledDepartureDate": (datetime.now() + timedelta(days=2)).isoformat(),
+            "recurrence": "FREQ=DAILY;COUNT=2",
+            "passengers": [{"passenger_identifier": passenger_identifier, "seatNumber": "3C"}]
+        },
+        headers=headers
+    )
+    assert response.status_code == 200
+    series = [flight["flight_identifier"] for flight in response.json()]
+    assert await counts("aircraft", "Flights") == {aircraft_identifier: 3}
+    assert await counts("flight", "Tickets") == {flight_identifiers[0]: 0, **{identifier: 1 for identifier in series}}
+    assert await counts("passenger", "Tickets") == {passenger_identifier: 2}
+    print("✅ List stats followed flight and ticket creates and deletes")
+
+
 @pytest.mark.asyncio
 async def test_check_flight(client: AsyncClient):
     """Test checking/validating a flight."""
@@ -3,6 +3,7 @@ Test passenger endpoints using httpx.
 
 These tests match the endpoints from tests/test.zsh:
 - POST /v1/airline/{airline_identifier}/passenger/create
+- POST /v1/airline/{airline_identifier}/passenger/bulk
 - GET /v1/airline/{airline_identifier}/passenger/list
 - GET /v1/airline/{airline_identifier}/passenger/{passenger_identifier}
 - GET /v1/airline/{airline_identifier}/passenger/{passenger_identifier}/tickets
@@ -105,6 +106,335 @@ async def test_list_passengers(client: AsyncClient):
     print(f"✅ Listed {len(data)} passengers")
 
 
+@pytest.mark.asyncio
+async def test_create_passenger_idempotent(client: AsyncClient):
+    """Test creating a passenger twice for the same contact updates it."""
+    from app.config import settings
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.idempotent.passenger.123",
+            "airline_name": "Idempotent Passenger Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+    
+    identifiers = []
+    for name in ("Jane Doe", "Jane Smith"):
+        response = await client.post(
+            f"/api/v1/airline/{airline_identifier}/passenger/create",
+            json={
+                "formattedName": name,
+                "apple_identifier": "idempotent.passenger.1"
+            },
+            headers=headers
+        )
+        assert response.status_code == 200
+        identifiers.append(response.json()["passenger_identifier"])
+    
+    assert identifiers[0] == identifiers[1]
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/passenger/{identifiers[0]}",
+        headers=headers
+    )
+    assert response.json()["formattedName"] == "Jane Smith"
+    print(f"✅ Passenger {identifiers[0]} updated in place")
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_passengers(client: AsyncClient):
+    """Test creating passengers in bulk, with an invalid row."""
+    from app.config import settings
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.bulk.passengers.123",
+            "airline_name": "Bulk Passengers Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+    
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/passenger/bulk",
+        json=[
+            {"formattedName": "Jane Doe", "apple_identifier": "bulk.passenger.1"},
+            {"formattedName": "No Identifier"},
+            {"formattedName": "John Doe", "apple_identifier": "bulk.passenger.2"},
+        ],
+        headers=headers
+    )
+    
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == 3
+    assert "error" in results[1]
+    
+    # Valid rows were written, in input order
+    for result, name in ((results[0], "Jane Doe"), (results[2], "John Doe")):
+        response = await client.get(
+            f"/api/v1/airline/{airline_identifier}/passenger/{result['passenger_identifier']}",
+            headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["formattedName"] == name
+    print("✅ Bulk created 2 passengers, 1 row rejected")
+
+
+@pytest.mark.asyncio
+async def test_list_passengers_paginated(client: AsyncClient):
+    """Test listing passengers page by page with limit/after."""
+    from app.config import settings
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.page.passengers.123",
+            "airline_name": "Page Passengers Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    
+    for i in range(3):
+        await client.post(
+            f"/api/v1/airline/{airline_identifier}/passenger/create",
+            json={
+                "formattedName": f"Page Passenger {i+1}",
+                "apple_identifier": f"page.passenger.apple.id.{i+1}"
+            },
+            headers={"Authorization": f"Bearer {apple_identifier}"}
+        )
+    
+    # Walk the pages following X-Next-Cursor
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = await client.get(
+            f"/api/v1/airline/{airline_identifier}/passenger/list",
+            params=params,
+            headers={"Authorization": f"Bearer {apple_identifier}"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) <= 2
+        seen.extend(passenger["passenger_identifier"] for passenger in data)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params = {"limit": 2, "after": cursor}
+    
+    assert len(seen) >= 3
+    assert len(seen) == len(set(seen))
+    
+    # Invalid cursor
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/passenger/list",
+        params={"after": "not-a-cursor"},
+        headers={"Authorization": f"Bearer {apple_identifier}"}
+    )
+    assert response.status_code == 400
+    print(f"✅ Paged through {len(seen)} passengers")
+
+
+@pytest.mark.asyncio
+async def test_list_passengers_ndjson(client: AsyncClient):
+    """Test listing passengers as NDJSON (Accept: application/x-ndjson)."""
+    import json
+    from app.config import settings
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.list.passengers.123",
+            "airline_name": "List Passengers Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/passenger/list",
+        headers={
+            "Authorization": f"Bearer {apple_identifier}",
+            "Accept": "application/x-ndjson",
+        }
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    
+    # Same entities as the JSON list
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/passenger/list",
+        headers={"Authorization": f"Bearer {apple_identifier}"}
+    )
+    assert lines == response.json()
+    print(f"✅ Streamed {len(lines)} passengers as NDJSON")
+
+
+@pytest.mark.asyncio
+async def test_list_passengers_not_modified(client: AsyncClient):
+    """Test conditional list request (ETag / If-None-Match)."""
+    from app.config import settings
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.list.passengers.123",
+            "airline_name": "List Passengers Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+    
+    response = await client.get(f"/api/v1/airline/{airline_identifier}/passenger/list", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    
+    # Unchanged list
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/passenger/list",
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    
+    # A new passenger changes the validator
+    await client.post(
+        f"/api/v1/airline/{airline_identifier}/passenger/create",
+        json={
+            "apple_identifier": "test.passenger.etag",
+            "formattedName": "ETag Passenger"
+        },
+        headers=headers
+    )
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/passenger/list",
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    print("✅ Passenger list revalidated with ETag")
+    etag = response.headers["etag"]
+    
+    # An edit within the same second (modified unchanged) also changes it
+    await client.post(
+        f"/api/v1/airline/{airline_identifier}/passenger/create",
+        json={
+            "apple_identifier": "test.passenger.etag",
+            "formattedName": "ETag Passenger Renamed"
+        },
+        headers=headers
+    )
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/passenger/list",
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "ETag Passenger Renamed" in [passenger["formattedName"] for passenger in response.json()]
+    print("✅ Passenger list revalidated after a same-second edit")
+
+
+@pytest.mark.asyncio
+async def test_list_version_bumped_last(client: AsyncClient):
+    """Test that a write bumps the list version as its last statement, the row lock held shortest."""
+    from sqlalchemy import event
+    from app.config import settings
+    from app.database.connection import engine
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.list.version.123",
+            "airline_name": "List Version Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    headers = {"Authorization": f"Bearer {airline_response.json()['apple_identifier']}"}
+    
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    # The create upserts the passenger, then refreshes the copies in its tickets
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.post(
+            f"/api/v1/airline/{airline_identifier}/passenger/create",
+            json={"apple_identifier": "test.list.version.passenger", "formattedName": "Version Passenger"},
+            headers=headers
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert [statement for statement in statements if "ListVersions" in statement] == statements[-1:]
+    print("✅ List version bumped right before the commit")
+
+
 @pytest.mark.asyncio
 async def test_get_passenger(client: AsyncClient):
     """Test getting a passenger by identifier."""
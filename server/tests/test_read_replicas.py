@@ -0,0 +1,72 @@
+"""
+Test read replica routing (DB_REPLICA_URLS).
+
+The replica is an empty SQLite database with the schema, standing for one
+that has not replicated anything yet: what a GET reads tells where it went.
+"""
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes(client: AsyncClient, tmp_path, monkeypatch):
+    """Test that GETs after a write, and sync, read from the primary."""
+    from app.config import settings
+    from app.database import connection
+    from app.database.tables import metadata
+    from app.main import app
+
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    if settings.DB_BACKEND != "sqlite":
+        pytest.skip("Replica test database needs DB_BACKEND=sqlite")
+
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.replica.airline.123",
+            "airline_name": "Replica Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+
+    airline_identifier = airline_response.json()["airline_identifier"]
+    headers = {"Authorization": f"Bearer {airline_response.json()['apple_identifier']}"}
+
+    replica = connection._create_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.sqlite'}")
+    async with replica.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    monkeypatch.setattr(connection.replicas, "engines", [replica])
+
+    # A client of its own, so the cookie does not leak into other tests
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as writer:
+        response = await writer.post(
+            f"/api/v1/airline/{airline_identifier}/passenger/create",
+            json={"apple_identifier": "test.replica.passenger", "formattedName": "Replica Passenger"},
+            headers=headers
+        )
+        assert response.status_code == 200
+        assert connection.READ_PRIMARY_COOKIE in response.cookies
+        passenger_identifier = response.json()["passenger_identifier"]
+
+        # The writer reads its write from the primary
+        response = await writer.get(f"/api/v1/airline/{airline_identifier}/passenger/list", headers=headers)
+        assert response.status_code == 200
+        assert passenger_identifier in {passenger["passenger_identifier"] for passenger in response.json()}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as reader:
+        # Other clients read from the replica
+        response = await reader.get(f"/api/v1/airline/{airline_identifier}/passenger/list", headers=headers)
+        assert response.status_code == 200
+        assert response.json() == []
+
+        # except sync, whose token must come with the primary's rows
+        response = await reader.get(f"/api/v1/airline/{airline_identifier}/sync", headers=headers)
+        assert response.status_code == 200
+        assert passenger_identifier in {passenger["passenger_identifier"] for passenger in response.json()["passengers"]}
+
+    await replica.dispose()
+    print("✅ Reads after a write and sync went to the primary")
@@ -0,0 +1,164 @@
+"""
+Test airline sharding: the hash ring, the shard directory and moving an airline.
+
+Shards are SQLite databases of their own, created with the schema; the move
+test adds one to the app next to the default database.
+"""
+import pytest
+from httpx import AsyncClient
+
+
+def test_hash_ring():
+    """Test that the ring is stable and adding a shard only draws keys to it."""
+    from app.database.sharding import HashRing
+
+    keys = [f"airline{index}" for index in range(1000)]
+    ring = HashRing(["default", "a"])
+    before = {key: ring.get(key) for key in keys}
+    assert before == {key: HashRing(["default", "a"]).get(key) for key in keys}
+    assert set(before.values()) == {"default", "a"}
+
+    grown = HashRing(["default", "a", "b"])
+    after = {key: grown.get(key) for key in keys}
+    moved = [key for key in keys if after[key] != before[key]]
+    assert moved and all(after[key] == "b" for key in moved)
+    assert len(moved) < len(keys) / 2
+    print(f"✅ Adding a shard moved {len(moved)} of {len(keys)} keys, all to the new shard")
+
+
+@pytest.mark.asyncio
+async def test_ticket_shard_miss_cached(tmp_path, monkeypatch):
+    """Test that a ticket found in no shard is not looked for again within the miss TTL."""
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+    from app.database.connection import _create_engine
+    from app.database.sharding import DEFAULT_SHARD, ShardDirectory
+    from app.database.tables import metadata
+
+    engines = {name: _create_engine(f"sqlite+aiosqlite:///{tmp_path / f'{name}.sqlite'}") for name in (DEFAULT_SHARD, "other")}
+    for shard_engine in engines.values():
+        async with shard_engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+    directory = ShardDirectory(
+        {name: async_sessionmaker(shard_engine, class_=AsyncSession, expire_on_commit=False) for name, shard_engine in engines.items()},
+        ttl=30,
+        miss_ttl=30,
+    )
+
+    lookups = []
+    find_ticket = directory._find_ticket
+
+    async def counted_find_ticket(ticket_identifier):
+        lookups.append(ticket_identifier)
+        return await find_ticket(ticket_identifier)
+
+    monkeypatch.setattr(directory, "_find_ticket", counted_find_ticket)
+    assert await directory.ticket_shard("unknown") == DEFAULT_SHARD
+    assert await directory.ticket_shard("unknown") == DEFAULT_SHARD
+    assert lookups == ["unknown"]
+
+    for shard_engine in engines.values():
+        await shard_engine.dispose()
+    print("✅ Unknown ticket looked for in the shards once")
+
+
+@pytest.mark.asyncio
+async def test_ticket_reachable_after_move(client: AsyncClient, tmp_path, monkeypatch):
+    """Test that an airline's tickets are served from its new shard after move_airline."""
+    from datetime import datetime, timedelta
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+    from app.config import settings
+    from app.database import connection
+    from app.database.sharding import DEFAULT_SHARD, ShardDirectory, move_airline
+    from app.database.tables import airlines, metadata, tickets
+
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    if settings.DB_BACKEND != "sqlite" or connection.shard_directory.enabled:
+        pytest.skip("Shard test database needs DB_BACKEND=sqlite without DB_SHARDS")
+
+    # Created in the default database, the only shard so far
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.shard.move.123",
+            "airline_name": "Shard Move Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+
+    airline_identifier = airline_response.json()["airline_identifier"]
+    headers = {"Authorization": f"Bearer {airline_response.json()['apple_identifier']}"}
+
+    aircraft_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/aircraft/create",
+        json={"registration": "N55555", "type": "Piper Arrow"},
+        headers=headers
+    )
+    assert aircraft_response.status_code == 200
+    aircraft_identifier = aircraft_response.json()["aircraft_identifier"]
+
+    flight_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}",
+        json={
+            "origin": {"icao": "LFPG", "timezone_identifier": "Europe/Paris"},
+            "destination": {"icao": "EGLL", "timezone_identifier": "Europe/London"},
+            "gate": "A1",
+            "flightNumber": "FF555",
+            "scheduledDepartureDate": (datetime.now() + timedelta(days=1)).isoformat()
+        },
+        headers=headers
+    )
+    assert flight_response.status_code == 200
+    flight_identifier = flight_response.json()["flight_identifier"]
+
+    passenger_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/passenger/create",
+        json={"apple_identifier": "test.shard.move.passenger", "formattedName": "Shard Passenger"},
+        headers=headers
+    )
+    assert passenger_response.status_code == 200
+    passenger_identifier = passenger_response.json()["passenger_identifier"]
+
+    ticket_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/ticket/issue/{flight_identifier}/{passenger_identifier}",
+        json={"seatNumber": "1A", "customLabelValue": "1"},
+        headers=headers
+    )
+    assert ticket_response.status_code == 200
+    ticket_identifier = ticket_response.json()["ticket_identifier"]
+
+    # A second, empty shard
+    other = connection._create_engine(f"sqlite+aiosqlite:///{tmp_path / 'other.sqlite'}")
+    async with other.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    monkeypatch.setitem(connection.shard_engines, "other", other)
+    monkeypatch.setitem(
+        connection.shard_sessions, "other", async_sessionmaker(other, class_=AsyncSession, expire_on_commit=False)
+    )
+    monkeypatch.setattr(connection, "shard_directory", ShardDirectory(connection.shard_sessions, ttl=30, miss_ttl=30))
+
+    assert await move_airline(airline_identifier, "other", wait=0) > 0
+
+    async with connection.shard_engines[DEFAULT_SHARD].connect() as conn:
+        assert (await conn.execute(
+            select(airlines.c.airline_id).where(airlines.c.airline_identifier == airline_identifier)
+        )).first() is None
+    async with other.connect() as conn:
+        assert (await conn.execute(
+            select(tickets.c.ticket_id).where(tickets.c.ticket_identifier == ticket_identifier)
+        )).first() is not None
+
+    response = await client.get(f"/api/v1/boardingpass/{ticket_identifier}", params={"debug": True})
+    assert response.status_code == 200
+    assert "boardingPass" in response.json()
+
+    response = await client.get(f"/api/v1/airline/{airline_identifier}/ticket/list", headers=headers)
+    assert response.status_code == 200
+    assert ticket_identifier in {ticket["ticket_identifier"] for ticket in response.json()}
+
+    await other.dispose()
+    print(f"✅ Ticket {ticket_identifier} reachable after moving its airline")
@@ -0,0 +1,195 @@
+"""
+Test sync endpoint using httpx.
+
+- GET /v1/airline/{airline_identifier}/sync
+- GET /v1/airline/{airline_identifier}/sync?since={token}
+"""
+import pytest
+from httpx import AsyncClient
+from datetime import datetime, timedelta
+
+
+@pytest.mark.asyncio
+async def test_sync(client: AsyncClient):
+    """Test full sync, then delta sync with tombstones after a delete."""
+    from app.config import settings
+
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.sync.airline.123",
+            "airline_name": "Sync Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+
+    # Create aircraft and flight
+    aircraft_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/aircraft/create",
+        json={
+            "registration": "N54321",
+            "type": "Cessna 172"
+        },
+        headers=headers
+    )
+
+    if aircraft_response.status_code != 200:
+        pytest.skip("Could not create test aircraft")
+
+    aircraft_identifier = aircraft_response.json()["aircraft_identifier"]
+
+    flight_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}",
+        json={
+            "origin": {"icao": "EGLL"},
+            "destination": {"icao": "LFPG"},
+            "gate": "S1",
+            "flightNumber": "SYNC1",
+            "scheduledDepartureDate": (datetime.now() + timedelta(days=1)).isoformat()
+        },
+        headers=headers
+    )
+
+    if flight_response.status_code != 200:
+        pytest.skip("Could not create test flight")
+
+    flight_identifier = flight_response.json()["flight_identifier"]
+
+    # Full sync
+    response = await client.get(f"/api/v1/airline/{airline_identifier}/sync", headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert "token" in data
+    assert flight_identifier in {flight["flight_identifier"] for flight in data["flights"]}
+    assert data["deleted"] == []
+
+    # Delete the flight, then delta sync
+    await client.delete(f"/api/v1/airline/{airline_identifier}/flight/{flight_identifier}", headers=headers)
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/sync",
+        params={"since": data["token"]},
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    delta = response.json()
+    assert {"table": "Flights", "identifier": flight_identifier} in [
+        {"table": tombstone["table"], "identifier": tombstone["identifier"]} for tombstone in delta["deleted"]
+    ]
+    assert flight_identifier not in {flight["flight_identifier"] for flight in delta["flights"]}
+    print(f"✅ Synced {len(data['flights'])} flights, then {len(delta['deleted'])} tombstones")
+
+
+@pytest.mark.asyncio
+async def test_sync_invalid_token(client: AsyncClient):
+    """Test sync with a malformed token."""
+    from app.config import settings
+
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.sync.airline.123",
+            "airline_name": "Sync Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/sync",
+        params={"since": "not-a-token"},
+        headers={"Authorization": f"Bearer {apple_identifier}"}
+    )
+
+    assert response.status_code == 400
+    print("✅ Invalid sync token rejected")
+
+
+@pytest.mark.asyncio
+async def test_sync_after_upsert(client: AsyncClient):
+    """Test that an upsert updating an existing row moves it into the next delta and list ETag."""
+    from app.config import settings
+    from app.database.connection import engine
+    from app.database.tables import passengers
+    from sqlalchemy import update
+
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.sync.upsert.123",
+            "airline_name": "Sync Upsert Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+
+    passenger = {"apple_identifier": "test.sync.upsert.passenger", "formattedName": "Upsert Passenger"}
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/passenger/create", json=passenger, headers=headers
+    )
+    assert response.status_code == 200
+    passenger_identifier = response.json()["passenger_identifier"]
+
+    # Written well before the token, out of the sync overlap
+    async with engine.begin() as conn:
+        await conn.execute(
+            update(passengers)
+            .where(passengers.c.passenger_identifier == passenger_identifier)
+            .values(modified=datetime.utcnow().replace(microsecond=0) - timedelta(hours=1))
+        )
+
+    token = (await client.get(f"/api/v1/airline/{airline_identifier}/sync", headers=headers)).json()["token"]
+    response = await client.get(f"/api/v1/airline/{airline_identifier}/passenger/list", headers=headers)
+    etag = response.headers["etag"]
+
+    # Same contact again: the upsert updates the existing row
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/passenger/create",
+        json={**passenger, "formattedName": "Upsert Passenger Renamed"},
+        headers=headers
+    )
+    assert response.json()["passenger_identifier"] == passenger_identifier
+
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/passenger/list",
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/sync", params={"since": token}, headers=headers
+    )
+    assert response.status_code == 200
+    synced = {item["passenger_identifier"]: item for item in response.json()["passengers"]}
+    assert synced[passenger_identifier]["formattedName"] == "Upsert Passenger Renamed"
+    print("✅ Updated passenger sent by the next delta sync")
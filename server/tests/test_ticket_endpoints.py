@@ -3,6 +3,7 @@ Test ticket endpoints using httpx.
 
 These tests match the endpoints from tests/test.zsh:
 - POST /v1/airline/{airline_identifier}/ticket/issue/{flight_identifier}/{passenger_identifier}
+- POST /v1/airline/{airline_identifier}/ticket/issue/{flight_identifier}
 - GET /v1/airline/{airline_identifier}/ticket/list
 - GET /v1/airline/{airline_identifier}/ticket/{ticket_identifier}
 - DELETE /v1/airline/{airline_identifier}/ticket/{ticket_identifier}
@@ -113,10 +114,122 @@ async def test_issue_ticket(client: AsyncClient):
     print(f"✅ Issued ticket: {data['ticket_identifier']}")
 
 
+@pytest.mark.asyncio
+async def test_issue_tickets_bulk(client: AsyncClient):
+    """Test issuing tickets for several passengers on a flight."""
+    from app.config import settings
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.ticket.airline.123",
+            "airline_name": "Ticket Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    apple_identifier = airline_response.json()["apple_identifier"]
+    headers = {"Authorization": f"Bearer {apple_identifier}"}
+    
+    # Create aircraft and flight
+    aircraft_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/aircraft/create",
+        json={
+            "registration": "N12345",
+            "type": "Cessna 172"
+        },
+        headers=headers
+    )
+    
+    if aircraft_response.status_code != 200:
+        pytest.skip("Could not create test aircraft")
+    
+    aircraft_identifier = aircraft_response.json()["aircraft_identifier"]
+    
+    flight_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/flight/plan/{aircraft_identifier}",
+        json={
+            "origin": {"icao": "EGLL"},
+            "destination": {"icao": "LFPG"},
+            "gate": "B2",
+            "flightNumber": "FF200",
+            "scheduledDepartureDate": (datetime.now() + timedelta(days=1)).isoformat()
+        },
+        headers=headers
+    )
+    
+    if flight_response.status_code != 200:
+        pytest.skip("Could not create test flight")
+    
+    flight_identifier = flight_response.json()["flight_identifier"]
+    
+    # Create passengers
+    passengers_response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/passenger/bulk",
+        json=[
+            {"formattedName": "Jane Doe", "apple_identifier": "bulk.ticket.passenger.1"},
+            {"formattedName": "John Doe", "apple_identifier": "bulk.ticket.passenger.2"},
+        ],
+        headers=headers
+    )
+    
+    if passengers_response.status_code != 200:
+        pytest.skip("Could not create test passengers")
+    
+    passenger_identifiers = [result["passenger_identifier"] for result in passengers_response.json()]
+    
+    # Issue tickets
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/ticket/issue/{flight_identifier}",
+        json=[
+            {"passenger_identifier": passenger_identifiers[0], "seatNumber": "1A"},
+            {"passenger_identifier": passenger_identifiers[1], "seatNumber": "1B", "customLabelValue": "2"},
+        ],
+        headers=headers
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [ticket["seatNumber"] for ticket in data] == ["1A", "1B"]
+    assert [ticket["passenger"]["passengerIdentifier"] for ticket in data] == passenger_identifiers
+    
+    # Issuing again keeps the tickets
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/ticket/issue/{flight_identifier}",
+        json=[{"passenger_identifier": passenger_identifiers[0], "seatNumber": "2A"}],
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["ticket_identifier"] == data[0]["ticket_identifier"]
+    assert response.json()[0]["seatNumber"] == "2A"
+    
+    # Unknown passenger
+    response = await client.post(
+        f"/api/v1/airline/{airline_identifier}/ticket/issue/{flight_identifier}",
+        json=[{"passenger_identifier": "unknown-passenger", "seatNumber": "3A"}],
+        headers=headers
+    )
+    assert response.status_code == 404
+    print(f"✅ Issued {len(data)} tickets in one request")
+
+
 @pytest.mark.asyncio
 async def test_list_tickets(client: AsyncClient):
     """Test listing tickets."""
+    from sqlalchemy import select
     from app.config import settings
+    from app.database.connection import engine
+    from app.database.tables import tickets
+    from app.models.base import JSON_SCHEMA_KEY, JSON_SCHEMA_VERSION
+    from app.models.ticket import Ticket
     
     if not settings.SECRET:
         pytest.skip("SECRET not configured in .env")
@@ -208,6 +321,38 @@ async def test_list_tickets(client: AsyncClient):
     assert isinstance(data, list)
     # Note: Only one ticket per passenger per flight, so we might have 1 or 2 depending on if they're on same flight
     assert len(data) >= 1
+    
+    # Listed tickets are as validated from their rows, also once their passenger copy was rewritten
+    await client.post(
+        f"/api/v1/airline/{airline_identifier}/passenger/create",
+        json={
+            "formattedName": "Jane A. Smith",
+            "firstName": "Jane",
+            "middleName": "A.",
+            "lastName": "Smith",
+            "apple_identifier": "jane.apple.id.123"
+        },
+        headers={"Authorization": f"Bearer {apple_identifier}"}
+    )
+    response = await client.get(
+        f"/api/v1/airline/{airline_identifier}/ticket/list",
+        headers={"Authorization": f"Bearer {apple_identifier}"}
+    )
+    assert response.status_code == 200
+    listed = {ticket["ticket_identifier"]: ticket for ticket in response.json()}
+    assert all(ticket["passenger"]["formattedName"] == "Jane A. Smith" for ticket in listed.values())
+    async with engine.connect() as conn:
+        rows = (await conn.execute(
+            select(tickets.c.ticket_id, tickets.c.ticket_identifier, tickets.c.json_data)
+            .where(tickets.c.ticket_identifier.in_(listed))
+        )).all()
+    for row in rows:
+        # Written by the server, so listed without validation, yet as validated
+        assert row.json_data[JSON_SCHEMA_KEY] == JSON_SCHEMA_VERSION
+        validated = Ticket.model_validate(
+            {**row.json_data, "ticket_id": row.ticket_id, "ticket_identifier": row.ticket_identifier}
+        )
+        assert listed[row.ticket_identifier] == validated.to_json()
     print(f"✅ Listed {len(data)} tickets")
 
 
@@ -561,6 +706,172 @@ async def test_verify_ticket(client: AsyncClient):
     print(f"✅ Verified ticket: {ticket_identifier}")
 
 
+@pytest.mark.asyncio
+async def test_reissue_keeps_ticket(client: AsyncClient, monkeypatch):
+    """Test that re-issuing updates the passenger's ticket, also while migration 5 is blocked."""
+    from sqlalchemy import text
+    from app.config import settings
+    from app.database import migrations
+    from app.database.connection import engine
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    if settings.DB_BACKEND != "sqlite":
+        pytest.skip("Dropping the unique index needs DB_BACKEND=sqlite")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.reissue.ticket.123",
+            "airline_name": "Reissue Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    headers = {"Authorization": f"Bearer {airline_response.json()['apple_identifier']}"}
+    base = f"/api/v1/airline/{airline_identifier}"
+    
+    aircraft_response = await client.post(
+        f"{base}/aircraft/create", json={"registration": "N11111", "type": "Piper Cub"}, headers=headers
+    )
+    assert aircraft_response.status_code == 200
+    flight_response = await client.post(
+        f"{base}/flight/plan/{aircraft_response.json()['aircraft_identifier']}",
+        json={
+            "origin": {"icao": "EGLL", "timezone_identifier": "Europe/London"},
+            "destination": {"icao": "EHAM", "timezone_identifier": "Europe/Amsterdam"},
+            "gate": "D4",
+            "flightNumber": "FF111",
+            "scheduledDepartureDate": (datetime.now() + timedelta(days=1)).isoformat()
+        },
+        headers=headers
+    )
+    assert flight_response.status_code == 200
+    flight_identifier = flight_response.json()["flight_identifier"]
+    passenger_response = await client.post(
+        f"{base}/passenger/create",
+        json={"apple_identifier": "test.reissue.passenger", "formattedName": "Reissue Passenger"},
+        headers=headers
+    )
+    assert passenger_response.status_code == 200
+    passenger_identifier = passenger_response.json()["passenger_identifier"]
+    
+    async def issue_twice() -> set[str]:
+        """Issue a single ticket then a bulk one, return the identifiers on the flight."""
+        identifiers = set()
+        response = await client.post(
+            f"{base}/ticket/issue/{flight_identifier}/{passenger_identifier}",
+            json={"seatNumber": "5E"},
+            headers=headers
+        )
+        assert response.status_code == 200
+        identifiers.add(response.json()["ticket_identifier"])
+        response = await client.post(
+            f"{base}/ticket/issue/{flight_identifier}",
+            json=[{"passenger_identifier": passenger_identifier, "seatNumber": "6F"}],
+            headers=headers
+        )
+        assert response.status_code == 200
+        identifiers.update(ticket["ticket_identifier"] for ticket in response.json())
+        response = await client.get(f"{base}/flight/{flight_identifier}/tickets", headers=headers)
+        assert response.status_code == 200
+        assert [ticket["seatNumber"] for ticket in response.json()] == ["6F"]
+        identifiers.update(ticket["ticket_identifier"] for ticket in response.json())
+        return identifiers
+    
+    first = await issue_twice()
+    assert len(first) == 1
+    
+    # Migration 5 blocked: no unique (flight_id, passenger_id) index
+    monkeypatch.setattr(migrations, "_applied", set())
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP INDEX ux_tickets_flight_passenger"))
+        await conn.execute(text("DELETE FROM SchemaMigrations WHERE version = 5"))
+    try:
+        assert await issue_twice() == first
+    finally:
+        async with engine.connect() as conn:
+            assert await migrations.migrate(conn) == [5]
+    print("✅ Re-issued tickets kept, with and without the unique index")
+
+
+@pytest.mark.asyncio
+async def test_written_entities_match_reads(client: AsyncClient):
+    """Test that create responses, built without reading the row back, equal a GET of it."""
+    from app.config import settings
+    
+    if not settings.SECRET:
+        pytest.skip("SECRET not configured in .env")
+    
+    # Create airline
+    airline_response = await client.post(
+        "/api/v1/airline/create",
+        json={
+            "apple_identifier": "test.written.ticket.123",
+            "airline_name": "Written Entities Test Airline"
+        },
+        headers={"Authorization": f"Bearer {settings.SECRET}"}
+    )
+    
+    if airline_response.status_code != 200:
+        pytest.skip("Could not create test airline")
+    
+    airline_identifier = airline_response.json()["airline_identifier"]
+    headers = {"Authorization": f"Bearer {airline_response.json()['apple_identifier']}"}
+    base = f"/api/v1/airline/{airline_identifier}"
+    
+    async def assert_matches_read(response, entity: str) -> str:
+        """Check a create response against a GET of the entity, return its identifier."""
+        assert response.status_code == 200
+        identifier = response.json()[f"{entity}_identifier"]
+        read = await client.get(f"{base}/{entity}/{identifier}", headers=headers)
+        assert read.status_code == 200
+        assert response.json() == read.json()
+        return identifier
+    
+    aircraft_identifier = await assert_matches_read(await client.post(
+        f"{base}/aircraft/create",
+        json={"registration": "N22222", "type": "Diamond DA40"},
+        headers=headers
+    ), "aircraft")
+    
+    flight_identifier = await assert_matches_read(await client.post(
+        f"{base}/flight/plan/{aircraft_identifier}",
+        json={
+            "origin": {"icao": "EGLL", "timezone_identifier": "Europe/London"},
+            "destination": {"icao": "EDDF", "timezone_identifier": "Europe/Berlin"},
+            "gate": "C3",
+            "flightNumber": "FF222",
+            "scheduledDepartureDate": (datetime.now() + timedelta(days=1)).isoformat()
+        },
+        headers=headers
+    ), "flight")
+    
+    # Created, then updated through its natural key (same apple_identifier)
+    for formatted_name in ("Written Passenger", "Written Passenger Renamed"):
+        passenger_identifier = await assert_matches_read(await client.post(
+            f"{base}/passenger/create",
+            json={"apple_identifier": "test.written.passenger", "formattedName": formatted_name},
+            headers=headers
+        ), "passenger")
+    
+    # Issued, then issued again to the same passenger on the same flight
+    ticket_identifiers = set()
+    for seat_number in ("3C", "4D"):
+        ticket_identifiers.add(await assert_matches_read(await client.post(
+            f"{base}/ticket/issue/{flight_identifier}/{passenger_identifier}",
+            json={"seatNumber": seat_number},
+            headers=headers
+        ), "ticket"))
+    assert len(ticket_identifiers) == 1
+    print("✅ Created and updated entities equal their re-read")
+
+
 @pytest.mark.asyncio
 async def test_ticket_authentication_failure(client: AsyncClient):
     """Test that invalid bearer token returns 401."""